@@ -0,0 +1,38 @@
+import importlib
+
+# Public name -> submodule defining it. Submodules are imported on first use,
+# so `python -m analysis.<module>` and imports of a single submodule do not
+# load (and simulate with) the whole package.
+_EXPORTS = {
+    "ExactEngine": "analysis.exact",
+    "run_index_study": "analysis.index_generator",
+    "fit_index_table": "analysis.index_generator",
+    "generate_index_table": "analysis.index_generator",
+    "CountSystemEvaluator": "analysis.count_evaluator",
+    "tag_vector": "analysis.count_evaluator",
+    "rule_grid": "analysis.rule_sweep",
+    "sweep_rules": "analysis.rule_sweep",
+    "format_sweep_table": "analysis.rule_sweep",
+    "collect_counters": "analysis.round_counters",
+    "SweepScheduler": "analysis.sweep_scheduler",
+    "config_grid": "analysis.sweep_scheduler",
+    "format_schedule_table": "analysis.sweep_scheduler",
+    "DecisionTables": "analysis.decisions",
+    "SideBetEvaluator": "analysis.side_bets",
+    "OutcomeDistribution": "analysis.bankroll",
+    "BankrollSimulator": "analysis.bankroll",
+    "AliasSampler": "analysis.alias",
+    "BettingSystem": "analysis.betting_systems",
+    "BettingSystemEvaluator": "analysis.betting_systems",
+    "default_systems": "analysis.betting_systems",
+    "format_system_table": "analysis.betting_systems",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """Import the submodule defining a public name when it is first used."""
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,272 @@
+import math
+import numpy as np
+from analysis.alias import AliasSampler
+from game.rules import Rules
+from simulation import Simulation
+
+
+class OutcomeDistribution:
+    """
+    Distribution of a round's result for a flat one-unit bet, by how much
+    bankroll the player has left to double and split with.
+
+    A player who cannot cover a double or split plays the hand differently
+    (Game.player_turn hits instead of doubling, and stops splitting), so the
+    distribution is recorded separately for every amount of spare bankroll
+    from none up to the most a round can ever need; the last level is the
+    unlimited game.
+
+    Results are drawn with a Walker alias table, so any exact or measured
+    distribution can stand in for the full game engine.
+
+    Attributes:
+        sampler (AliasSampler): Alias tables of every level.
+        values (numpy.ndarray): Every possible round result, in units.
+        probabilities (numpy.ndarray): P(result) per level, shape
+                                       (levels, values).
+        mean (float): Expected result per round of the unlimited game.
+        sd (float): Standard deviation per round of the unlimited game.
+    """
+
+    def __init__(self, sampler):
+        """
+        Initialize from an alias sampler.
+
+        Args:
+            sampler (AliasSampler): Round results per level; level k is the
+                                    game with k spare units beyond the bet,
+                                    and the last level the unlimited game. A
+                                    single level ignores the bankroll.
+        """
+        self.sampler = sampler
+        self.values = sampler.values
+        self.probabilities = sampler.probabilities
+        self.mean = sampler.mean()
+        self.sd = sampler.sd()
+
+    @classmethod
+    def from_results(cls, results):
+        """
+        Build the distribution from recorded round results.
+
+        Args:
+            results (list): One array of round results per level.
+
+        Returns:
+            OutcomeDistribution: The empirical distribution.
+        """
+        if not len(results):
+            raise ValueError("At least one level of results is needed.")
+        return cls(AliasSampler.from_results(results))
+
+    @classmethod
+    def from_values(cls, values, probabilities):
+        """
+        Build the distribution from exact outcome probabilities.
+
+        Args:
+            values (array-like): Round results in units.
+            probabilities (array-like): Their probabilities, or a row per level.
+
+        Returns:
+            OutcomeDistribution: The distribution.
+        """
+        return cls(AliasSampler(values, probabilities))
+
+    @classmethod
+    def from_simulation(cls, rules=None, rounds=50000, seed=0, decisions=None):
+        """
+        Record the distribution by playing the game at every level.
+
+        Every level replays the same card sequence, so the levels only differ
+        where a short bankroll changes the play.
+
+        Args:
+            rules (Rules, optional): The table rules. Defaults to Rules().
+            rounds (int, optional): Rounds recorded per level. Defaults to 50000.
+            seed (int, optional): Seed of the card sequence. Defaults to 0.
+            decisions (DecisionTables, optional): Surrender and insurance
+                                                  decisions. Defaults to None.
+
+        Returns:
+            OutcomeDistribution: The recorded distribution.
+        """
+        rules = rules if rules is not None else Rules()
+        # The most a round can take: every split hand doubled
+        spare_levels = 2 * rules.max_split_hands - 1
+        results = []
+        for spare in range(spare_levels + 1):
+            simulation = Simulation(1.0, seed, rules, decisions)
+            balance = None if spare == spare_levels else 1.0 + spare
+            results.append(simulation.round_results(rounds, balance))
+        return cls.from_results(results)
+
+    @property
+    def levels(self):
+        """
+        Get the number of levels.
+
+        Returns:
+            int: Levels, the last being the unlimited game.
+        """
+        return len(self.probabilities)
+
+    def n0(self):
+        """
+        Get N0, the rounds after which the expected result equals one
+        standard deviation.
+
+        Returns:
+            float: (sd / mean)^2 rounds, or infinity for a zero mean.
+        """
+        if self.mean == 0:
+            return math.inf
+        return (self.sd / self.mean) ** 2
+
+    def sample(self, levels, rng):
+        """
+        Draw one round result per trajectory.
+
+        Args:
+            levels (numpy.ndarray): Level of each trajectory.
+            rng (numpy.random.Generator): Random generator.
+
+        Returns:
+            numpy.ndarray: A result per trajectory.
+        """
+        return self.sampler.sample(len(levels), rng, levels)
+
+
+class BankrollSimulator:
+    """
+    Simulates many independent bankroll trajectories at once with NumPy.
+
+    Each trajectory flat bets one unit per round and draws its result from an
+    OutcomeDistribution at the level its current bankroll allows. A
+    trajectory is ruined once it cannot cover the next bet.
+
+    Attributes:
+        distribution (OutcomeDistribution): Round results by spare bankroll.
+        bankroll (float): Starting bankroll in units.
+        hands_per_hour (int): Rounds per hour.
+    """
+
+    def __init__(self, distribution, bankroll=100.0, hands_per_hour=100):
+        """
+        Initialize the simulator.
+
+        Args:
+            distribution (OutcomeDistribution or AliasSampler): Round results
+                                                               by spare bankroll.
+            bankroll (float, optional): Starting bankroll in units. Defaults to 100.
+            hands_per_hour (int, optional): Rounds per hour. Defaults to 100.
+        """
+        if bankroll < 1:
+            raise ValueError("The bankroll must cover at least one bet.")
+        if isinstance(distribution, AliasSampler):
+            distribution = OutcomeDistribution(distribution)
+        self.distribution = distribution
+        self.bankroll = bankroll
+        self.hands_per_hour = hands_per_hour
+
+    def run(self, hours=100, trajectories=100000, seed=None):
+        """
+        Simulate the trajectories.
+
+        Args:
+            hours (float, optional): Hours of play. Defaults to 100.
+            trajectories (int, optional): Independent bankrolls. Defaults to 100000.
+            seed (int, optional): Seed for a reproducible run. Defaults to None.
+
+        Returns:
+            dict: Risk of ruin, the distributions of time to ruin and of the
+                  final bankroll, N0 and the analytic risk of ruin.
+        """
+        rng = np.random.default_rng(seed)
+        distribution = self.distribution
+        rounds = int(hours * self.hands_per_hour)
+        top_level = distribution.levels - 1
+
+        bankroll = np.full(trajectories, float(self.bankroll))
+        ruined_at = np.full(trajectories, -1, dtype=np.int64)
+        alive = np.arange(trajectories)
+
+        for round_number in range(rounds):
+            if len(alive) == 0:
+                break
+            current = bankroll[alive]
+            # Spare units beyond the one-unit bet decide what can be afforded
+            levels = np.minimum(np.floor(current).astype(np.intp) - 1, top_level)
+            current += distribution.sample(levels, rng)
+            bankroll[alive] = current
+
+            broke = current < 1.0
+            if broke.any():
+                ruined_at[alive[broke]] = round_number + 1
+                alive = alive[~broke]
+
+        ruined = ruined_at >= 0
+        ruin_rounds = ruined_at[ruined]
+        percentiles = [5, 25, 50, 75, 95]
+        return {
+            "trajectories": trajectories,
+            "rounds": rounds,
+            "risk_of_ruin": float(ruined.mean()),
+            "time_to_ruin": {
+                "mean_hours": (
+                    float(ruin_rounds.mean() / self.hands_per_hour)
+                    if len(ruin_rounds)
+                    else None
+                ),
+                "percentiles_hours": (
+                    dict(
+                        zip(
+                            percentiles,
+                            (
+                                np.percentile(ruin_rounds, percentiles)
+                                / self.hands_per_hour
+                            ).tolist(),
+                        )
+                    )
+                    if len(ruin_rounds)
+                    else {}
+                ),
+            },
+            "final_bankroll": {
+                "mean": float(bankroll.mean()),
+                "sd": float(bankroll.std()),
+                "percentiles": dict(
+                    zip(percentiles, np.percentile(bankroll, percentiles).tolist())
+                ),
+            },
+            "ev_per_round": distribution.mean,
+            "sd_per_round": distribution.sd,
+            "n0": distribution.n0(),
+            "analytic_risk_of_ruin": self.analytic_risk_of_ruin(),
+        }
+
+    def analytic_risk_of_ruin(self):
+        """
+        Get the lifetime risk of ruin from the diffusion approximation.
+
+        Returns:
+            float: exp(-2 * mean * bankroll / variance), or 1 without an edge.
+        """
+        mean = self.distribution.mean
+        if mean <= 0:
+            return 1.0
+        return math.exp(-2.0 * mean * self.bankroll / self.distribution.sd**2)
+
+
+if __name__ == "__main__":
+    distribution = OutcomeDistribution.from_simulation(rounds=20000)
+    for units in (50, 200):
+        result = BankrollSimulator(distribution, bankroll=units).run(
+            hours=50, trajectories=100000, seed=0
+        )
+        print(
+            f"Bankroll {units} units: risk of ruin {result['risk_of_ruin']:.2%} "
+            f"in 50 hours, median final bankroll "
+            f"{result['final_bankroll']['percentiles'][50]:.1f} units, "
+            f"N0 {result['n0']:.0f} rounds"
+        )
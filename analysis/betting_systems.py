@@ -0,0 +1,412 @@
+import math
+import numpy as np
+from simulation import Simulation
+
+
+class BettingSystem:
+    """
+    A betting system written as a small state machine.
+
+    The system is in one of a few states, each with a bet in units. A win
+    moves it to `on_win[state]`, a loss to `on_loss[state]`, and a push
+    leaves it where it is, which covers the usual progressions (Martingale,
+    Paroli, 1-3-2-6, D'Alembert, Fibonacci). Systems that bet a share of the
+    current bankroll, such as fractional Kelly, set `bankroll_fraction`
+    instead.
+
+    Attributes:
+        name (str): The system's name.
+        steps (list): Bet in units for each state.
+        on_win (list): Next state after a win, per state.
+        on_loss (list): Next state after a loss, per state.
+        bankroll_fraction (float): Share of the bankroll to bet each round, or
+                                   0 to bet from steps.
+    """
+
+    def __init__(
+        self, name, steps=(1,), on_win=None, on_loss=None, bankroll_fraction=0.0
+    ):
+        """
+        Initialize a betting system.
+
+        Args:
+            name (str): The system's name.
+            steps (sequence, optional): Bet in units per state. Defaults to (1,).
+            on_win (sequence, optional): Next state after a win. Defaults to
+                                         returning to state 0.
+            on_loss (sequence, optional): Next state after a loss. Defaults to
+                                          returning to state 0.
+            bankroll_fraction (float, optional): Share of the bankroll to bet.
+                                                 Defaults to 0.
+        """
+        self.name = name
+        self.steps = [float(step) for step in steps]
+        self.on_win = list(on_win) if on_win is not None else [0] * len(self.steps)
+        self.on_loss = list(on_loss) if on_loss is not None else [0] * len(self.steps)
+        if not len(self.steps) == len(self.on_win) == len(self.on_loss):
+            raise ValueError(f"{name}: steps, on_win and on_loss must match in length.")
+        for state in self.on_win + self.on_loss:
+            if not 0 <= state < len(self.steps):
+                raise ValueError(f"{name}: next state {state} does not exist.")
+        self.bankroll_fraction = max(float(bankroll_fraction), 0.0)
+
+    @classmethod
+    def flat(cls):
+        """Bet one unit every round."""
+        return cls("Flat")
+
+    @classmethod
+    def martingale(cls, max_doubles=8):
+        """
+        Double after every loss and go back to one unit after a win.
+
+        Args:
+            max_doubles (int, optional): Losses in a row after which the bet
+                                         stops growing. Defaults to 8.
+        """
+        n = max_doubles + 1
+        return cls(
+            "Martingale",
+            [2**i for i in range(n)],
+            on_loss=[min(i + 1, n - 1) for i in range(n)],
+        )
+
+    @classmethod
+    def paroli(cls, wins=3):
+        """
+        Double after every win and go back to one unit after `wins` wins in a
+        row or a loss.
+
+        Args:
+            wins (int, optional): Wins in a row before resetting. Defaults to 3.
+        """
+        return cls(
+            "Paroli",
+            [2**i for i in range(wins)],
+            on_win=[(i + 1) % wins for i in range(wins)],
+        )
+
+    @classmethod
+    def one_three_two_six(cls):
+        """Bet 1, 3, 2 then 6 units on a run of wins, resetting on a loss."""
+        return cls("1-3-2-6", [1, 3, 2, 6], on_win=[1, 2, 3, 0])
+
+    @classmethod
+    def dalembert(cls, max_units=20):
+        """
+        Add a unit after a loss and take one off after a win.
+
+        Args:
+            max_units (int, optional): Largest bet in units. Defaults to 20.
+        """
+        return cls(
+            "D'Alembert",
+            range(1, max_units + 1),
+            on_win=[max(i - 1, 0) for i in range(max_units)],
+            on_loss=[min(i + 1, max_units - 1) for i in range(max_units)],
+        )
+
+    @classmethod
+    def fibonacci(cls, max_steps=12):
+        """
+        Move one step up the Fibonacci sequence after a loss and two steps
+        down after a win.
+
+        Args:
+            max_steps (int, optional): Length of the sequence. Defaults to 12.
+        """
+        sequence = [1, 1]
+        while len(sequence) < max_steps:
+            sequence.append(sequence[-1] + sequence[-2])
+        sequence = sequence[:max_steps]
+        return cls(
+            "Fibonacci",
+            sequence,
+            on_win=[max(i - 2, 0) for i in range(max_steps)],
+            on_loss=[min(i + 1, max_steps - 1) for i in range(max_steps)],
+        )
+
+    @classmethod
+    def kelly(cls, fraction, edge, variance):
+        """
+        Bet a fraction of the Kelly bet, edge / variance of the bankroll.
+
+        Args:
+            fraction (float): Share of full Kelly, e.g. 0.5 for half Kelly.
+            edge (float): Expected result per unit bet.
+            variance (float): Variance of the result per unit bet.
+
+        Returns:
+            BettingSystem: The system. Without an edge Kelly bets nothing, so
+                           the table minimum is bet instead.
+        """
+        return cls(
+            f"Kelly x{fraction:g}",
+            bankroll_fraction=fraction * max(edge, 0.0) / variance,
+        )
+
+
+def default_systems(edge=0.01, variance=1.33):
+    """
+    Build the common betting systems.
+
+    Args:
+        edge (float, optional): Player edge per unit bet used to size the
+                                Kelly bets. Defaults to a counter's 1%.
+        variance (float, optional): Variance per unit bet. Defaults to 1.33.
+
+    Returns:
+        list: BettingSystem objects.
+    """
+    return [
+        BettingSystem.flat(),
+        BettingSystem.martingale(),
+        BettingSystem.paroli(),
+        BettingSystem.one_three_two_six(),
+        BettingSystem.dalembert(),
+        BettingSystem.fibonacci(),
+        BettingSystem.kelly(1.0, edge, variance),
+        BettingSystem.kelly(0.5, edge, variance),
+        BettingSystem.kelly(0.25, edge, variance),
+    ]
+
+
+class BettingSystemEvaluator:
+    """
+    Compares betting systems over one recorded stream of round outcomes.
+
+    A round's result per unit bet (including doubles and splits) does not
+    depend on how much was bet, so the game is played once at a flat unit
+    and every system replays the same stream. The stream is cut into
+    sessions and all systems and sessions advance together as NumPy arrays,
+    one round at a time, so comparing twenty systems costs about as much as
+    a single simulation.
+
+    Every system sees the same cards, which also makes the comparison much
+    sharper than separate runs. The stream is recorded with an unlimited
+    bankroll, so a session near its end can still double or split on it;
+    losses are capped at what is left.
+
+    Attributes:
+        outcomes (numpy.ndarray): Net result of every round per unit bet.
+        bankroll (float): Starting bankroll of every session.
+        session_rounds (int): Most rounds in a session.
+        table_min (float): Smallest bet allowed; one betting unit.
+        table_max (float): Largest bet allowed.
+        stop_loss (float): Loss at which a session stops, or None.
+        win_goal (float): Win at which a session stops, or None.
+    """
+
+    def __init__(
+        self,
+        outcomes,
+        bankroll=100.0,
+        session_rounds=500,
+        table_min=1.0,
+        table_max=None,
+        stop_loss=None,
+        win_goal=None,
+    ):
+        """
+        Initialize the evaluator.
+
+        Args:
+            outcomes (array-like): Net result of every round per unit bet.
+            bankroll (float, optional): Starting bankroll. Defaults to 100.
+            session_rounds (int, optional): Most rounds in a session. Defaults
+                                            to 500.
+            table_min (float, optional): Smallest bet, also the betting unit.
+                                         Defaults to 1.
+            table_max (float, optional): Largest bet. Defaults to no limit.
+            stop_loss (float, optional): Stop a session after losing this
+                                         much. Defaults to playing until broke.
+            win_goal (float, optional): Stop a session after winning this
+                                        much. Defaults to no goal.
+        """
+        self.outcomes = np.asarray(outcomes, dtype=float)
+        if len(self.outcomes) < session_rounds:
+            raise ValueError("The stream is shorter than one session.")
+        if bankroll < table_min:
+            raise ValueError("The bankroll must cover the table minimum.")
+        self.bankroll = float(bankroll)
+        self.session_rounds = session_rounds
+        self.table_min = float(table_min)
+        self.table_max = float(table_max) if table_max is not None else math.inf
+        self.stop_loss = stop_loss
+        self.win_goal = win_goal
+
+    @classmethod
+    def from_simulation(
+        cls, rounds=500000, rules=None, seed=0, decisions=None, **kwargs
+    ):
+        """
+        Record an outcome stream by playing the game once.
+
+        Args:
+            rounds (int, optional): Rounds to record. Defaults to 500000.
+            rules (Rules, optional): The table rules. Defaults to Rules().
+            seed (int, optional): Seed of the card sequence. Defaults to 0.
+            decisions (DecisionTables, optional): Surrender and insurance
+                                                  decisions. Defaults to None.
+            **kwargs: Limits and stops passed on to the evaluator.
+
+        Returns:
+            BettingSystemEvaluator: The evaluator.
+        """
+        simulation = Simulation(1.0, seed, rules, decisions)
+        return cls(simulation.round_results(rounds), **kwargs)
+
+    @property
+    def sessions(self):
+        """
+        Get the number of whole sessions in the stream.
+
+        Returns:
+            int: Sessions evaluated per system.
+        """
+        return len(self.outcomes) // self.session_rounds
+
+    def evaluate(self, systems=None):
+        """
+        Play every system over every session of the stream.
+
+        Args:
+            systems (list, optional): BettingSystem objects. Defaults to
+                                      `default_systems`, with Kelly sized
+                                      from the stream's own edge.
+
+        Returns:
+            list: One row per system with the session results: mean and
+                  standard deviation of the net result, rounds played and
+                  amount wagered per session, the loss per unit wagered in
+                  percent, and how often a session went broke, reached the
+                  win goal, hit the stop loss or finished ahead.
+        """
+        if systems is None:
+            systems = default_systems(self.outcomes.mean(), self.outcomes.var())
+        count = len(systems)
+        sessions = self.sessions
+        rounds = self.session_rounds
+        outcomes = self.outcomes[: sessions * rounds].reshape(sessions, rounds)
+
+        # Pad every system's state machine to the same width
+        width = max(len(system.steps) for system in systems)
+        steps = np.zeros((count, width))
+        on_win = np.zeros((count, width), dtype=np.intp)
+        on_loss = np.zeros((count, width), dtype=np.intp)
+        for i, system in enumerate(systems):
+            n = len(system.steps)
+            steps[i, :n] = system.steps
+            on_win[i, :n] = system.on_win
+            on_loss[i, :n] = system.on_loss
+        fractions = np.array([[s.bankroll_fraction] for s in systems])
+        proportional = fractions > 0
+        rows = np.arange(count)[:, None]
+
+        start = self.bankroll
+        floor = start - self.stop_loss if self.stop_loss is not None else -math.inf
+        goal = start + self.win_goal if self.win_goal is not None else math.inf
+
+        bankroll = np.full((count, sessions), start)
+        state = np.zeros((count, sessions), dtype=np.intp)
+        active = np.ones((count, sessions), dtype=bool)
+        played = np.zeros((count, sessions), dtype=np.int64)
+        wagered = np.zeros((count, sessions))
+        broke = np.zeros((count, sessions), dtype=bool)
+        reached_goal = np.zeros((count, sessions), dtype=bool)
+        stopped = np.zeros((count, sessions), dtype=bool)
+
+        for r in range(rounds):
+            bet = np.where(
+                proportional, fractions * bankroll, self.table_min * steps[rows, state]
+            )
+            bet = np.minimum(np.clip(bet, self.table_min, self.table_max), bankroll)
+            bet[~active] = 0.0
+            # A double or split cannot lose more than the bankroll left
+            profit = np.maximum(bet * outcomes[:, r], -bankroll)
+            bankroll += profit
+            wagered += bet
+            played += active
+
+            state = np.where(
+                profit > 0,
+                on_win[rows, state],
+                np.where(profit < 0, on_loss[rows, state], state),
+            )
+
+            out = active & (bankroll < self.table_min)
+            won = active & (bankroll >= goal)
+            lost = active & (bankroll <= floor)
+            broke |= out
+            reached_goal |= won
+            stopped |= lost & ~out
+            active &= ~(out | won | lost)
+            if not active.any():
+                break
+
+        net = bankroll - start
+        total_wagered = wagered.sum(axis=1)
+        results = []
+        for i, system in enumerate(systems):
+            results.append(
+                {
+                    "system": system.name,
+                    "sessions": sessions,
+                    "mean_result": float(net[i].mean()),
+                    "sd_result": float(net[i].std()),
+                    "mean_rounds": float(played[i].mean()),
+                    "mean_wagered": float(wagered[i].mean()),
+                    "loss_per_wagered": (
+                        float(-net[i].sum() / total_wagered[i] * 100)
+                        if total_wagered[i]
+                        else 0.0
+                    ),
+                    "broke": float(broke[i].mean()),
+                    "win_goal": float(reached_goal[i].mean()),
+                    "stop_loss": float(stopped[i].mean()),
+                    "ahead": float((net[i] > 0).mean()),
+                }
+            )
+        return results
+
+
+def format_system_table(rows):
+    """
+    Format betting-system results as a text table.
+
+    Args:
+        rows (list): Output of `BettingSystemEvaluator.evaluate`.
+
+    Returns:
+        str: The formatted table, one system per line.
+    """
+    lines = [
+        f"{'System':<14} {'Mean':>8} {'SD':>8} {'Rounds':>7} {'Wagered':>9} "
+        f"{'Loss %':>7} {'Broke':>7} {'Goal':>7} {'Stop':>7} {'Ahead':>7}"
+    ]
+    for row in rows:
+        lines.append(
+            f"{row['system']:<14} {row['mean_result']:>8.2f} "
+            f"{row['sd_result']:>8.2f} {row['mean_rounds']:>7.0f} "
+            f"{row['mean_wagered']:>9.1f} {row['loss_per_wagered']:>7.3f} "
+            f"{row['broke']:>7.2%} {row['win_goal']:>7.2%} {row['stop_loss']:>7.2%} "
+            f"{row['ahead']:>7.2%}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    evaluator = BettingSystemEvaluator.from_simulation(
+        rounds=200000, bankroll=200, table_max=500, win_goal=100
+    )
+    recorded = time.perf_counter()
+    rows = evaluator.evaluate()
+    finished = time.perf_counter()
+    print(format_system_table(rows))
+    print(
+        f"Recorded the stream in {recorded - start:.1f}s, "
+        f"evaluated {len(rows)} systems in {finished - recorded:.2f}s"
+    )
@@ -0,0 +1,291 @@
+import numpy as np
+from analysis.exact import ExactEngine, ONE_DECK, VALUES, add_card
+from analysis.index_generator import DEFAULT_CELLS
+from game.counting import CountingSystem
+from game.strategy import Strategy
+
+# Rank labels for the value classes used by the exact engine
+VALUE_RANKS = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "A"]
+
+# Effect of removing one card on insurance EV: any non-ten helps, tens hurt.
+# Scaled so a full deck sums to zero.
+INSURANCE_EOR = np.array([1, 1, 1, 1, 1, 1, 1, 1, -9 / 4, 1], dtype=float)
+
+
+def _rank_value(rank):
+    """
+    Convert a rank label to its card value.
+
+    Args:
+        rank (str): The rank ('2', ..., '10', 'J', 'Q', 'K', 'A').
+
+    Returns:
+        int: The card value (11 for an ace).
+    """
+    if rank == "A":
+        return 11
+    if rank in ("J", "Q", "K"):
+        return 10
+    return int(rank)
+
+
+def tag_vector(system):
+    """
+    Convert a counting system to a tag per value class.
+
+    Args:
+        system: A CountingSystem, a rank -> tag dict, or a sequence of 10 tags
+                (2-9, ten, ace) or 13 tags (2-10, J, Q, K, A).
+
+    Returns:
+        numpy.ndarray: Ten tags indexed like VALUES.
+    """
+    if isinstance(system, CountingSystem):
+        system = system.tags
+    if isinstance(system, dict):
+        return np.array([system[rank] for rank in VALUE_RANKS], dtype=float)
+
+    tags = np.asarray(system, dtype=float)
+    if tags.shape == (13,):
+        # Average the four ten-valued ranks into one class
+        return np.concatenate([tags[:8], [tags[8:12].mean()], tags[12:]])
+    if tags.shape != (10,):
+        raise ValueError("A tag vector needs 10 or 13 entries.")
+    return tags
+
+
+class CountSystemEvaluator:
+    """
+    Scores counting systems against effects of removal from the exact engine.
+
+    Effects of removal (EORs) are computed once: the change in expectation
+    when a single card of each value is removed from the shoe, both for the
+    whole round under basic strategy and for each candidate strategy play.
+    Any number of tag vectors can then be scored with a few matrix products.
+
+    Attributes:
+        num_decks (int): Decks in the reference shoe.
+        base_ev (float): Round expectation of the full shoe under basic strategy.
+        eor (numpy.ndarray): Round EOR per value class.
+        play_eor (numpy.ndarray): EOR of each play's EV difference, one row
+                                  per play.
+        play_weights (numpy.ndarray): Importance of each play.
+        weights (numpy.ndarray): Cards of each value class per deck.
+    """
+
+    def __init__(self, num_decks=1, plays=None, strategy=None, **engine_kwargs):
+        """
+        Initialize the evaluator and compute all effects of removal.
+
+        Args:
+            num_decks (int, optional): Decks in the reference shoe. Defaults to 1.
+            plays (list, optional): Plays as (player cards, upcard, action,
+                                    alternative). Defaults to the index
+                                    generator's DEFAULT_CELLS.
+            strategy (Strategy, optional): Strategy for the round EORs.
+                                           Defaults to basic strategy.
+            **engine_kwargs: Rule options passed to ExactEngine.
+        """
+        self.num_decks = num_decks
+        self.plays = list(plays) if plays is not None else DEFAULT_CELLS
+        strategy = strategy if strategy is not None else Strategy()
+        self.weights = np.array(ONE_DECK, dtype=float)
+
+        full = [count * num_decks for count in ONE_DECK]
+        compositions = [full]
+        for i in range(len(VALUES)):
+            removed = list(full)
+            removed[i] -= 1
+            compositions.append(removed)
+
+        round_evs = []
+        play_diffs = []
+        for composition in compositions:
+            engine = ExactEngine(composition, strategy=strategy, **engine_kwargs)
+            round_evs.append(engine.round_ev())
+            optimal = ExactEngine(composition, **engine_kwargs)
+            play_diffs.append([self._play_difference(optimal, p) for p in self.plays])
+
+        round_evs = np.array(round_evs)
+        play_diffs = np.array(play_diffs)
+        self.base_ev = round_evs[0]
+        self.eor = round_evs[1:] - round_evs[0]
+        self.play_eor = (play_diffs[1:] - play_diffs[0]).T
+
+        # Weight plays by how often they arise and how strongly they move
+        p = self.weights / self.weights.sum()
+        frequencies = np.array([self._play_frequency(play, p) for play in self.plays])
+        sensitivity = np.sqrt((self.play_eor**2) @ p)
+        self.play_weights = frequencies * sensitivity
+
+    @staticmethod
+    def _play_difference(engine, play):
+        """
+        Get EV(action) - EV(alternative) for a play.
+
+        Args:
+            engine (ExactEngine): Engine for the composition.
+            play (tuple): (player cards, upcard, action, alternative).
+
+        Returns:
+            float: The EV difference in units.
+        """
+        player_ranks, upcard_rank, action, alternative = play
+        first, second = (_rank_value(rank) for rank in player_ranks)
+        total, soft = add_card(*add_card(0, False, first), second)
+        pair_value = first if first == second else None
+        upcard = _rank_value(upcard_rank)
+        return engine.action_ev(
+            total, soft, pair_value, upcard, action
+        ) - engine.action_ev(total, soft, pair_value, upcard, alternative)
+
+    @staticmethod
+    def _play_frequency(play, p):
+        """
+        Get the probability of being dealt a play's starting position.
+
+        Args:
+            play (tuple): (player cards, upcard, action, alternative).
+            p (numpy.ndarray): Probability of each value class.
+
+        Returns:
+            float: The probability of the two cards and upcard.
+        """
+        player_ranks, upcard_rank, _, _ = play
+        first, second = (VALUES.index(_rank_value(rank)) for rank in player_ranks)
+        upcard = VALUES.index(_rank_value(upcard_rank))
+        orderings = 1 if first == second else 2
+        return orderings * p[first] * p[second] * p[upcard]
+
+    def _correlation(self, tags, effects):
+        """
+        Weighted correlation of every tag vector with every effect vector.
+
+        Args:
+            tags (numpy.ndarray): Tag vectors, shape (systems, 10).
+            effects (numpy.ndarray): Effect vectors, shape (effects, 10).
+
+        Returns:
+            numpy.ndarray: Correlations, shape (systems, effects).
+        """
+        w = self.weights / self.weights.sum()
+        tags = tags - (tags @ w)[:, None]
+        effects = effects - (effects @ w)[:, None]
+        covariance = (tags * w) @ effects.T
+        tag_norm = np.sqrt((tags**2) @ w)
+        effect_norm = np.sqrt((effects**2) @ w)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            correlation = covariance / np.outer(tag_norm, effect_norm)
+        return np.nan_to_num(correlation)
+
+    def tag_matrix(self, systems):
+        """
+        Stack systems into a tag matrix.
+
+        Args:
+            systems (list): Systems accepted by `tag_vector`.
+
+        Returns:
+            numpy.ndarray: Tag vectors, shape (systems, 10).
+        """
+        return np.array([tag_vector(system) for system in systems])
+
+    def betting_correlation(self, tags):
+        """
+        Correlation between each tag vector and the round EORs.
+
+        Args:
+            tags (numpy.ndarray): Tag vectors, shape (systems, 10).
+
+        Returns:
+            numpy.ndarray: Betting correlation per system.
+        """
+        return self._correlation(tags, self.eor[None, :])[:, 0]
+
+    def insurance_correlation(self, tags):
+        """
+        Correlation between each tag vector and the insurance EORs.
+
+        Args:
+            tags (numpy.ndarray): Tag vectors, shape (systems, 10).
+
+        Returns:
+            numpy.ndarray: Insurance correlation per system.
+        """
+        return self._correlation(tags, INSURANCE_EOR[None, :])[:, 0]
+
+    def playing_efficiency(self, tags):
+        """
+        Importance-weighted mean absolute correlation with the play EORs.
+
+        The sign of a play's correlation only decides whether its index is
+        positive or negative, so the absolute value is used.
+
+        Args:
+            tags (numpy.ndarray): Tag vectors, shape (systems, 10).
+
+        Returns:
+            numpy.ndarray: Playing efficiency per system.
+        """
+        correlation = np.abs(self._correlation(tags, self.play_eor))
+        return correlation @ self.play_weights / self.play_weights.sum()
+
+    def evaluate(self, systems, names=None):
+        """
+        Score systems on betting correlation, playing efficiency and
+        insurance correlation.
+
+        Args:
+            systems (list): Systems accepted by `tag_vector`.
+            names (list, optional): Display names. Defaults to each
+                                    CountingSystem's name or its position.
+
+        Returns:
+            list: One dict per system with its name and three scores.
+        """
+        systems = list(systems)
+        if names is None:
+            names = [
+                system.name if isinstance(system, CountingSystem) else f"#{i}"
+                for i, system in enumerate(systems)
+            ]
+        tags = self.tag_matrix(systems)
+        betting = self.betting_correlation(tags)
+        playing = self.playing_efficiency(tags)
+        insurance = self.insurance_correlation(tags)
+        return [
+            {
+                "name": names[i],
+                "betting_correlation": float(betting[i]),
+                "playing_efficiency": float(playing[i]),
+                "insurance_correlation": float(insurance[i]),
+            }
+            for i in range(len(systems))
+        ]
+
+    def rank(self, systems, key="betting_correlation", names=None):
+        """
+        Evaluate systems and sort them best first.
+
+        Args:
+            systems (list): Systems accepted by `tag_vector`.
+            key (str, optional): Score to sort by. Defaults to betting correlation.
+            names (list, optional): Display names.
+
+        Returns:
+            list: Evaluation rows sorted by the chosen score.
+        """
+        rows = self.evaluate(systems, names)
+        return sorted(rows, key=lambda row: row[key], reverse=True)
+
+
+if __name__ == "__main__":
+    from game.counting import SYSTEMS
+
+    evaluator = CountSystemEvaluator()
+    print(f"{'System':<14} {'BC':>6} {'PE':>6} {'IC':>6}")
+    for row in evaluator.rank(list(SYSTEMS.values())):
+        print(
+            f"{row['name']:<14} {row['betting_correlation']:>6.3f} "
+            f"{row['playing_efficiency']:>6.3f} {row['insurance_correlation']:>6.3f}"
+        )
@@ -0,0 +1,277 @@
+import numpy as np
+from analysis.exact import ExactEngine, VALUES, add_card
+from game.rules import Rules
+from game.strategy import Strategy
+
+# Share of ten-valued cards in a full shoe
+TEN_SHARE = 16 / 52
+
+
+def _hand_key(first, second):
+    """
+    Classify a two-card starting hand like Strategy.hand_key.
+
+    Args:
+        first (int): Value of the first card (11 for an ace).
+        second (int): Value of the second card.
+
+    Returns:
+        tuple: ("pair", rank), ("soft", total) or ("hard", total).
+    """
+    if first == second:
+        return ("pair", "A" if first == 11 else str(first))
+    total, soft = add_card(*add_card(0, False, first), second)
+    return ("soft" if soft else "hard", total)
+
+
+class DecisionTables:
+    """
+    Exact precomputed EV tables for late surrender, insurance and even money.
+
+    Everything is computed once from the exact engine, so each decision during
+    play is a single table lookup:
+
+    - surrender: the EV of playing each two-card hand class against each
+      upcard, compared with the value of surrendering it.
+    - insurance: the EV of a unit insurance bet for every possible number of
+      unseen tens and unseen cards in the shoe, so a finite shoe insures
+      exactly when its composition makes insurance pay.
+
+    A Game uses the tables through `should_surrender`, `should_insure` and
+    `should_take_even_money`; the policies allow measuring misplays such as
+    always insuring.
+
+    Attributes:
+        rules (Rules): The rules the tables were computed for.
+        insurance (str): Insurance policy: "exact", "always" or "never".
+        even_money (str): Even money policy: "exact", "always" or "never".
+        surrender (str): Surrender policy: "exact", "strategy" or "never".
+        play_ev (dict): (hand key, dealer key) -> EV of playing on.
+        surrender_ev (dict): Dealer key -> EV of surrendering.
+        surrender_table (dict): (hand key, dealer key) -> True to surrender.
+        insurance_ev (numpy.ndarray): EV per unit insured, indexed by
+                                      [unseen tens, unseen cards].
+        base_insurance_ev (float): EV per unit insured from a full shoe.
+    """
+
+    INSURANCE_POLICIES = ("exact", "always", "never")
+    SURRENDER_POLICIES = ("exact", "strategy", "never")
+
+    def __init__(
+        self,
+        rules=None,
+        strategy=None,
+        insurance="exact",
+        even_money=None,
+        surrender="exact",
+    ):
+        """
+        Initialize and precompute the tables.
+
+        Args:
+            rules (Rules, optional): The table rules. Defaults to Rules().
+            strategy (Strategy, optional): Strategy the hand is played with if
+                                           not surrendered. Defaults to basic
+                                           strategy.
+            insurance (str, optional): Insurance policy. Defaults to "exact".
+            even_money (str, optional): Even money policy. Defaults to the
+                                        insurance policy.
+            surrender (str, optional): Surrender policy. Defaults to "exact".
+        """
+        even_money = even_money if even_money is not None else insurance
+        if insurance not in self.INSURANCE_POLICIES:
+            raise ValueError(f"Unknown insurance policy: {insurance}")
+        if even_money not in self.INSURANCE_POLICIES:
+            raise ValueError(f"Unknown even money policy: {even_money}")
+        if surrender not in self.SURRENDER_POLICIES:
+            raise ValueError(f"Unknown surrender policy: {surrender}")
+
+        self.rules = rules if rules is not None else Rules()
+        self.strategy = strategy if strategy is not None else Strategy()
+        self.insurance = insurance
+        self.even_money = even_money
+        self.surrender = surrender
+
+        self.engine = ExactEngine(
+            hit_soft_17=self.rules.hit_soft_17,
+            blackjack_payout=self.rules.blackjack_payout,
+            double_after_split=self.rules.double_after_split,
+            dealer_peek=self.rules.dealer_peek,
+            strategy=self.strategy,
+        )
+        self._build_surrender_tables()
+        self._build_insurance_table()
+
+    def _build_surrender_tables(self):
+        """Compute the play and surrender EVs of every hand class and upcard."""
+        self.play_ev = {}
+        self.surrender_ev = {}
+        self.surrender_table = {}
+
+        for upcard in VALUES:
+            dealer_key = "A" if upcard == 11 else upcard
+            dealer_natural = self.engine.dealer_blackjack_probability(upcard)
+            if self.rules.dealer_peek:
+                # Surrender is only offered once the dealer has no natural
+                surrender = -0.5
+            else:
+                surrender = -0.5 * (1.0 - dealer_natural) - dealer_natural
+            self.surrender_ev[dealer_key] = surrender
+
+            for i, first in enumerate(VALUES):
+                for second in VALUES[i:]:
+                    if first + second == 21:
+                        continue  # A natural is never surrendered
+                    key = (_hand_key(first, second), dealer_key)
+                    if key in self.play_ev:
+                        continue
+                    play = self.engine.hand_ev(first, second, upcard)
+                    self.play_ev[key] = play
+                    self.surrender_table[key] = surrender > play
+
+    def _build_insurance_table(self):
+        """Compute the insurance EV for every unseen composition of the shoe."""
+        self.base_insurance_ev = 3.0 * TEN_SHARE - 1.0
+
+        num_decks = self.rules.num_decks or 0
+        tens = np.arange(16 * num_decks + 1, dtype=float)[:, None]
+        cards = np.arange(52 * num_decks + 1, dtype=float)[None, :]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # Insurance pays 2:1 when the hole card is a ten
+            ev = 3.0 * tens / cards - 1.0
+        ev[~np.isfinite(ev) | (tens > cards)] = -1.0
+        self.insurance_ev = ev
+
+    def insurance_value(self, deck):
+        """
+        Get the EV of a unit insurance bet given what the player has seen.
+
+        Args:
+            deck (Deck or Shoe): The card source being dealt from.
+
+        Returns:
+            float: EV per unit insured.
+        """
+        unseen = deck.unseen_tens()
+        if unseen is None or self.insurance_ev.shape[0] <= unseen[0]:
+            return self.base_insurance_ev
+        tens, cards = unseen
+        if cards >= self.insurance_ev.shape[1]:
+            return self.base_insurance_ev
+        return self.insurance_ev[tens, cards]
+
+    def should_insure(self, deck):
+        """
+        Decide whether to take insurance against a dealer ace.
+
+        Args:
+            deck (Deck or Shoe): The card source being dealt from.
+
+        Returns:
+            bool: True to insure.
+        """
+        if self.insurance == "exact":
+            return self.insurance_value(deck) > 0.0
+        return self.insurance == "always"
+
+    def should_take_even_money(self, deck):
+        """
+        Decide whether to take even money on a natural against a dealer ace.
+
+        Args:
+            deck (Deck or Shoe): The card source being dealt from.
+
+        Returns:
+            bool: True to take even money.
+        """
+        if self.even_money == "exact":
+            ten = (self.insurance_value(deck) + 1.0) / 3.0
+            return 1.0 > self.rules.blackjack_payout * (1.0 - ten)
+        return self.even_money == "always"
+
+    def should_surrender(self, hand, upcard):
+        """
+        Decide whether to surrender a starting hand.
+
+        Args:
+            hand (Hand): The player's two-card hand.
+            upcard (Card): The dealer's face-up card.
+
+        Returns:
+            bool: True to surrender.
+        """
+        if self.surrender == "never" or len(hand.cards) != 2:
+            return False
+        if self.surrender == "strategy":
+            return self.strategy.should_surrender(hand, upcard)
+        key = (Strategy.hand_key(hand), Strategy.dealer_key(upcard))
+        return self.surrender_table.get(key, False)
+
+    def option_values(self):
+        """
+        Get how much each option moves the house edge, computed exactly for a
+        full shoe under the infinite deck approximation.
+
+        Returns:
+            dict: Change in the player's expectation per initial bet, in
+                  percent, for surrendering by the exact table, surrendering
+                  by the strategy's table, always insuring and always taking
+                  even money. A negative value adds to the house edge.
+        """
+        p = self.engine.probabilities
+        ten = p[VALUES.index(10)]
+        ace = p[VALUES.index(11)]
+        exact_surrender = 0.0
+        strategy_surrender = 0.0
+
+        for u, upcard in enumerate(VALUES):
+            dealer_key = "A" if upcard == 11 else upcard
+            reach = 1.0
+            if self.rules.dealer_peek:
+                reach -= self.engine.dealer_blackjack_probability(upcard)
+            surrender = self.surrender_ev[dealer_key]
+            for i, first in enumerate(VALUES):
+                for j, second in enumerate(VALUES):
+                    if first + second == 21:
+                        continue
+                    hand_key = _hand_key(first, second)
+                    gain = surrender - self.play_ev[(hand_key, dealer_key)]
+                    weight = p[u] * p[i] * p[j] * reach
+                    if gain > 0:
+                        exact_surrender += weight * gain
+                    if self._strategy_surrenders(hand_key, dealer_key):
+                        strategy_surrender += weight * gain
+
+        natural = 2.0 * ten * ace
+        always_insure = ace * (1.0 - natural) * 0.5 * (3.0 * ten - 1.0)
+        always_even_money = (
+            ace * natural * (1.0 - self.rules.blackjack_payout * (1.0 - ten))
+        )
+        return {
+            "late_surrender": exact_surrender * 100,
+            "strategy_surrender": strategy_surrender * 100,
+            "always_insure": always_insure * 100,
+            "always_even_money": always_even_money * 100,
+        }
+
+    def _strategy_surrenders(self, hand_key, dealer_key):
+        """
+        Check whether the strategy's surrender table covers a hand class.
+
+        Args:
+            hand_key (tuple): Hand class (see Strategy.hand_key).
+            dealer_key: The dealer's upcard key.
+
+        Returns:
+            bool: True if the strategy surrenders the hand.
+        """
+        upcards = self.strategy.surrender_strategy.get(hand_key)
+        return upcards is not None and dealer_key in upcards
+
+
+if __name__ == "__main__":
+    for rules in (Rules(), Rules(hit_soft_17=False), Rules(blackjack_payout=1.2)):
+        values = DecisionTables(rules).option_values()
+        print(rules.describe())
+        for option, value in values.items():
+            print(f"  {option:<20} {value:+.3f}%")
@@ -0,0 +1,412 @@
+from game.strategy import Strategy
+
+# Card values indexed 0-9: 2, 3, ..., 9, 10 (all ten-valued ranks), ace (11)
+VALUES = [2, 3, 4, 5, 6, 7, 8, 9, 10, 11]
+
+# Cards of each value in one 52-card deck
+ONE_DECK = [4, 4, 4, 4, 4, 4, 4, 4, 16, 4]
+
+# Slots of a dealer outcome distribution: final 17-21, bust, blackjack
+DEALER_OUTCOMES = ["17", "18", "19", "20", "21", "bust", "blackjack"]
+BUST = 5
+BLACKJACK = 6
+
+
+def add_card(total, soft, value):
+    """
+    Add a card to a hand summarised by its total and softness.
+
+    Args:
+        total (int): The current best total.
+        soft (bool): Whether an ace is currently counted as 11.
+        value (int): The card value (11 for an ace).
+
+    Returns:
+        tuple: (total, soft) after the card is added.
+    """
+    if value == 11 and total + 11 <= 21:
+        return total + 11, True
+    total += 1 if value == 11 else value
+    if total > 21 and soft:
+        return total - 10, False
+    return total, soft
+
+
+class ExactEngine:
+    """
+    Computes exact blackjack expectations for a given shoe composition.
+
+    Cards are drawn with the probabilities of the composition (the infinite
+    deck approximation of that composition), so every expectation is an exact
+    weighted sum rather than a simulation. Player hands are summarised by
+    total and softness, and split hands are not resplit.
+
+    Attributes:
+        composition (list): Cards of each value, indexed like VALUES.
+        probabilities (list): Probability of drawing each value.
+        hit_soft_17 (bool): Whether the dealer hits soft 17.
+        blackjack_payout (float): Amount won per unit on a natural.
+        double_after_split (bool): Whether split hands may double.
+        dealer_peek (bool): Whether the dealer checks for blackjack first.
+        strategy (Strategy): Fixed strategy to follow, or None for optimal play.
+    """
+
+    def __init__(
+        self,
+        composition=None,
+        hit_soft_17=True,
+        blackjack_payout=1.5,
+        double_after_split=True,
+        dealer_peek=True,
+        strategy=None,
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            composition (list, optional): Cards of each value. Defaults to the
+                                          proportions of a full deck.
+            hit_soft_17 (bool, optional): Dealer hits soft 17. Defaults to True.
+            blackjack_payout (float, optional): Natural payout. Defaults to 1.5.
+            double_after_split (bool, optional): Allow doubling after splits.
+                                                 Defaults to True.
+            dealer_peek (bool, optional): Dealer peeks for blackjack.
+                                          Defaults to True.
+            strategy (Strategy, optional): Fixed strategy to evaluate. Defaults
+                                           to None, which plays optimally.
+        """
+        self.composition = list(composition) if composition else list(ONE_DECK)
+        total = float(sum(self.composition))
+        self.probabilities = [count / total for count in self.composition]
+        self.hit_soft_17 = hit_soft_17
+        self.blackjack_payout = blackjack_payout
+        self.double_after_split = double_after_split
+        self.dealer_peek = dealer_peek
+        self.strategy = strategy
+
+        self._draws = [
+            (value, p) for value, p in zip(VALUES, self.probabilities) if p > 0
+        ]
+        self._dealer_memo = {}
+        self._distribution_memo = {}
+        self._hit_memo = {}
+
+    # Dealer
+
+    def _dealer_from(self, total, soft):
+        """
+        Get the final outcome distribution of a dealer hand in progress.
+
+        Args:
+            total (int): The dealer's total.
+            soft (bool): Whether the dealer's total is soft.
+
+        Returns:
+            list: Probabilities over DEALER_OUTCOMES.
+        """
+        key = (total, soft)
+        if key in self._dealer_memo:
+            return self._dealer_memo[key]
+
+        outcome = [0.0] * len(DEALER_OUTCOMES)
+        if total > 21:
+            outcome[BUST] = 1.0
+        elif total > 17 or (total == 17 and not (soft and self.hit_soft_17)):
+            outcome[total - 17] = 1.0
+        else:
+            for value, p in self._draws:
+                sub = self._dealer_from(*add_card(total, soft, value))
+                for i in range(len(outcome)):
+                    outcome[i] += p * sub[i]
+
+        self._dealer_memo[key] = outcome
+        return outcome
+
+    def dealer_distribution(self, upcard):
+        """
+        Get the dealer's final outcome distribution for an upcard.
+
+        With dealer peek the distribution is conditioned on the dealer not
+        having blackjack, since a natural ends the round before play.
+
+        Args:
+            upcard (int): The upcard value (11 for an ace).
+
+        Returns:
+            list: Probabilities over DEALER_OUTCOMES.
+        """
+        if upcard in self._distribution_memo:
+            return self._distribution_memo[upcard]
+
+        outcome = [0.0] * len(DEALER_OUTCOMES)
+        start = add_card(0, False, upcard)
+        for value, p in self._draws:
+            total, soft = add_card(*start, value)
+            if total == 21:
+                outcome[BLACKJACK] += p
+                continue
+            sub = self._dealer_from(total, soft)
+            for i in range(len(outcome)):
+                outcome[i] += p * sub[i]
+
+        if self.dealer_peek and outcome[BLACKJACK] < 1.0:
+            scale = 1.0 / (1.0 - outcome[BLACKJACK])
+            outcome = [p * scale for p in outcome]
+            outcome[BLACKJACK] = 0.0
+
+        self._distribution_memo[upcard] = outcome
+        return outcome
+
+    def dealer_blackjack_probability(self, upcard):
+        """
+        Get the probability that the dealer has blackjack.
+
+        Args:
+            upcard (int): The upcard value (11 for an ace).
+
+        Returns:
+            float: The probability of a dealer natural.
+        """
+        if upcard == 11:
+            return self.probabilities[8]
+        if upcard == 10:
+            return self.probabilities[9]
+        return 0.0
+
+    # Player
+
+    def stand_ev(self, total, upcard):
+        """
+        Get the expectation of standing.
+
+        Args:
+            total (int): The player's total.
+            upcard (int): The dealer's upcard value.
+
+        Returns:
+            float: Expected result per unit staked.
+        """
+        if total > 21:
+            return -1.0
+        dealer = self.dealer_distribution(upcard)
+        ev = dealer[BUST] - dealer[BLACKJACK]
+        for i in range(5):
+            dealer_total = 17 + i
+            if total > dealer_total:
+                ev += dealer[i]
+            elif total < dealer_total:
+                ev -= dealer[i]
+        return ev
+
+    def _continue_ev(self, total, soft, upcard):
+        """
+        Get the expectation of a hand that may still stand or hit, but not
+        double or split.
+
+        Args:
+            total (int): The player's total.
+            soft (bool): Whether the total is soft.
+            upcard (int): The dealer's upcard value.
+
+        Returns:
+            float: Expected result per unit staked.
+        """
+        if total > 21:
+            return -1.0
+        stand = self.stand_ev(total, upcard)
+        if self.strategy is not None:
+            action = self._strategy_action(("soft" if soft else "hard", total), upcard)
+            # A double that is no longer allowed stands on soft 18 and above,
+            # as in Game.choose_action
+            if action == Strategy.STAND or (
+                action == Strategy.DOUBLE and soft and total >= 18
+            ):
+                return stand
+            return self.hit_ev(total, soft, upcard)
+        if total == 21:
+            return stand
+        return max(stand, self.hit_ev(total, soft, upcard))
+
+    def hit_ev(self, total, soft, upcard):
+        """
+        Get the expectation of hitting once and then playing on.
+
+        Args:
+            total (int): The player's total.
+            soft (bool): Whether the total is soft.
+            upcard (int): The dealer's upcard value.
+
+        Returns:
+            float: Expected result per unit staked.
+        """
+        key = (total, soft, upcard)
+        if key in self._hit_memo:
+            return self._hit_memo[key]
+        ev = 0.0
+        for value, p in self._draws:
+            ev += p * self._continue_ev(*add_card(total, soft, value), upcard)
+        self._hit_memo[key] = ev
+        return ev
+
+    def double_ev(self, total, soft, upcard):
+        """
+        Get the expectation of doubling, per unit of the original bet.
+
+        Args:
+            total (int): The player's total.
+            soft (bool): Whether the total is soft.
+            upcard (int): The dealer's upcard value.
+
+        Returns:
+            float: Expected result per unit of the original bet.
+        """
+        ev = 0.0
+        for value, p in self._draws:
+            ev += p * self.stand_ev(add_card(total, soft, value)[0], upcard)
+        return 2.0 * ev
+
+    def split_ev(self, value, upcard):
+        """
+        Get the expectation of splitting a pair, per unit of the original bet.
+
+        Each split hand is played once with no resplitting; split aces
+        receive one card each.
+
+        Args:
+            value (int): The value of the paired cards.
+            upcard (int): The dealer's upcard value.
+
+        Returns:
+            float: Expected result per unit of the original bet.
+        """
+        start = add_card(0, False, value)
+        ev = 0.0
+        for second, p in self._draws:
+            total, soft = add_card(*start, second)
+            if value == 11:
+                ev += p * self.stand_ev(total, upcard)
+            else:
+                ev += p * self._two_card_ev(
+                    total, soft, None, upcard, self.double_after_split
+                )
+        return 2.0 * ev
+
+    def _strategy_action(self, hand_key, upcard):
+        """
+        Look up the fixed strategy's action for a hand.
+
+        Args:
+            hand_key (tuple): Hand class and total (see Strategy.hand_key).
+            upcard (int): The dealer's upcard value.
+
+        Returns:
+            str: The strategy's action.
+        """
+        dealer_key = "A" if upcard == 11 else upcard
+        return self.strategy.lookup(hand_key, dealer_key)
+
+    def _two_card_ev(self, total, soft, pair_value, upcard, can_double=True):
+        """
+        Get the expectation of a two-card hand under the engine's play.
+
+        Args:
+            total (int): The hand total.
+            soft (bool): Whether the total is soft.
+            pair_value (int): The paired value, or None if not a splittable pair.
+            upcard (int): The dealer's upcard value.
+            can_double (bool, optional): Whether doubling is allowed.
+
+        Returns:
+            float: Expected result per unit of the original bet.
+        """
+        if self.strategy is not None:
+            if pair_value is not None:
+                rank = "A" if pair_value == 11 else str(pair_value)
+                action = self._strategy_action(("pair", rank), upcard)
+            else:
+                action = self._strategy_action(
+                    ("soft" if soft else "hard", total), upcard
+                )
+            return self.action_ev(total, soft, pair_value, upcard, action, can_double)
+
+        best = self.stand_ev(total, upcard)
+        if total < 21:
+            best = max(best, self.hit_ev(total, soft, upcard))
+            if can_double:
+                best = max(best, self.double_ev(total, soft, upcard))
+        if pair_value is not None:
+            best = max(best, self.split_ev(pair_value, upcard))
+        return best
+
+    def action_ev(self, total, soft, pair_value, upcard, action, can_double=True):
+        """
+        Get the expectation of taking an action on a two-card hand.
+
+        Actions that are not allowed fall back to hitting (or standing, for
+        a double on soft 18 and above), matching how the game treats them.
+
+        Args:
+            total (int): The hand total.
+            soft (bool): Whether the total is soft.
+            pair_value (int): The paired value, or None if not a pair.
+            upcard (int): The dealer's upcard value.
+            action (str): The action to evaluate.
+            can_double (bool, optional): Whether doubling is allowed.
+
+        Returns:
+            float: Expected result per unit of the original bet.
+        """
+        if action == Strategy.STAND:
+            return self.stand_ev(total, upcard)
+        if action == Strategy.DOUBLE:
+            if can_double:
+                return self.double_ev(total, soft, upcard)
+            if soft and total >= 18:
+                return self.stand_ev(total, upcard)
+        if action == Strategy.SPLIT and pair_value is not None:
+            return self.split_ev(pair_value, upcard)
+        return self.hit_ev(total, soft, upcard)
+
+    def hand_ev(self, first, second, upcard):
+        """
+        Get the expectation of a starting hand, given the dealer has no natural
+        when the dealer peeks.
+
+        Args:
+            first (int): Value of the first card.
+            second (int): Value of the second card.
+            upcard (int): The dealer's upcard value.
+
+        Returns:
+            float: Expected result per unit of the original bet.
+        """
+        total, soft = add_card(*add_card(0, False, first), second)
+        pair_value = first if first == second else None
+        return self._two_card_ev(total, soft, pair_value, upcard)
+
+    def round_ev(self):
+        """
+        Get the expectation of a full round per unit of the initial bet.
+
+        Returns:
+            float: The player's expectation (negative for a house edge).
+        """
+        p = self.probabilities
+        ev = 0.0
+        for u, upcard in enumerate(VALUES):
+            if p[u] == 0:
+                continue
+            dealer_natural = self.dealer_blackjack_probability(upcard)
+            for i, first in enumerate(VALUES):
+                for j, second in enumerate(VALUES):
+                    weight = p[u] * p[i] * p[j]
+                    if weight == 0:
+                        continue
+                    if first + second == 21:
+                        ev += weight * (1.0 - dealer_natural) * self.blackjack_payout
+                    elif self.dealer_peek:
+                        play = self.hand_ev(first, second, upcard)
+                        ev += weight * ((1.0 - dealer_natural) * play - dealer_natural)
+                    else:
+                        ev += weight * self.hand_ev(first, second, upcard)
+        return ev
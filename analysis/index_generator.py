@@ -0,0 +1,392 @@
+import math
+import random
+from game.card import Card
+from game.counting import HI_LO
+from game.dealer import Dealer
+from game.hand import Hand
+from game.indices import IndexEntry, IndexTable
+from game.rules import Rules
+from game.shoe import Shoe
+from game.strategy import Strategy
+from parallel import map_tasks
+
+# Candidate deviations: (player cards, dealer upcard, action, alternative).
+# Mostly the "Illustrious 18" plays that do not involve insurance.
+DEFAULT_CELLS = [
+    (("10", "6"), "10", Strategy.STAND, Strategy.HIT),
+    (("10", "5"), "10", Strategy.STAND, Strategy.HIT),
+    (("10", "6"), "9", Strategy.STAND, Strategy.HIT),
+    (("10", "2"), "2", Strategy.STAND, Strategy.HIT),
+    (("10", "2"), "3", Strategy.STAND, Strategy.HIT),
+    (("10", "2"), "4", Strategy.STAND, Strategy.HIT),
+    (("10", "2"), "5", Strategy.STAND, Strategy.HIT),
+    (("10", "2"), "6", Strategy.STAND, Strategy.HIT),
+    (("10", "3"), "2", Strategy.STAND, Strategy.HIT),
+    (("10", "3"), "3", Strategy.STAND, Strategy.HIT),
+    (("6", "4"), "10", Strategy.DOUBLE, Strategy.HIT),
+    (("6", "4"), "A", Strategy.DOUBLE, Strategy.HIT),
+    (("6", "3"), "2", Strategy.DOUBLE, Strategy.HIT),
+    (("6", "3"), "7", Strategy.DOUBLE, Strategy.HIT),
+    (("10", "10"), "5", Strategy.SPLIT, Strategy.STAND),
+    (("10", "10"), "6", Strategy.SPLIT, Strategy.STAND),
+]
+
+DEFAULT_TRUE_COUNTS = range(-4, 9)
+
+
+class _ListDeck:
+    """Deals a fixed sequence of cards, so both actions see the same draws."""
+
+    def __init__(self, cards):
+        """
+        Initialize the deck.
+
+        Args:
+            cards (list): Cards to deal, in order.
+        """
+        self.cards = cards
+        self.position = 0
+
+    def deal_card(self):
+        """
+        Deal the next card in the sequence.
+
+        Returns:
+            Card: The next card.
+        """
+        card = self.cards[self.position]
+        self.position += 1
+        return card
+
+
+def _shoe_at_true_count(rng, cards, tags, initial_count, bucket, penetration):
+    """
+    Shuffle a shoe and remove cards so the true count lands in a bucket.
+
+    A random number of cards up to the cut card is treated as already dealt.
+    Dealt and undealt cards are then swapped at random, accepting only swaps
+    that move the running count toward the bucket, so the undealt cards stay
+    randomly ordered.
+
+    Args:
+        rng (random.Random): Random generator.
+        cards (list): Every card in the shoe except the cell's cards.
+        tags (dict): Counting tag per rank.
+        initial_count (float): Running count including the cell's cards.
+        bucket (int): Target true-count bucket, i.e. floor(true count).
+        penetration (float): Fraction of the shoe dealt before reshuffling.
+
+    Returns:
+        list: The undealt cards in dealing order, or None if the bucket could
+              not be reached at the chosen depth.
+    """
+    cards = cards[:]
+    rng.shuffle(cards)
+    dealt = rng.randint(0, int(len(cards) * penetration))
+    remaining = len(cards) - dealt
+    decks = remaining / 52.0
+    low, high = bucket * decks, (bucket + 1) * decks
+
+    count = initial_count + sum(tags[card.rank] for card in cards[:dealt])
+    for _ in range(20 * len(cards)):
+        if low <= count < high:
+            return cards[dealt:]
+        if dealt == 0:
+            return None
+        i = rng.randrange(dealt)
+        j = dealt + rng.randrange(remaining)
+        delta = tags[cards[j].rank] - tags[cards[i].rank]
+        if (count < low and delta > 0) or (count >= high and delta < 0):
+            cards[i], cards[j] = cards[j], cards[i]
+            count += delta
+    return None
+
+
+def _play_hand(hand, action, deck, strategy, upcard):
+    """
+    Play out one player hand starting with a forced first action.
+
+    Args:
+        hand (Hand): The hand to play.
+        action (str): The first action (hit, stand or double).
+        deck (_ListDeck): Source of draws.
+        strategy (Strategy): Basic strategy for later decisions.
+        upcard (Card): The dealer's upcard.
+
+    Returns:
+        int: The number of units staked on the hand.
+    """
+    while True:
+        if action == Strategy.STAND:
+            return 1
+        hand.add_card(deck.deal_card())
+        if action == Strategy.DOUBLE:
+            return 2
+        if hand.get_value() >= 21:
+            return 1
+        action = strategy.decide_action(hand, upcard)
+        if action in (Strategy.DOUBLE, Strategy.SPLIT):
+            action = Strategy.HIT
+
+
+def _play_action(action, player_cards, upcard, hole, draws, strategy, rules):
+    """
+    Resolve a round in which the player's first action is forced.
+
+    Args:
+        action (str): The forced first action.
+        player_cards (tuple): The player's two cards.
+        upcard (Card): The dealer's upcard.
+        hole (Card): The dealer's hole card.
+        draws (list): Cards to draw from, in order.
+        strategy (Strategy): Basic strategy for later decisions.
+        rules (Rules): The table rules the dealer plays by.
+
+    Returns:
+        float: The net result in units of the initial bet.
+    """
+    deck = _ListDeck(draws)
+    hands = []
+    if action == Strategy.SPLIT:
+        for card in player_cards:
+            hand = Hand()
+            hand.add_card(card)
+            hand.add_card(deck.deal_card())
+            if card.rank == "A":
+                # Split aces receive one card each
+                hands.append((hand, 1))
+                continue
+            first = strategy.decide_action(hand, upcard)
+            if first == Strategy.SPLIT:
+                first = Strategy.HIT
+            hands.append((hand, _play_hand(hand, first, deck, strategy, upcard)))
+    else:
+        hand = Hand()
+        hand.cards = list(player_cards)
+        hands.append((hand, _play_hand(hand, action, deck, strategy, upcard)))
+
+    dealer = Dealer(rules)
+    dealer.hand.cards = [upcard, hole]
+    if any(hand.get_value() <= 21 for hand, _ in hands):
+        while dealer.should_hit():
+            dealer.hand.add_card(deck.deal_card())
+    dealer_value = dealer.hand.get_value()
+
+    net = 0.0
+    for hand, stake in hands:
+        value = hand.get_value()
+        if value > 21:
+            net -= stake
+        elif dealer_value > 21 or value > dealer_value:
+            net += stake
+        elif value < dealer_value:
+            net -= stake
+    return net
+
+
+def _run_task(task):
+    """
+    Study one (cell, true-count bucket) pair. Runs in a worker process.
+
+    Args:
+        task (tuple): (cell, bucket, trials, num_decks, penetration, system,
+                      rules dict, seed).
+
+    Returns:
+        tuple: (cell, bucket, trials, sum of differences, sum of squares).
+    """
+    cell, bucket, trials, num_decks, penetration, system, rules, seed = task
+    player_ranks, upcard_rank, action, alternative = cell
+    rng = random.Random(seed)
+    strategy = Strategy()
+    rules = Rules.from_dict(rules)
+    tags = system.tags
+
+    card_for_rank = {rank: Card(rank) for rank in Shoe.RANKS}
+    player_cards = tuple(card_for_rank[rank] for rank in player_ranks)
+    upcard = card_for_rank[upcard_rank]
+
+    # Build the shoe without the cards already on the table
+    cards = [card_for_rank[r] for r in Shoe.RANKS for _ in range(4 * num_decks)]
+    for card in player_cards + (upcard,):
+        cards.remove(card)
+    initial_count = system.initial_running_count(num_decks) + sum(
+        tags[card.rank] for card in player_cards + (upcard,)
+    )
+
+    completed = 0
+    total = 0.0
+    total_squared = 0.0
+    attempts = 0
+    while completed < trials and attempts < trials * 20:
+        attempts += 1
+        remaining = _shoe_at_true_count(
+            rng, cards, tags, initial_count, bucket, penetration
+        )
+        if remaining is None:
+            continue
+        hole = remaining[0]
+        if upcard.value + hole.value == 21:
+            # Dealer blackjack is settled before the decision; skip the deal
+            continue
+
+        # Common random numbers: both actions draw the same card sequence
+        draws = remaining[1:]
+        first = _play_action(action, player_cards, upcard, hole, draws, strategy, rules)
+        second = _play_action(
+            alternative, player_cards, upcard, hole, draws, strategy, rules
+        )
+        difference = first - second
+        total += difference
+        total_squared += difference * difference
+        completed += 1
+
+    return cell, bucket, completed, total, total_squared
+
+
+def run_index_study(
+    cells=None,
+    true_counts=DEFAULT_TRUE_COUNTS,
+    trials=2000,
+    num_decks=6,
+    penetration=0.75,
+    system=HI_LO,
+    workers=None,
+    seed=0,
+    rules=None,
+):
+    """
+    Measure the EV difference between each cell's two actions per true count.
+
+    Every (cell, true-count bucket) pair is an independent task on a process
+    pool. Within a task both actions are played against the same shuffled
+    shoe, so their difference has far less variance than two separate runs.
+
+    Args:
+        cells (list, optional): Candidate cells as (player cards, upcard,
+                                action, alternative). Defaults to DEFAULT_CELLS.
+        true_counts (iterable, optional): True-count buckets to study.
+        trials (int, optional): Deals per (cell, bucket). Defaults to 2000.
+        num_decks (int, optional): Decks in the shoe. Defaults to 6.
+        penetration (float, optional): Deepest fraction dealt. Defaults to 0.75.
+        system (CountingSystem, optional): Counting system. Defaults to Hi-Lo.
+        workers (int, optional): Worker processes; 1 runs inline. Defaults to
+                                 the number of CPUs.
+        seed (int, optional): Base seed. Defaults to 0.
+        rules (Rules, optional): The table rules the dealer plays by; the
+                                 shoe is set by num_decks and penetration.
+                                 Defaults to Rules().
+
+    Returns:
+        dict: cell -> {bucket: (trials, mean difference, standard error)},
+              where the difference is EV(action) - EV(alternative) in units.
+    """
+    cells = list(cells) if cells is not None else DEFAULT_CELLS
+    rules = (rules if rules is not None else Rules()).to_dict()
+    tasks = [
+        (
+            cell,
+            bucket,
+            trials,
+            num_decks,
+            penetration,
+            system,
+            rules,
+            f"{seed}:{i}:{bucket}",
+        )
+        for i, cell in enumerate(cells)
+        for bucket in true_counts
+    ]
+
+    study = {cell: {} for cell in cells}
+    for cell, bucket, count, total, total_squared in map_tasks(
+        _run_task, tasks, workers
+    ):
+        if count == 0:
+            continue
+        mean = total / count
+        variance = max(total_squared / count - mean * mean, 0.0)
+        study[cell][bucket] = (count, mean, math.sqrt(variance / count))
+    return study
+
+
+def fit_index_table(study, round_indices=True):
+    """
+    Turn an index study into an index table.
+
+    A weighted straight line is fitted to the EV difference against the true
+    count (bucket midpoints); the index is where the line crosses zero. Cells
+    whose crossing falls outside the studied range get no entry.
+
+    Args:
+        study (dict): Output of `run_index_study`.
+        round_indices (bool, optional): Round indices to whole numbers.
+                                        Defaults to True.
+
+    Returns:
+        IndexTable: The fitted index plays.
+    """
+    table = IndexTable()
+    for cell, buckets in study.items():
+        points = [
+            (bucket + 0.5, mean, 1.0 / max(se, 1e-6) ** 2)
+            for bucket, (_, mean, se) in buckets.items()
+        ]
+        if len(points) < 2:
+            continue
+
+        weight = sum(w for _, _, w in points)
+        mean_x = sum(x * w for x, _, w in points) / weight
+        mean_y = sum(y * w for _, y, w in points) / weight
+        sxx = sum(w * (x - mean_x) ** 2 for x, _, w in points)
+        sxy = sum(w * (x - mean_x) * (y - mean_y) for x, y, w in points)
+        if sxx == 0 or sxy == 0:
+            continue
+        slope = sxy / sxx
+        crossing = mean_x - mean_y / slope
+
+        low = min(buckets)
+        high = max(buckets) + 1
+        if not low <= crossing <= high:
+            continue
+
+        player_ranks, upcard_rank, action, alternative = cell
+        if slope < 0:
+            # The alternative is the play that gains as the count rises
+            action, alternative = alternative, action
+        index = math.floor(crossing + 0.5) if round_indices else crossing
+
+        hand = Hand()
+        for rank in player_ranks:
+            hand.add_card(Card(rank))
+        table.add(
+            Strategy.hand_key(hand),
+            Strategy.dealer_key(Card(upcard_rank)),
+            IndexEntry(index, action, alternative),
+        )
+    return table
+
+
+def generate_index_table(cells=None, true_counts=DEFAULT_TRUE_COUNTS, **kwargs):
+    """
+    Run an index study and fit an index table from it.
+
+    Args:
+        cells (list, optional): Candidate cells. Defaults to DEFAULT_CELLS.
+        true_counts (iterable, optional): True-count buckets to study.
+        **kwargs: Passed to `run_index_study`.
+
+    Returns:
+        IndexTable: The fitted index plays.
+    """
+    return fit_index_table(run_index_study(cells, true_counts, **kwargs))
+
+
+if __name__ == "__main__":
+    table = generate_index_table()
+    for (hand_key, dealer_key), entry in sorted(
+        table.entries.items(), key=lambda item: str(item[0])
+    ):
+        print(f"{hand_key[0]} {hand_key[1]} vs {dealer_key}: {entry}")
+    table.save("index_table.json")
+    print("Saved index_table.json")
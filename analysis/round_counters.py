@@ -0,0 +1,50 @@
+from game.rules import Rules
+from instrumentation import RoundCounters
+from parallel import map_tasks, split_evenly
+from simulation import Simulation
+
+
+def _count_chunk(task):
+    """
+    Simulate one chunk of hands with counters attached. Runs in a worker process.
+
+    Args:
+        task (tuple): (rules dict, hands, seed).
+
+    Returns:
+        RoundCounters: The chunk's counters.
+    """
+    rules, num_hands, seed = task
+    simulation = Simulation(bet_size=1.0, seed=seed, rules=Rules.from_dict(rules))
+    counters = RoundCounters()
+    simulation.run(num_hands, display_progress=False, counters=counters)
+    return counters
+
+
+def collect_counters(num_hands=100000, rules=None, chunks=4, workers=None, seed=0):
+    """
+    Count decisions, dealer hands and starting-hand results on a process pool.
+
+    The hands are split into chunks with their own seeds, and the chunks'
+    counters are merged.
+
+    Args:
+        num_hands (int, optional): Hands to simulate. Defaults to 100000.
+        rules (Rules, optional): The table rules. Defaults to Rules().
+        chunks (int, optional): Chunks to split the hands into. Defaults to 4.
+        workers (int, optional): Worker processes; 1 runs inline. Defaults to
+                                 the number of CPUs.
+        seed (int, optional): Base seed. Defaults to 0.
+
+    Returns:
+        RoundCounters: The merged counters.
+    """
+    rules = rules if rules is not None else Rules()
+    tasks = [
+        (rules.to_dict(), hands, f"{seed}:{chunk}")
+        for chunk, hands in enumerate(split_evenly(num_hands, chunks))
+    ]
+    counters = RoundCounters()
+    for chunk_counters in map_tasks(_count_chunk, tasks, workers):
+        counters.merge(chunk_counters)
+    return counters
@@ -0,0 +1,98 @@
+import itertools
+import math
+from analysis.sweep_scheduler import SweepScheduler
+from game.rules import Rules
+
+# A small default grid: the rules that move the house edge the most
+DEFAULT_GRID = {
+    "num_decks": [None, 6],
+    "hit_soft_17": [True, False],
+    "blackjack_payout": [1.5, 1.2],
+    "double_after_split": [True, False],
+    "late_surrender": [False, True],
+}
+
+
+def rule_grid(**options):
+    """
+    Build every combination of the given rule options.
+
+    Args:
+        **options: Rule name -> list of values to try. Rules not given keep
+                   their defaults.
+
+    Returns:
+        list: One Rules object per combination.
+    """
+    names = list(options)
+    return [
+        Rules(**dict(zip(names, values)))
+        for values in itertools.product(*(options[name] for name in names))
+    ]
+
+
+def sweep_rules(grid=None, num_hands=100000, chunks=4, workers=None, seed=0, z=1.96):
+    """
+    Estimate the house edge of every rule set in a grid on a process pool.
+
+    Each rule set is split into chunks with their own seeds so the pool stays
+    busy; the chunks run on a SweepScheduler, which merges them per rule set.
+
+    Args:
+        grid (list or dict, optional): Rules objects, or rule name -> values to
+                                       expand with `rule_grid`. Defaults to
+                                       DEFAULT_GRID.
+        num_hands (int, optional): Hands per rule set. Defaults to 100000.
+        chunks (int, optional): Chunks per rule set. Defaults to 4.
+        workers (int, optional): Worker processes; 1 runs inline. Defaults to
+                                 the number of CPUs.
+        seed (int, optional): Base seed. Defaults to 0.
+        z (float, optional): Normal quantile of the confidence interval.
+                             Defaults to 1.96 (95%).
+
+    Returns:
+        list: One row per rule set with the rules, hands played, house edge
+              per initial bet and its confidence interval, all in percent.
+    """
+    if grid is None:
+        grid = DEFAULT_GRID
+    rule_sets = rule_grid(**grid) if isinstance(grid, dict) else list(grid)
+
+    scheduler = SweepScheduler(math.ceil(num_hands / chunks), workers, seed, z)
+    for rules in rule_sets:
+        scheduler.add(num_hands, rules=rules)
+    rows = sorted(scheduler.run(), key=lambda row: row["index"])
+    return [
+        {
+            "rules": row["rules"],
+            "hands": row["hands"],
+            "house_edge": row["house_edge"],
+            "ci_low": row["ci_low"],
+            "ci_high": row["ci_high"],
+        }
+        for row in rows
+    ]
+
+
+def format_sweep_table(rows):
+    """
+    Format sweep results as a text table.
+
+    Args:
+        rows (list): Output of `sweep_rules`.
+
+    Returns:
+        str: The formatted table, one rule set per line.
+    """
+    lines = [f"{'Rules':<36} {'Hands':>10} {'Edge %':>8} {'CI':>18}"]
+    for row in rows:
+        lines.append(
+            f"{row['rules'].describe():<36} {row['hands']:>10} "
+            f"{row['house_edge']:>8.3f} "
+            f"[{row['ci_low']:>7.3f}, {row['ci_high']:>7.3f}]"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(format_sweep_table(sweep_rules()))
@@ -0,0 +1,176 @@
+import numpy as np
+from game.card import Card
+from game.side_bets import (
+    CODE_RANKS,
+    QUEEN_OF_HEARTS,
+    LuckyLadies,
+    PerfectPairs,
+    TwentyOnePlusThree,
+)
+
+# Value classes used for the dealer-blackjack check
+TEN_CODES = np.isin(CODE_RANKS, [Card.RANKS.index(r) for r in ("10", "J", "Q", "K")])
+ACE_CODES = CODE_RANKS == Card.RANKS.index("A")
+
+
+def shoe_counts(shoe):
+    """
+    Count the undealt cards of a shoe by card code.
+
+    Args:
+        shoe (Shoe): The shoe.
+
+    Returns:
+        numpy.ndarray: Cards left of each code, shape (52,).
+    """
+    codes = [card.code for card in shoe.cards[shoe.position :]]
+    return np.bincount(codes, minlength=52)
+
+
+class SideBetEvaluator:
+    """
+    Computes exact side-bet expectations for a shoe by enumerating every deal.
+
+    Deals are drawn without replacement, so the probability of each ordered
+    player pair (and upcard) comes from a few broadcast products over the 52
+    card codes; combined with a side bet's outcome table this gives every
+    outcome probability and the EV in one weighted sum.
+
+    Attributes:
+        counts (numpy.ndarray): Cards of each code in the shoe.
+        pair_probabilities (numpy.ndarray): P(first, second), shape (52, 52).
+        deal_probabilities (numpy.ndarray): P(first, second, upcard),
+                                            shape (52, 52, 52).
+    """
+
+    def __init__(self, counts=None, num_decks=6):
+        """
+        Initialize the evaluator.
+
+        Args:
+            counts (array-like, optional): Cards of each code. Defaults to a
+                                           full shoe of num_decks decks.
+            num_decks (int, optional): Decks in a full shoe. Defaults to 6.
+        """
+        if counts is None:
+            counts = np.full(52, num_decks)
+        self.counts = np.asarray(counts, dtype=float)
+        if self.counts.shape != (52,):
+            raise ValueError("counts needs one entry per card code (52).")
+
+        n = self.counts
+        total = n.sum()
+        if total < 4:
+            raise ValueError("The shoe needs at least four cards.")
+        eye = np.eye(52)
+
+        # Draw the second card from what the first leaves behind, and so on
+        second = np.clip(n[None, :] - eye, 0, None)
+        self.pair_probabilities = n[:, None] * second / (total * (total - 1))
+        third = np.clip(n[None, None, :] - eye[:, None, :] - eye[None, :, :], 0, None)
+        self.deal_probabilities = (
+            self.pair_probabilities[:, :, None] * third / (total - 2)
+        )
+
+    @classmethod
+    def from_shoe(cls, shoe):
+        """
+        Build an evaluator for the cards left in a shoe.
+
+        Args:
+            shoe (Shoe): The shoe.
+
+        Returns:
+            SideBetEvaluator: The evaluator.
+        """
+        return cls(shoe_counts(shoe))
+
+    def outcome_probabilities(self, side_bet):
+        """
+        Get the probability of every outcome of a side bet.
+
+        Args:
+            side_bet (SideBet): The side bet.
+
+        Returns:
+            dict: Outcome name -> probability.
+        """
+        if side_bet.cards == 3:
+            probabilities = self.deal_probabilities
+        else:
+            probabilities = self.pair_probabilities
+        totals = np.bincount(
+            side_bet.table.ravel(),
+            weights=probabilities.ravel(),
+            minlength=len(side_bet.outcomes),
+        )
+
+        if isinstance(side_bet, LuckyLadies):
+            # Split the queen of hearts pair on whether the dealer has a
+            # natural, drawn from the rest of the shoe
+            queens = totals[4]
+            totals[4] = queens * (1.0 - self._dealer_blackjack_after_queens())
+            totals[5] = queens - totals[4]
+
+        return dict(zip(side_bet.outcomes, totals.tolist()))
+
+    def _dealer_blackjack_after_queens(self):
+        """
+        Get the probability of a dealer natural once two queens of hearts are out.
+
+        Returns:
+            float: The probability of a dealer blackjack.
+        """
+        n = self.counts.copy()
+        n[QUEEN_OF_HEARTS] -= 2
+        remaining = n.sum()
+        tens = n[TEN_CODES].sum()
+        aces = n[ACE_CODES].sum()
+        return 2.0 * tens * aces / (remaining * (remaining - 1))
+
+    def expected_value(self, side_bet):
+        """
+        Get the exact EV of a unit side bet.
+
+        Args:
+            side_bet (SideBet): The side bet.
+
+        Returns:
+            float: Expected units won per unit staked.
+        """
+        probabilities = self.outcome_probabilities(side_bet)
+        return float(
+            sum(
+                probabilities[name] * payout
+                for name, payout in zip(side_bet.outcomes, side_bet.payouts)
+            )
+        )
+
+    def evaluate(self, side_bets=None):
+        """
+        Evaluate several side bets.
+
+        Args:
+            side_bets (list, optional): SideBet objects. Defaults to Perfect
+                                        Pairs, 21+3 and Lucky Ladies with their
+                                        standard paytables.
+
+        Returns:
+            dict: Side bet name -> {"ev": EV in percent, "outcomes": probabilities}.
+        """
+        if side_bets is None:
+            side_bets = [PerfectPairs(), TwentyOnePlusThree(), LuckyLadies()]
+        return {
+            side_bet.name: {
+                "ev": self.expected_value(side_bet) * 100,
+                "outcomes": self.outcome_probabilities(side_bet),
+            }
+            for side_bet in side_bets
+        }
+
+
+if __name__ == "__main__":
+    for decks in (1, 2, 6, 8):
+        results = SideBetEvaluator(num_decks=decks).evaluate()
+        evs = ", ".join(f"{name} {row['ev']:+.3f}%" for name, row in results.items())
+        print(f"{decks} deck(s): {evs}")
@@ -0,0 +1,323 @@
+import heapq
+import itertools
+import math
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from game.rules import Rules
+from parallel import mean_interval
+from simulation import simulate_chunk
+
+
+def config_grid(bet_size=(1.0,), strategy=(None,), **rule_options):
+    """
+    Build every combination of bet sizes, strategies and rule options.
+
+    Args:
+        bet_size (list, optional): Bet sizes to try. Defaults to (1.0,).
+        strategy (list, optional): Strategy objects to try; None plays basic
+                                   strategy. Defaults to (None,).
+        **rule_options: Rule name -> list of values to try, as for
+                        `rule_grid`. Rules not given keep their defaults.
+
+    Returns:
+        list: One {"bet_size", "strategy", "rules"} dict per combination.
+    """
+    names = list(rule_options)
+    return [
+        {
+            "bet_size": bet,
+            "strategy": play,
+            "rules": Rules(**dict(zip(names, values))),
+        }
+        for bet, play in itertools.product(bet_size, strategy)
+        for values in itertools.product(*(rule_options[name] for name in names))
+    ]
+
+
+class SweepScheduler:
+    """
+    Runs many simulation configurations as chunks on one process pool.
+
+    Every configuration is split into chunks of hands with their own seeds,
+    and the chunks wait in one priority queue. Only as many chunks as there
+    are workers are in flight; whichever worker finishes first takes the next
+    chunk, so the chunks of a long configuration spread over every core
+    instead of leaving them idle behind it. Results stream out as each
+    configuration's last chunk comes in.
+
+    Configurations still waiting can be cancelled or given a new priority
+    between results. Chunks are seeded by configuration and chunk number, so
+    the results do not depend on the order they ran in.
+
+    Attributes:
+        chunk_hands (int): Hands per chunk.
+        workers (int): Worker processes; 1 runs inline.
+        seed (int): Base seed.
+        z (float): Normal quantile of the confidence interval.
+    """
+
+    def __init__(self, chunk_hands=50000, workers=None, seed=0, z=1.96):
+        """
+        Initialize an empty scheduler.
+
+        Args:
+            chunk_hands (int, optional): Hands per chunk. Defaults to 50000.
+            workers (int, optional): Worker processes; 1 runs inline. Defaults
+                                     to the number of CPUs.
+            seed (int, optional): Base seed. Defaults to 0.
+            z (float, optional): Normal quantile of the confidence interval.
+                                 Defaults to 1.96 (95%).
+        """
+        self.chunk_hands = chunk_hands
+        self.workers = workers
+        self.seed = seed
+        self.z = z
+        self._configs = []
+        self._queue = []
+        self._order = itertools.count()
+
+    def add(
+        self, num_hands=100000, priority=0, bet_size=1.0, rules=None, strategy=None
+    ):
+        """
+        Queue a configuration.
+
+        Args:
+            num_hands (int, optional): Hands to simulate. Defaults to 100000.
+            priority (int, optional): Lower runs first; ties run in the order
+                                      added. Defaults to 0.
+            bet_size (float, optional): The bet size. Defaults to 1.0.
+            rules (Rules, optional): The table rules. Defaults to Rules().
+            strategy (Strategy, optional): The player's strategy. Defaults to
+                                           basic strategy.
+
+        Returns:
+            int: The configuration's index.
+        """
+        if num_hands < 1:
+            raise ValueError("num_hands must be at least 1.")
+        index = len(self._configs)
+        chunks = math.ceil(num_hands / self.chunk_hands)
+        self._configs.append(
+            {
+                "bet_size": bet_size,
+                "rules": rules if rules is not None else Rules(),
+                "strategy": strategy,
+                "hands": num_hands,
+                "priority": priority,
+                "chunks": chunks,
+                "remaining": chunks,
+                "queued": set(range(chunks)),
+                "cancelled": False,
+                "totals": [0, 0.0, 0.0],
+            }
+        )
+        for chunk in range(chunks):
+            self._push(index, chunk)
+        return index
+
+    def add_grid(self, grid, num_hands=100000, priority=0):
+        """
+        Queue every configuration of a grid.
+
+        Args:
+            grid (list): Output of `config_grid`.
+            num_hands (int, optional): Hands per configuration. Defaults to
+                                       100000.
+            priority (int, optional): Priority of them all. Defaults to 0.
+
+        Returns:
+            list: The configurations' indexes.
+        """
+        return [self.add(num_hands, priority, **config) for config in grid]
+
+    def _push(self, index, chunk):
+        """Queue one chunk at its configuration's priority."""
+        heapq.heappush(
+            self._queue,
+            (self._configs[index]["priority"], next(self._order), index, chunk),
+        )
+
+    def cancel(self, index):
+        """
+        Cancel a configuration. Its queued chunks are dropped, and the results
+        of chunks already running are ignored.
+
+        Args:
+            index (int): The configuration.
+        """
+        config = self._configs[index]
+        config["cancelled"] = True
+        config["queued"].clear()
+
+    def set_priority(self, index, priority):
+        """
+        Change the priority of a configuration's queued chunks.
+
+        Args:
+            index (int): The configuration.
+            priority (int): The new priority; lower runs first.
+        """
+        config = self._configs[index]
+        config["priority"] = priority
+        # Stale heap entries are skipped when popped
+        for chunk in config["queued"]:
+            self._push(index, chunk)
+
+    def pending(self):
+        """
+        Get the configurations not finished or cancelled yet.
+
+        Returns:
+            list: Their indexes.
+        """
+        return [
+            index
+            for index, config in enumerate(self._configs)
+            if config["remaining"] and not config["cancelled"]
+        ]
+
+    def _pop(self):
+        """
+        Take the next queued chunk.
+
+        Returns:
+            tuple: The configuration's index and the chunk's task for
+                   `simulate_chunk`, or None if nothing is queued.
+        """
+        while self._queue:
+            priority, _, index, chunk = heapq.heappop(self._queue)
+            config = self._configs[index]
+            if chunk not in config["queued"] or priority != config["priority"]:
+                continue
+            config["queued"].discard(chunk)
+            hands = self.chunk_hands
+            if chunk == config["chunks"] - 1:
+                hands = config["hands"] - hands * chunk
+            return index, (
+                config["bet_size"],
+                config["rules"].to_dict(),
+                config["strategy"],
+                hands,
+                f"{self.seed}:{index}:{chunk}",
+            )
+        return None
+
+    def _finish(self, index, stats):
+        """
+        Add a chunk's statistics to its configuration.
+
+        Args:
+            index (int): The configuration.
+            stats (dict): The chunk's statistics from `simulate_chunk`.
+
+        Returns:
+            dict: The configuration's row if this was its last chunk, or None.
+        """
+        config = self._configs[index]
+        if config["cancelled"]:
+            return None
+        totals = config["totals"]
+        totals[0] += stats["rounds_played"]
+        totals[1] += stats["total_profit"] / config["bet_size"]
+        totals[2] += stats["sum_squared_profit"]
+        config["remaining"] -= 1
+        if config["remaining"]:
+            return None
+        return self._row(index)
+
+    def _row(self, index):
+        """
+        Summarize a finished configuration.
+
+        Args:
+            index (int): The configuration.
+
+        Returns:
+            dict: The index, bet size, rules, strategy name, hands played, and
+                  house edge per initial bet with its confidence interval, in
+                  percent.
+        """
+        config = self._configs[index]
+        rounds, net, squared = config["totals"]
+        mean, half_width = mean_interval(rounds, net, squared, self.z)
+        edge = -mean * 100
+        half_width *= 100
+        strategy = config["strategy"]
+        return {
+            "index": index,
+            "bet_size": config["bet_size"],
+            "rules": config["rules"],
+            "strategy": "Strategy" if strategy is None else type(strategy).__name__,
+            "hands": rounds,
+            "house_edge": edge,
+            "ci_low": edge - half_width,
+            "ci_high": edge + half_width,
+        }
+
+    def run(self):
+        """
+        Run every queued chunk, yielding each configuration as it finishes.
+
+        `cancel`, `set_priority` and `add` may be called between results; they
+        take effect for the chunks not yet started.
+
+        Yields:
+            dict: A finished configuration's row (see `_row`).
+        """
+        if self.workers == 1:
+            while True:
+                popped = self._pop()
+                if popped is None:
+                    return
+                index, task = popped
+                row = self._finish(index, simulate_chunk(task))
+                if row is not None:
+                    yield row
+
+        slots = self.workers or os.cpu_count() or 1
+        executor = ProcessPoolExecutor(max_workers=slots)
+        running = {}  # Future -> configuration index
+        try:
+            while True:
+                while len(running) < slots:
+                    popped = self._pop()
+                    if popped is None:
+                        break
+                    index, task = popped
+                    running[executor.submit(simulate_chunk, task)] = index
+                if not running:
+                    return
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    row = self._finish(running.pop(future), future.result())
+                    if row is not None:
+                        yield row
+        finally:
+            for future in running:
+                future.cancel()
+            executor.shutdown()
+
+
+def format_schedule_table(rows):
+    """
+    Format scheduled sweep results as a text table.
+
+    Args:
+        rows (list): Rows yielded by `SweepScheduler.run`.
+
+    Returns:
+        str: The formatted table, one configuration per line, in index order.
+    """
+    lines = [
+        f"{'#':>3} {'Rules':<36} {'Bet':>8} {'Strategy':<14} {'Hands':>10} "
+        f"{'Edge %':>8} {'CI':>18}"
+    ]
+    for row in sorted(rows, key=lambda row: row["index"]):
+        lines.append(
+            f"{row['index']:>3} {row['rules'].describe():<36} "
+            f"{row['bet_size']:>8g} {row['strategy']:<14} {row['hands']:>10} "
+            f"{row['house_edge']:>8.3f} "
+            f"[{row['ci_low']:>7.3f}, {row['ci_high']:>7.3f}]"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,17 @@
+from benchmarks.suite import (
+    BENCHMARKS,
+    run_benchmarks,
+    save_baseline,
+    load_baseline,
+    compare_results,
+    format_comparison,
+)
+
+__all__ = [
+    "BENCHMARKS",
+    "run_benchmarks",
+    "save_baseline",
+    "load_baseline",
+    "compare_results",
+    "format_comparison",
+]
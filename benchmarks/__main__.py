@@ -0,0 +1,70 @@
+import argparse
+import os
+import sys
+from benchmarks.suite import (
+    BENCHMARKS,
+    compare_results,
+    format_comparison,
+    load_baseline,
+    run_benchmarks,
+    save_baseline,
+)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def main(argv=None):
+    """
+    Run the benchmarks, then save a baseline or compare against one.
+
+    Args:
+        argv (list, optional): Command-line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: Exit status; 1 if any metric regressed past its threshold.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Blackjack engine benchmarks."
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="write the results as the new baseline"
+    )
+    parser.add_argument(
+        "--compare", action="store_true", help="fail if a metric regresses"
+    )
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        help="allowed regression in percent, overriding the baseline's thresholds",
+    )
+    parser.add_argument(
+        "--only", nargs="+", choices=list(BENCHMARKS), help="benchmarks to run"
+    )
+    parser.add_argument(
+        "--scale", type=int, default=1, help="multiplier on the work per timing"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="timings per benchmark")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.only, args.scale, args.repeat)
+
+    if args.save:
+        thresholds = None
+        if os.path.exists(args.baseline):
+            thresholds = load_baseline(args.baseline).get("thresholds")
+        save_baseline(results, args.baseline, thresholds)
+        print(f"\nBaseline written to {args.baseline}")
+
+    if args.compare:
+        rows = compare_results(results, load_baseline(args.baseline), args.threshold)
+        print()
+        print(format_comparison(rows))
+        if any(row["regressed"] for row in rows):
+            print("\nPerformance regressed past the allowed threshold.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
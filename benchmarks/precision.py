@@ -0,0 +1,253 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from game.rules import Rules
+from instrumentation import RoundCounters
+from parallel import mean_interval
+from simulation import Simulation, simulate_chunk
+from vector_env import (
+    BasicStrategyPolicy,
+    VectorBlackjackEnv,
+    exact_basic_strategy_ev,
+    play_rounds,
+)
+
+# Rounds between precision checks
+BATCH_HANDS = 20000
+# Environments and rounds per environment in a vectorized batch
+VECTOR_ENVS = 4096
+VECTOR_ROUNDS = 16
+# Hands per chunk sent to a worker process
+CHUNK_HANDS = 50000
+
+
+def _mean_se(rounds, total, squared):
+    """
+    Get the mean result per round and its standard error.
+
+    Args:
+        rounds (int): Rounds played.
+        total (float): Sum of the round results.
+        squared (float): Sum of the squared round results.
+
+    Returns:
+        tuple: (mean, standard error), the error infinite below two rounds.
+    """
+    if rounds < 2:
+        return float("nan"), float("inf")
+    return mean_interval(rounds, total, squared, z=1.0)
+
+
+def engine_simulation(rules, target_se, max_hands, seed, workers):
+    """Plain Simulation.run on one core."""
+    simulation = Simulation(bet_size=1.0, seed=seed, rules=rules)
+    rounds, total, squared = 0, 0.0, 0.0
+    while True:
+        simulation.run(BATCH_HANDS, display_progress=False)
+        rounds += simulation.rounds_played
+        total += simulation.total_profit
+        squared += simulation.sum_squared_profit
+        ev, se = _mean_se(rounds, total, squared)
+        if se <= target_se or rounds >= max_hands:
+            return rounds, ev, se
+
+
+def engine_stratified(rules, target_se, max_hands, seed, workers):
+    """Simulation.run post-stratified on the starting hand and upcard."""
+    simulation = Simulation(bet_size=1.0, seed=seed, rules=rules)
+    counters = RoundCounters()
+    while True:
+        simulation.run(BATCH_HANDS, display_progress=False, counters=counters)
+        ev, se = counters.stratified_ev()
+        if se <= target_se or counters.rounds >= max_hands:
+            return counters.rounds, ev, se
+
+
+def engine_vector(rules, target_se, max_hands, seed, workers):
+    """VectorBlackjackEnv playing basic strategy on NumPy arrays."""
+    env = VectorBlackjackEnv(rules, seed)
+    policy = BasicStrategyPolicy()
+    rounds, total, squared = 0, 0.0, 0.0
+    while True:
+        played, batch_total, batch_squared = play_rounds(
+            env, policy, VECTOR_ROUNDS, VECTOR_ENVS
+        )
+        rounds += played
+        total += batch_total
+        squared += batch_squared
+        ev, se = _mean_se(rounds, total, squared)
+        if se <= target_se or rounds >= max_hands:
+            return rounds, ev, se
+
+
+def engine_parallel(rules, target_se, max_hands, seed, workers):
+    """Simulation.run chunks on a process pool, one wave per worker."""
+    workers = workers or os.cpu_count() or 1
+    rules = rules.to_dict()
+    rounds, total, squared = 0, 0.0, 0.0
+    chunk = 0
+    # One pool for every wave rather than map_tasks per wave: a new pool
+    # would start its workers again each wave, which the CPU time counts,
+    # and the waves can't be queued up front since the last one depends on
+    # the standard error reached
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            tasks = [
+                (1.0, rules, None, CHUNK_HANDS, f"{seed}:{chunk + i}")
+                for i in range(workers)
+            ]
+            chunk += workers
+            for stats in executor.map(simulate_chunk, tasks):
+                rounds += stats["rounds_played"]
+                total += stats["total_profit"]
+                squared += stats["sum_squared_profit"]
+            ev, se = _mean_se(rounds, total, squared)
+            if se <= target_se or rounds >= max_hands:
+                return rounds, ev, se
+
+
+# Engine name -> function(rules, target_se, max_hands, seed, workers) that
+# plays until the standard error reaches target_se and returns
+# (hands, EV per round, standard error)
+ENGINES = {
+    "simulation": engine_simulation,
+    "stratified": engine_stratified,
+    "vector": engine_vector,
+    "parallel": engine_parallel,
+}
+
+
+def time_to_precision(
+    engines=None,
+    target_se=0.002,
+    rules=None,
+    max_hands=20000000,
+    workers=None,
+    seed=0,
+    display_progress=True,
+):
+    """
+    Time each engine until its house-edge estimate reaches a standard error.
+
+    Every engine plays basic strategy from an infinite deck and is checked
+    against the exact expectation. CPU time includes the worker processes.
+    Because engines overshoot the target by up to a batch, the CPU time is
+    also scaled to the target by (se / target_se) squared, which is the
+    figure to compare.
+
+    Args:
+        engines (list, optional): Engines to run. Defaults to all of them.
+        target_se (float, optional): Standard error of the EV per round to
+                                     reach. Defaults to 0.002 (0.2%).
+        rules (Rules, optional): The table rules. Defaults to the rules the
+                                 exact engine models exactly: no resplits and
+                                 one card to split aces.
+        max_hands (int, optional): Hands after which an engine gives up.
+                                   Defaults to 20,000,000.
+        workers (int, optional): Worker processes for the parallel engine.
+                                 Defaults to the number of CPUs.
+        seed (int, optional): Seed for every engine. Defaults to 0.
+        display_progress (bool, optional): Whether to print each engine's
+                                           result. Defaults to True.
+
+    Returns:
+        list: One row per engine with the hands used, wall and CPU seconds,
+              CPU seconds scaled to the target, the EV and its standard error,
+              the exact EV and the z-score of the difference.
+    """
+    if rules is None:
+        rules = Rules(max_split_hands=2, hit_split_aces=False)
+    exact = exact_basic_strategy_ev(rules)
+    rows = []
+    for name in engines or ENGINES:
+        before = os.times()
+        start = time.perf_counter()
+        hands, ev, se = ENGINES[name](rules, target_se, max_hands, seed, workers)
+        wall = time.perf_counter() - start
+        after = os.times()
+        # User and system time of this process and its finished children
+        cpu = sum(after[:4]) - sum(before[:4])
+        row = {
+            "engine": name,
+            "hands": hands,
+            "wall_s": wall,
+            "cpu_s": cpu,
+            "cpu_at_target_s": cpu * (se / target_se) ** 2,
+            "ev": ev,
+            "se": se,
+            "exact_ev": exact,
+            "z_score": (ev - exact) / se if se else 0.0,
+            "reached": se <= target_se,
+        }
+        rows.append(row)
+        if display_progress:
+            print(f"{name:<12} {hands:>10,} hands {wall:>8.2f}s wall {cpu:>8.2f}s CPU")
+    return rows
+
+
+def format_precision_table(rows):
+    """
+    Format time-to-precision results as a text table, cheapest first.
+
+    Args:
+        rows (list): Output of `time_to_precision`.
+
+    Returns:
+        str: The formatted table, one engine per line.
+    """
+    lines = [
+        f"{'Engine':<12} {'Hands':>11} {'Wall s':>8} {'CPU s':>8} "
+        f"{'CPU@SE s':>9} {'EV':>9} {'SE':>8} {'z':>6}"
+    ]
+    for row in sorted(rows, key=lambda row: row["cpu_at_target_s"]):
+        flag = "" if row["reached"] else "  (target not reached)"
+        lines.append(
+            f"{row['engine']:<12} {row['hands']:>11,} {row['wall_s']:>8.2f} "
+            f"{row['cpu_s']:>8.2f} {row['cpu_at_target_s']:>9.2f} "
+            f"{row['ev']:>+9.4%} {row['se']:>8.4%} {row['z_score']:>+6.2f}{flag}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Run the time-to-precision benchmark from the command line.
+
+    Args:
+        argv (list, optional): Command-line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: Exit status.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.precision",
+        description="CPU time each engine needs to reach a house-edge precision.",
+    )
+    parser.add_argument(
+        "--target-se",
+        type=float,
+        default=0.002,
+        help="standard error of the EV per round to reach",
+    )
+    parser.add_argument(
+        "--only", nargs="+", choices=list(ENGINES), help="engines to run"
+    )
+    parser.add_argument(
+        "--max-hands", type=int, default=20000000, help="hands before giving up"
+    )
+    parser.add_argument("--workers", type=int, help="processes for the parallel engine")
+    parser.add_argument("--seed", type=int, default=0, help="seed for every engine")
+    args = parser.parse_args(argv)
+
+    rows = time_to_precision(
+        args.only, args.target_se, None, args.max_hands, args.workers, args.seed
+    )
+    print()
+    print(format_precision_table(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
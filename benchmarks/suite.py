@@ -0,0 +1,301 @@
+import json
+import platform
+import random
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from game import Card, Deck, Game, Hand, Strategy
+from instrumentation import RoundCounters
+from simulation import Simulation
+
+# Regression threshold in percent, unless a metric has its own
+DEFAULT_THRESHOLD = 10.0
+
+
+def _best_rate(function, operations, repeat):
+    """
+    Time a function several times and keep the fastest run.
+
+    Args:
+        function (callable): Runs `operations` operations per call.
+        operations (int): Operations performed by one call.
+        repeat (int): Timed calls.
+
+    Returns:
+        float: Operations per second of the fastest call.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return operations / best
+
+
+def _sample_hands(count, rng):
+    """
+    Build a list of random two- to four-card hands.
+
+    Args:
+        count (int): Hands to build.
+        rng (random.Random): Random generator.
+
+    Returns:
+        list: Hand objects.
+    """
+    deck = Deck(rng)
+    hands = []
+    for _ in range(count):
+        hand = Hand()
+        for _ in range(rng.choice((2, 2, 3, 4))):
+            hand.add_card(deck.deal_card())
+        hands.append(hand)
+    return hands
+
+
+def bench_deal_card(scale, repeat):
+    """Cards dealt per second from the infinite deck."""
+    deck = Deck(random.Random(0))
+    calls = 200000 * scale
+
+    def run():
+        deal = deck.deal_card
+        for _ in range(calls):
+            deal()
+
+    return _best_rate(run, calls, repeat)
+
+
+def bench_get_value(scale, repeat):
+    """Hand.get_value calls per second."""
+    hands = _sample_hands(1000, random.Random(1)) * (100 * scale)
+
+    def run():
+        for hand in hands:
+            hand.get_value()
+
+    return _best_rate(run, len(hands), repeat)
+
+
+def bench_is_soft(scale, repeat):
+    """Hand.is_soft calls per second."""
+    hands = _sample_hands(1000, random.Random(2)) * (100 * scale)
+
+    def run():
+        for hand in hands:
+            hand.is_soft()
+
+    return _best_rate(run, len(hands), repeat)
+
+
+def bench_decide_action(scale, repeat):
+    """Strategy.decide_action lookups per second."""
+    rng = random.Random(3)
+    strategy = Strategy()
+    hands = _sample_hands(1000, rng)
+    upcards = [Card(rng.choice(Card.RANKS)) for _ in hands]
+    pairs = list(zip(hands, upcards)) * (50 * scale)
+
+    def run():
+        decide = strategy.decide_action
+        for hand, upcard in pairs:
+            decide(hand, upcard)
+
+    return _best_rate(run, len(pairs), repeat)
+
+
+def bench_game_round(scale, repeat):
+    """Full Game rounds (deal, player turn, dealer turn, settle) per second."""
+    game = Game(Deck(random.Random(4)))
+    game.player.balance = 100000000000.0
+    rounds = 20000 * scale
+
+    def run():
+        for _ in range(rounds):
+            game.start_round(1.0)
+            round_over, _ = game.check_blackjack(False)
+            if not round_over:
+                game.player_turn()
+                if not game.surrendered:
+                    game.settle_round()
+            game.end_round()
+
+    return _best_rate(run, rounds, repeat)
+
+
+def bench_simulation(scale, repeat):
+    """Simulation.run hands per second."""
+    hands = 20000 * scale
+    simulation = Simulation(1.0, seed=5)
+    return _best_rate(
+        lambda: simulation.run(hands, display_progress=False), hands, repeat
+    )
+
+
+def bench_simulation_counters(scale, repeat):
+    """Simulation.run hands per second with RoundCounters attached."""
+    hands = 20000 * scale
+    simulation = Simulation(1.0, seed=5)
+    counters = RoundCounters()
+    return _best_rate(
+        lambda: simulation.run(hands, display_progress=False, counters=counters),
+        hands,
+        repeat,
+    )
+
+
+def bench_peak_memory(scale, repeat):
+    """Peak traced memory of building and running a Simulation, in KiB."""
+    tracemalloc.start()
+    try:
+        Simulation(1.0, seed=6).run(20000 * scale, display_progress=False)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+# Metric name -> (function, unit, whether higher is better)
+BENCHMARKS = {
+    "deck_deal_card": (bench_deal_card, "cards/s", True),
+    "hand_get_value": (bench_get_value, "calls/s", True),
+    "hand_is_soft": (bench_is_soft, "calls/s", True),
+    "strategy_decide_action": (bench_decide_action, "calls/s", True),
+    "game_round": (bench_game_round, "rounds/s", True),
+    "simulation_run": (bench_simulation, "hands/s", True),
+    "simulation_run_counters": (bench_simulation_counters, "hands/s", True),
+    "peak_memory": (bench_peak_memory, "KiB", False),
+}
+
+
+def run_benchmarks(names=None, scale=1, repeat=5, display_progress=True):
+    """
+    Run the benchmark suite.
+
+    Args:
+        names (list, optional): Benchmarks to run. Defaults to all of them.
+        scale (int, optional): Multiplier on the work per timed call.
+                               Defaults to 1.
+        repeat (int, optional): Timed calls per benchmark; the fastest is
+                                kept. Defaults to 5.
+        display_progress (bool, optional): Whether to print each result.
+                                           Defaults to True.
+
+    Returns:
+        dict: Metric name -> {"value", "unit", "higher_is_better"}.
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        function, unit, higher_is_better = BENCHMARKS[name]
+        value = function(scale, repeat)
+        results[name] = {
+            "value": value,
+            "unit": unit,
+            "higher_is_better": higher_is_better,
+        }
+        if display_progress:
+            print(f"{name:<24} {value:>14,.0f} {unit}")
+    return results
+
+
+def save_baseline(results, path, thresholds=None):
+    """
+    Write benchmark results to a JSON baseline.
+
+    Args:
+        results (dict): Output of `run_benchmarks`.
+        path (str): File to write.
+        thresholds (dict, optional): Metric name -> allowed regression in
+                                     percent, with "default" for the rest.
+                                     Defaults to DEFAULT_THRESHOLD for all.
+    """
+    baseline = {
+        "metadata": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "thresholds": thresholds or {"default": DEFAULT_THRESHOLD},
+        "metrics": results,
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+
+
+def load_baseline(path):
+    """
+    Read a JSON baseline.
+
+    Args:
+        path (str): The baseline file.
+
+    Returns:
+        dict: The baseline, with "metadata", "thresholds" and "metrics".
+    """
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def compare_results(results, baseline, threshold=None):
+    """
+    Compare benchmark results with a baseline.
+
+    A metric regresses when it moves in the wrong direction by more than its
+    threshold: slower for rates, larger for memory.
+
+    Args:
+        results (dict): Output of `run_benchmarks`.
+        baseline (dict): A baseline from `load_baseline`.
+        threshold (float, optional): Allowed regression in percent for every
+                                     metric, overriding the baseline's own
+                                     thresholds.
+
+    Returns:
+        list: One row per metric in both: name, baseline and current value,
+              change in percent, threshold and whether it regressed.
+    """
+    thresholds = baseline.get("thresholds", {})
+    rows = []
+    for name, current in results.items():
+        previous = baseline["metrics"].get(name)
+        if previous is None:
+            continue
+        limit = threshold
+        if limit is None:
+            limit = thresholds.get(name, thresholds.get("default", DEFAULT_THRESHOLD))
+        change = (current["value"] - previous["value"]) / previous["value"] * 100
+        worse = -change if current["higher_is_better"] else change
+        rows.append(
+            {
+                "metric": name,
+                "baseline": previous["value"],
+                "current": current["value"],
+                "change": change,
+                "threshold": limit,
+                "regressed": worse > limit,
+            }
+        )
+    return rows
+
+
+def format_comparison(rows):
+    """
+    Format a comparison as a text table.
+
+    Args:
+        rows (list): Output of `compare_results`.
+
+    Returns:
+        str: The formatted table, one metric per line.
+    """
+    lines = [
+        f"{'Metric':<24} {'Baseline':>14} {'Current':>14} {'Change':>8} {'Limit':>6}"
+    ]
+    for row in rows:
+        flag = "  REGRESSED" if row["regressed"] else ""
+        lines.append(
+            f"{row['metric']:<24} {row['baseline']:>14,.0f} {row['current']:>14,.0f} "
+            f"{row['change']:>+7.1f}% {row['threshold']:>5.0f}%{flag}"
+        )
+    return "\n".join(lines)
@@ -16,6 +16,7 @@ class Config:
             "initial_balance": 1000.0,
             "default_bet": 100.0,
             "show_strategy": True,
+            "late_surrender": False,
         },
         "ui": {"animation_delay": 1.0},
     }
@@ -0,0 +1,458 @@
+import argparse
+import json
+import multiprocessing
+import socket
+import struct
+import sys
+import threading
+from collections import deque
+from game.rules import Rules
+from parallel import mean_interval
+from simulation import ADDITIVE_STATS, simulate_chunk
+
+# Every message is a 4-byte big-endian length followed by that much JSON
+_HEADER = struct.Struct(">I")
+# Largest message accepted, against a corrupt or hostile length
+MAX_MESSAGE = 1 << 20
+
+
+def _send(connection, message):
+    """
+    Send one message.
+
+    Args:
+        connection (socket.socket): The connection.
+        message (dict): The message.
+    """
+    payload = json.dumps(message).encode("utf-8")
+    connection.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _receive_exactly(connection, size):
+    """
+    Read a number of bytes.
+
+    Args:
+        connection (socket.socket): The connection.
+        size (int): Bytes to read.
+
+    Returns:
+        bytes: The data.
+    """
+    data = bytearray()
+    while len(data) < size:
+        block = connection.recv(size - len(data))
+        if not block:
+            raise ConnectionError("Connection closed.")
+        data += block
+    return bytes(data)
+
+
+def _receive(connection):
+    """
+    Read one message.
+
+    Args:
+        connection (socket.socket): The connection.
+
+    Returns:
+        dict: The message.
+    """
+    (size,) = _HEADER.unpack(_receive_exactly(connection, _HEADER.size))
+    if size > MAX_MESSAGE:
+        raise ValueError(f"Message of {size} bytes is too large.")
+    return json.loads(_receive_exactly(connection, size).decode("utf-8"))
+
+
+def simulate_assignment(assignment):
+    """
+    Simulate one chunk assignment.
+
+    Args:
+        assignment (dict): The chunk's "bet_size", "rules" dict, "seed" and
+                           hand range "start" to "end".
+
+    Returns:
+        dict: The chunk's additive statistics.
+    """
+    return simulate_chunk(
+        (
+            assignment["bet_size"],
+            assignment["rules"],
+            None,
+            assignment["end"] - assignment["start"],
+            assignment["seed"],
+        )
+    )
+
+
+def run_worker(host, port, name=None):
+    """
+    Connect to a coordinator and simulate chunks until it has none left.
+
+    Args:
+        host (str): The coordinator's host.
+        port (int): The coordinator's port.
+        name (str, optional): Name to report. Defaults to host name and
+                              process id.
+
+    Returns:
+        int: Chunks simulated.
+    """
+    name = name or f"{socket.gethostname()}:{multiprocessing.current_process().pid}"
+    done = 0
+    with socket.create_connection((host, port)) as connection:
+        _send(connection, {"type": "ready", "name": name})
+        while True:
+            message = _receive(connection)
+            if message["type"] == "done":
+                return done
+            stats = simulate_assignment(message)
+            _send(connection, {"type": "result", "id": message["id"], "stats": stats})
+            done += 1
+
+
+class Coordinator:
+    """
+    Hands out chunks of simulation configurations to workers over TCP.
+
+    Each configuration is split into hand ranges, and each range is a chunk
+    seeded by its configuration and first hand, so it gives the same
+    results whichever worker runs it. Workers connect, say they are ready,
+    and are sent one chunk at a time; they reply with the chunk's additive
+    statistics, which are merged per configuration. If a worker disconnects
+    or goes silent for longer than the timeout, its chunk goes back to the
+    queue for another worker. A late result for a chunk already merged is
+    ignored.
+
+    Messages are length-prefixed JSON, so configurations are a bet size and
+    a rule set played with basic strategy.
+
+    Attributes:
+        configs (list): {"bet_size", "rules"} dicts, as from `config_grid`.
+        num_hands (int): Hands per configuration.
+        chunk_hands (int): Hands per chunk.
+        seed (int): Base seed.
+        timeout (float): Seconds a worker may take over a chunk.
+        address (tuple): The (host, port) listened on, once `start`ed.
+        reassigned (int): Chunks requeued after a worker failed.
+    """
+
+    def __init__(
+        self,
+        configs,
+        num_hands=1000000,
+        chunk_hands=100000,
+        seed=0,
+        timeout=300.0,
+        host="127.0.0.1",
+        port=0,
+    ):
+        """
+        Initialize a coordinator.
+
+        Args:
+            configs (list): {"bet_size", "rules"} dicts, as from `config_grid`.
+            num_hands (int, optional): Hands per configuration. Defaults to
+                                       1,000,000.
+            chunk_hands (int, optional): Hands per chunk. Defaults to 100,000.
+            seed (int, optional): Base seed. Defaults to 0.
+            timeout (float, optional): Seconds a worker may take over a chunk
+                                       before it is given up on. Defaults to
+                                       300.
+            host (str, optional): Interface to listen on. Defaults to
+                                  "127.0.0.1"; "0.0.0.0" accepts remote
+                                  workers.
+            port (int, optional): Port to listen on; 0 picks a free one.
+                                  Defaults to 0.
+        """
+        for config in configs:
+            if config.get("strategy") is not None:
+                raise ValueError("Distributed runs play basic strategy only.")
+        self.configs = [
+            {"bet_size": config.get("bet_size", 1.0), "rules": config["rules"]}
+            for config in configs
+        ]
+        self.num_hands = num_hands
+        self.chunk_hands = chunk_hands
+        self.seed = seed
+        self.timeout = timeout
+        self.address = (host, port)
+
+        self._chunks = []
+        for index, config in enumerate(self.configs):
+            for start in range(0, num_hands, chunk_hands):
+                self._chunks.append(
+                    {
+                        "type": "chunk",
+                        "id": len(self._chunks),
+                        "config": index,
+                        "bet_size": config["bet_size"],
+                        "rules": config["rules"].to_dict(),
+                        "seed": f"{seed}:{index}:{start}",
+                        "start": start,
+                        "end": min(start + chunk_hands, num_hands),
+                    }
+                )
+        self._queue = deque(self._chunks)
+        self._merged = set()
+        self._totals = [dict.fromkeys(ADDITIVE_STATS, 0) for _ in self.configs]
+        self._condition = threading.Condition()
+        self._listener = None
+        self.reassigned = 0
+
+    def start(self):
+        """
+        Start listening and accepting workers in the background.
+
+        Returns:
+            tuple: The (host, port) listened on.
+        """
+        self._listener = socket.create_server(self.address)
+        self.address = self._listener.getsockname()[:2]
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self.address
+
+    def _accept(self):
+        """Accept workers, each on its own thread, until the listener closes."""
+        while True:
+            try:
+                connection, _ = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(
+                target=self._serve_worker, args=(connection,), daemon=True
+            ).start()
+
+    @property
+    def finished(self):
+        """bool: Whether every chunk has been merged."""
+        return len(self._merged) == len(self._chunks)
+
+    def _next_chunk(self):
+        """
+        Wait for a chunk to assign.
+
+        Returns:
+            dict: The chunk, or None once every chunk has been merged.
+        """
+        with self._condition:
+            while not self._queue and not self.finished:
+                self._condition.wait()
+            return self._queue.popleft() if self._queue else None
+
+    def _serve_worker(self, connection):
+        """
+        Feed one worker chunks until there are none left or it fails.
+
+        Args:
+            connection (socket.socket): The worker's connection.
+        """
+        chunk = None
+        try:
+            connection.settimeout(self.timeout)
+            if _receive(connection).get("type") != "ready":
+                return
+            while True:
+                chunk = self._next_chunk()
+                if chunk is None:
+                    _send(connection, {"type": "done"})
+                    return
+                _send(connection, chunk)
+                message = _receive(connection)
+                if message.get("type") != "result" or message["id"] != chunk["id"]:
+                    return
+                self._merge(chunk, message["stats"])
+                chunk = None
+        except (OSError, ValueError, KeyError):
+            pass  # The worker failed; its chunk is requeued below
+        finally:
+            connection.close()
+            if chunk is not None:
+                with self._condition:
+                    if chunk["id"] not in self._merged:
+                        self._queue.appendleft(chunk)
+                        self.reassigned += 1
+                        self._condition.notify_all()
+
+    def _merge(self, chunk, stats):
+        """
+        Add a chunk's statistics to its configuration's, once.
+
+        Args:
+            chunk (dict): The chunk.
+            stats (dict): Its additive statistics.
+        """
+        with self._condition:
+            if chunk["id"] in self._merged:
+                return
+            totals = self._totals[chunk["config"]]
+            for name in ADDITIVE_STATS:
+                totals[name] += stats[name]
+            self._merged.add(chunk["id"])
+            self._condition.notify_all()
+
+    def wait(self, timeout=None):
+        """
+        Wait for every chunk to be merged.
+
+        Args:
+            timeout (float, optional): Seconds to wait. Defaults to forever.
+
+        Returns:
+            bool: Whether every chunk was merged.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self.finished, timeout)
+
+    def close(self):
+        """Stop accepting workers; connected ones are told there is no more work."""
+        if self._listener is not None:
+            self._listener.close()
+        with self._condition:
+            self._condition.notify_all()
+
+    def results(self, z=1.96):
+        """
+        Summarize the merged statistics.
+
+        Args:
+            z (float, optional): Normal quantile of the confidence interval.
+                                 Defaults to 1.96 (95%).
+
+        Returns:
+            list: One row per configuration with its bet size, rules, the
+                  hands and rounds played, the house edge per initial bet and
+                  its confidence interval in percent, and its statistics.
+        """
+        rows = []
+        for config, totals in zip(self.configs, self._totals):
+            rounds = totals["rounds_played"]
+            mean, half_width = mean_interval(
+                rounds,
+                totals["total_profit"] / config["bet_size"],
+                totals["sum_squared_profit"],
+                z,
+            )
+            edge = -mean * 100
+            half_width *= 100
+            rows.append(
+                {
+                    "bet_size": config["bet_size"],
+                    "rules": config["rules"],
+                    "hands": totals["hands_played"],
+                    "rounds": rounds,
+                    "house_edge": edge,
+                    "ci_low": edge - half_width,
+                    "ci_high": edge + half_width,
+                    "stats": dict(totals),
+                }
+            )
+        return rows
+
+    def run(self):
+        """
+        Serve workers until every chunk is merged.
+
+        Returns:
+            list: The results (see `results`).
+        """
+        if self._listener is None:
+            self.start()
+        try:
+            self.wait()
+        finally:
+            self.close()
+        return self.results()
+
+
+def run_local(configs, num_hands=1000000, workers=4, chunk_hands=100000, seed=0):
+    """
+    Run a coordinator with worker processes on this machine over localhost.
+
+    Args:
+        configs (list): {"bet_size", "rules"} dicts, as from `config_grid`.
+        num_hands (int, optional): Hands per configuration. Defaults to
+                                   1,000,000.
+        workers (int, optional): Worker processes. Defaults to 4.
+        chunk_hands (int, optional): Hands per chunk. Defaults to 100,000.
+        seed (int, optional): Base seed. Defaults to 0.
+
+    Returns:
+        list: The results (see `Coordinator.results`).
+    """
+    coordinator = Coordinator(configs, num_hands, chunk_hands, seed)
+    host, port = coordinator.start()
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(host, port))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        return coordinator.run()
+    finally:
+        for process in processes:
+            process.join()
+
+
+def main(argv=None):
+    """
+    Run a coordinator or a worker from the command line.
+
+    Args:
+        argv (list, optional): Command-line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: Exit status.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m distributed",
+        description="Simulate over several machines with a coordinator and workers.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    coordinator = commands.add_parser("coordinator", help="hand out chunks")
+    coordinator.add_argument("--host", default="0.0.0.0", help="interface to bind")
+    coordinator.add_argument("--port", type=int, default=5555, help="port to bind")
+    coordinator.add_argument(
+        "--hands", type=int, default=1000000, help="hands per configuration"
+    )
+    coordinator.add_argument(
+        "--chunk-hands", type=int, default=100000, help="hands per chunk"
+    )
+    coordinator.add_argument(
+        "--decks",
+        type=int,
+        nargs="+",
+        default=[0],
+        help="deck counts to sweep; 0 is an infinite deck",
+    )
+    coordinator.add_argument("--seed", type=int, default=0, help="base seed")
+    worker = commands.add_parser("worker", help="simulate chunks")
+    worker.add_argument("--host", default="127.0.0.1", help="coordinator host")
+    worker.add_argument("--port", type=int, default=5555, help="coordinator port")
+    args = parser.parse_args(argv)
+
+    if args.command == "worker":
+        print(f"Simulated {run_worker(args.host, args.port)} chunks")
+        return 0
+
+    configs = [
+        {"bet_size": 1.0, "rules": Rules(num_decks=decks or None)}
+        for decks in args.decks
+    ]
+    server = Coordinator(
+        configs, args.hands, args.chunk_hands, args.seed, host=args.host, port=args.port
+    )
+    host, port = server.start()
+    print(f"Waiting for workers on {host}:{port}")
+    for row in server.run():
+        print(
+            f"{row['rules'].describe():<36} {row['hands']:>12,} "
+            f"{row['house_edge']:>8.3f}% [{row['ci_low']:.3f}, {row['ci_high']:.3f}]"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
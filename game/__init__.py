@@ -2,8 +2,27 @@ from game.game import Game
 from game.player import Player
 from game.dealer import Dealer
 from game.deck import Deck
+from game.shoe import Shoe
 from game.hand import Hand
 from game.card import Card
 from game.strategy import Strategy
+from game.rules import Rules
+from game.table import Table, Seat
+from game.counting import CountingSystem, Counter, BetSpread
 
-__all__ = ["Game", "Player", "Dealer", "Deck", "Hand", "Card", "Strategy"]
+__all__ = [
+    "Game",
+    "Player",
+    "Dealer",
+    "Deck",
+    "Shoe",
+    "Hand",
+    "Card",
+    "Strategy",
+    "Rules",
+    "Table",
+    "Seat",
+    "CountingSystem",
+    "Counter",
+    "BetSpread",
+]
@@ -2,20 +2,48 @@ class Card:
     """
     Represents a playing card in a standard deck.
 
+    Cards with a suit also carry a compact code that fits in one byte:
+    rank index * 4 + suit index, so the 52 distinct cards are codes 0-51.
+
     Attributes:
         rank (str): The rank of the card ('2', '3', ..., 'A').
+        suit (str): The suit ('S', 'H', 'D', 'C'), or None if not tracked.
         value (int): The blackjack value of the card.
+        code (int): The card's compact code, or None without a suit.
     """
 
-    def __init__(self, rank):
+    RANKS = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
+    SUITS = ["S", "H", "D", "C"]
+
+    def __init__(self, rank, suit=None):
         """
-        Initialize a card with a given rank.
+        Initialize a card with a given rank and optional suit.
 
         Args:
             rank (str): The rank of the card ('2', '3', ..., 'A').
+            suit (str, optional): The suit ('S', 'H', 'D', 'C'). Defaults to None.
         """
         self.rank = rank
+        self.suit = suit
         self.value = self._calculate_value()
+        self.code = (
+            None
+            if suit is None
+            else self.RANKS.index(rank) * 4 + self.SUITS.index(suit)
+        )
+
+    @classmethod
+    def from_code(cls, code):
+        """
+        Create a card from its compact code.
+
+        Args:
+            code (int): The code (0-51).
+
+        Returns:
+            Card: The card with that rank and suit.
+        """
+        return cls(cls.RANKS[code // 4], cls.SUITS[code % 4])
 
     def _calculate_value(self):
         """
@@ -39,4 +67,6 @@ class Card:
         Returns:
             str: The string representation of the card.
         """
-        return f"{self.rank}"
+        if self.suit is None:
+            return f"{self.rank}"
+        return f"{self.rank}{self.suit}"
@@ -0,0 +1,262 @@
+import math
+
+
+class CountingSystem:
+    """
+    Describes a card-counting system by the tag assigned to each rank.
+
+    Attributes:
+        name (str): Display name of the system.
+        tags (dict): Tag value for every rank ('2', ..., 'A').
+        balanced (bool): True if the tags of a full deck sum to zero.
+        pivot (float): Running count an unbalanced system starts a shoe at,
+                       on top of the negated full-shoe tag sum.
+    """
+
+    RANKS = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
+
+    def __init__(self, name, tags, pivot=0):
+        """
+        Initialize a counting system.
+
+        Args:
+            name (str): Display name of the system.
+            tags (dict): Tag per rank. Face cards may be omitted and default to
+                         the tag given for '10'.
+            pivot (float, optional): Initial running count offset for unbalanced
+                                     systems. Defaults to 0.
+        """
+        self.name = name
+        self.pivot = pivot
+        self.tags = {}
+        for rank in self.RANKS:
+            if rank in tags:
+                self.tags[rank] = tags[rank]
+            elif rank in ("J", "Q", "K"):
+                self.tags[rank] = tags["10"]
+            else:
+                raise ValueError(f"Missing tag for rank {rank} in {name}.")
+        self.balanced = sum(self.tags.values()) == 0
+
+    def initial_running_count(self, num_decks):
+        """
+        Get the running count at the start of a fresh shoe.
+
+        Balanced systems start at zero. Unbalanced systems start at the pivot
+        minus the full-shoe tag sum, so counting every card of the shoe ends
+        at the pivot (KO's 4 - 4 * decks convention). Each rank appears
+        four times per deck.
+
+        Args:
+            num_decks (int): Number of decks in the shoe.
+
+        Returns:
+            float: The initial running count.
+        """
+        if self.balanced:
+            return 0
+        return self.pivot - 4 * sum(self.tags.values()) * num_decks
+
+    def to_dict(self):
+        """
+        Convert the system to a plain dictionary.
+
+        Returns:
+            dict: The name, the tag of every rank and the pivot.
+        """
+        return {"name": self.name, "tags": dict(self.tags), "pivot": self.pivot}
+
+    def __repr__(self):
+        """
+        Return a string representation of the system.
+
+        Returns:
+            str: The string representation of the system.
+        """
+        return f"CountingSystem({self.name})"
+
+
+HI_LO = CountingSystem(
+    "Hi-Lo",
+    {"2": 1, "3": 1, "4": 1, "5": 1, "6": 1, "7": 0, "8": 0, "9": 0, "10": -1, "A": -1},
+)
+KO = CountingSystem(
+    "KO",
+    {"2": 1, "3": 1, "4": 1, "5": 1, "6": 1, "7": 1, "8": 0, "9": 0, "10": -1, "A": -1},
+    pivot=4,
+)
+OMEGA_II = CountingSystem(
+    "Omega II",
+    {"2": 1, "3": 1, "4": 2, "5": 2, "6": 2, "7": 1, "8": 0, "9": -1, "10": -2, "A": 0},
+)
+
+HI_OPT_I = CountingSystem(
+    "Hi-Opt I",
+    {"2": 0, "3": 1, "4": 1, "5": 1, "6": 1, "7": 0, "8": 0, "9": 0, "10": -1, "A": 0},
+)
+HI_OPT_II = CountingSystem(
+    "Hi-Opt II",
+    {"2": 1, "3": 1, "4": 2, "5": 2, "6": 1, "7": 1, "8": 0, "9": 0, "10": -2, "A": 0},
+)
+ZEN = CountingSystem(
+    "Zen Count",
+    {"2": 1, "3": 1, "4": 2, "5": 2, "6": 2, "7": 1, "8": 0, "9": 0, "10": -2, "A": -1},
+)
+WONG_HALVES = CountingSystem(
+    "Wong Halves",
+    {
+        "2": 0.5,
+        "3": 1,
+        "4": 1,
+        "5": 1.5,
+        "6": 1,
+        "7": 0.5,
+        "8": 0,
+        "9": -0.5,
+        "10": -1,
+        "A": -1,
+    },
+)
+
+SYSTEMS = {
+    system.name: system
+    for system in (HI_LO, KO, OMEGA_II, HI_OPT_I, HI_OPT_II, ZEN, WONG_HALVES)
+}
+
+
+class Counter:
+    """
+    Keeps a running count incrementally as cards leave a shoe.
+
+    The shoe calls `observe` for every visible card, so the running count is
+    always current without rescanning dealt cards.
+
+    Attributes:
+        system (CountingSystem): The counting system in use.
+        running_count (float): The current running count.
+        shoe (Shoe): The shoe being counted, set on reset.
+    """
+
+    # Never divide by less than a quarter deck when converting to a true count
+    MIN_DECKS = 0.25
+
+    def __init__(self, system):
+        """
+        Initialize a counter for a counting system.
+
+        Args:
+            system (CountingSystem): The counting system to use.
+        """
+        self.system = system
+        self._tags = system.tags
+        self.running_count = 0
+        self.shoe = None
+
+    def reset(self, shoe):
+        """
+        Reset the count for a freshly shuffled shoe.
+
+        Args:
+            shoe (Shoe): The shoe that was shuffled.
+        """
+        self.shoe = shoe
+        self.running_count = self.system.initial_running_count(shoe.num_decks)
+
+    def observe(self, card):
+        """
+        Update the running count with a newly seen card.
+
+        Args:
+            card (Card): The card that became visible.
+        """
+        self.running_count += self._tags[card.rank]
+
+    def true_count(self):
+        """
+        Get the running count normalised by the decks remaining.
+
+        Returns:
+            float: The true count.
+        """
+        decks = self.shoe.decks_remaining() if self.shoe is not None else 1.0
+        return self.running_count / max(decks, self.MIN_DECKS)
+
+    def betting_count(self):
+        """
+        Get the count used to size bets: the true count for balanced systems
+        and the running count for unbalanced ones.
+
+        Returns:
+            float: The betting count.
+        """
+        if self.system.balanced:
+            return self.true_count()
+        return self.running_count
+
+    def true_count_bucket(self):
+        """
+        Get the true count floored to an integer bucket.
+
+        Returns:
+            int: The true-count bucket.
+        """
+        return math.floor(self.true_count())
+
+
+class BetSpread:
+    """
+    Maps a betting count to a bet size in units via a stepped ramp.
+
+    Attributes:
+        ramp (dict): Count threshold -> units bet at or above that count.
+        min_units (float): Units bet below the lowest threshold.
+    """
+
+    def __init__(self, ramp=None, min_units=1):
+        """
+        Initialize a bet spread.
+
+        Args:
+            ramp (dict, optional): Count threshold -> units. Defaults to a
+                                   1-12 spread starting at +1.
+            min_units (float, optional): Units bet below the ramp. Defaults to 1.
+        """
+        if ramp is None:
+            ramp = {1: 1, 2: 2, 3: 4, 4: 8, 5: 12}
+        self.ramp = dict(ramp)
+        self.min_units = min_units
+
+        # Precompute a flat table over integer counts so lookups are O(1)
+        self._low = min(self.ramp)
+        self._high = max(self.ramp)
+        self._table = []
+        units = min_units
+        for count in range(self._low, self._high + 1):
+            units = self.ramp.get(count, units)
+            self._table.append(units)
+
+    def units(self, count):
+        """
+        Get the bet size for a count.
+
+        Args:
+            count (float): The betting count.
+
+        Returns:
+            float: The bet in units.
+        """
+        count = math.floor(count)
+        if count < self._low:
+            return self.min_units
+        if count >= self._high:
+            return self._table[-1]
+        return self._table[count - self._low]
+
+    def max_units(self):
+        """
+        Get the largest bet on the ramp.
+
+        Returns:
+            float: The top of the spread in units.
+        """
+        return max(self.min_units, max(self._table))
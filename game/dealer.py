@@ -1,4 +1,5 @@
 from game.hand import Hand
+from game.rules import Rules
 
 
 class Dealer:
@@ -8,12 +9,19 @@ class Dealer:
     Attributes:
         hand (Hand): The dealer's current hand.
         upcard (Card): The dealer's face-up card.
+        rules (Rules): The table rules the dealer follows.
     """
 
-    def __init__(self):
-        """Initialize a dealer with an empty hand."""
+    def __init__(self, rules=None):
+        """
+        Initialize a dealer with an empty hand.
+
+        Args:
+            rules (Rules, optional): The table rules. Defaults to Rules().
+        """
         self.hand = Hand()
         self.upcard = None
+        self.rules = rules if rules is not None else Rules()
 
     def set_upcard(self):
         """Set the upcard to the first card in the dealer's hand."""
@@ -22,14 +30,15 @@ class Dealer:
 
     def should_hit(self):
         """
-        Determine if the dealer should hit according to fixed rules.
+        Determine if the dealer should hit according to the table rules.
         Returns:
             bool: True if the dealer should hit, False otherwise.
         """
-        # Hit on soft 17
-        if self.hand.get_value() == 17 and self.hand.is_soft():
+        value = self.hand.get_value()
+        # Hit on soft 17 under H17 rules
+        if value == 17 and self.rules.hit_soft_17 and self.hand.is_soft():
             return True
-        return self.hand.get_value() < 17
+        return value < 17
 
     def clear_hand(self):
         """Clear the dealer's hand and upcard."""
@@ -8,23 +8,65 @@ class Deck:
 
     In this implementation, cards are randomly selected each time,
     effectively simulating an infinite deck (cards are replaced after being dealt).
+
+    Attributes:
+        rng (random.Random): Source of randomness used for dealing.
+        cards (list): One shared Card for each rank and suit.
     """
 
     # All possible card ranks in a standard deck
     RANKS = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
 
-    def __init__(self):
-        """Initialize the infinite deck."""
-        pass  # No initialization needed for an infinite deck
+    def __init__(self, rng=None):
+        """
+        Initialize the infinite deck.
 
-    def deal_card(self):
+        Args:
+            rng (random.Random, optional): Random generator to deal from.
+                                           Defaults to the global random module.
+        """
+        self.rng = rng if rng is not None else random
+        # One card of each rank and suit; a dealt card is drawn from these
+        self.cards = [Card(rank, suit) for rank in self.RANKS for suit in Card.SUITS]
+
+    def deal_card(self, visible=True):
         """
         Deal a random card from the deck.
 
+        Args:
+            visible (bool, optional): Whether the card is dealt face up. An
+                                      infinite deck has no memory, so this only
+                                      exists for interface parity with Shoe.
+
         Returns:
             Card: A randomly selected card.
         """
-        # Randomly select a rank from the available ranks
-        rank = random.choice(self.RANKS)
-        card = Card(rank)
-        return card
+        # Randomly select one of the 52 cards; every card is equally likely
+        return self.cards[int(self.rng.random() * 52)]
+
+    def reveal(self, card):
+        """
+        Turn a face-down card face up. Nothing to track for an infinite deck.
+
+        Args:
+            card (Card): The card being revealed.
+        """
+        pass
+
+    def unseen_tens(self):
+        """
+        Get the ten-valued cards among the unseen cards.
+
+        Returns:
+            None: An infinite deck never changes composition.
+        """
+        return None
+
+    def needs_shuffle(self):
+        """
+        Check whether the deck must be reshuffled before the next round.
+
+        Returns:
+            bool: Always False for an infinite deck.
+        """
+        return False
@@ -1,8 +1,7 @@
-from game.deck import Deck
 from game.player import Player
 from game.dealer import Dealer
 from game.strategy import Strategy
-from game.hand import Hand
+from game.rules import Rules
 
 
 class Game:
@@ -13,15 +12,54 @@ class Game:
         deck (Deck): The deck of cards.
         player (Player): The player in the game.
         dealer (Dealer): The dealer in the game.
+        rules (Rules): The table rules.
         bet (float): The current bet.
+        surrendered (bool): Whether the player surrendered this round.
+        insurance_bet (float): The insurance staked this round (0 if none).
+        decisions: Optional decision tables (see analysis.decisions) that decide
+                   surrender, insurance and even money. Without them the player
+                   declines insurance and surrenders by the strategy's table.
     """
 
-    def __init__(self):
-        """Initialize a new game with a deck, player, and dealer."""
-        self.deck = Deck()
-        self.player = Player()
-        self.dealer = Dealer()
+    def __init__(self, deck=None, rules=None, decisions=None):
+        """
+        Initialize a new game with a deck, player, and dealer.
+
+        Args:
+            deck (Deck or Shoe, optional): The card source to deal from.
+                                           Defaults to the deck the rules call for.
+            rules (Rules, optional): The table rules. Defaults to Rules().
+            decisions (DecisionTables, optional): Surrender and insurance
+                                                  decisions. Defaults to None.
+        """
+        self.decisions = decisions
+        self.rules = rules if rules is not None else Rules()
+        self.deck = deck if deck is not None else self.rules.create_deck()
+        self.player = Player(max_hands=self.rules.max_split_hands)
+        self.dealer = Dealer(self.rules)
         self.bet = 0.0
+        self.surrendered = False
+        self.insurance_bet = 0.0
+
+    def place_bet(self, bet_amount):
+        """
+        Place the player's bet and clear their hands for a new round.
+
+        Args:
+            bet_amount (float): The amount to bet for this round.
+
+        Returns:
+            bool: True if the bet was placed, False if the balance is too low.
+        """
+        bet = self.player.place_bet(bet_amount)
+        if bet == 0:
+            return False
+
+        self.bet = bet
+        self.surrendered = False
+        self.insurance_bet = 0.0
+        self.player.clear_hands()
+        return True
 
     def start_round(self, bet_amount):
         """
@@ -34,243 +72,255 @@ class Game:
             bool: True if the round starts successfully, False otherwise.
         """
         # Place the bet
-        bet = self.player.place_bet(bet_amount)
-        if bet == 0:
+        if not self.place_bet(bet_amount):
             return False
 
-        self.bet = bet
+        # Reshuffle a finite shoe once the cut card has come out
+        if self.deck.needs_shuffle():
+            self.deck.shuffle()
 
-        # Clear hands from previous round
-        self.player.clear_hands()
+        # Clear the dealer's hand from the previous round
         self.dealer.clear_hand()
 
         # Deal initial cards
         self.player.hand.add_card(self.deck.deal_card())
         self.dealer.hand.add_card(self.deck.deal_card())
         self.player.hand.add_card(self.deck.deal_card())
-        self.dealer.hand.add_card(self.deck.deal_card())
+        self.dealer.hand.add_card(self.deck.deal_card(visible=False))
 
         # Set dealer's upcard
         self.dealer.set_upcard()
 
         return True
 
-    def check_blackjack(self):
+    def check_blackjack(self, insure=None, dealer_blackjack=None):
         """
-        Check for blackjack at the start of the round.
+        Check for blackjack at the start of the round, offering insurance (or
+        even money on a natural) when the dealer shows an ace.
+
+        Args:
+            insure (bool, optional): Whether the player takes insurance or even
+                                     money if offered. Defaults to None, which
+                                     asks the game's decision tables.
+            dealer_blackjack (bool, optional): Whether the dealer has a natural,
+                                               when already known (e.g. once
+                                               for a whole table).
 
         Returns:
             tuple: (True, result) if the game ends with blackjack, (False, None) otherwise.
-                  result is one of "player_blackjack", "dealer_blackjack", or "push".
+                  result is one of "player_blackjack", "dealer_blackjack",
+                  "even_money", or "push".
         """
         player_blackjack = self.player.hand.is_blackjack()
-        dealer_blackjack = self.dealer.hand.is_blackjack()
+        if dealer_blackjack is None:
+            dealer_blackjack = self.dealer.hand.is_blackjack()
+
+        if self.dealer.upcard.rank == "A":
+            if insure is None:
+                insure = self.wants_insurance()
+            if insure and player_blackjack:
+                # Even money: paid 1:1 at once, whatever the hole card
+                self.player.receive_winnings(self.bet * 2)
+                return True, "even_money"
+            if insure and self.player.balance >= self.bet / 2:
+                # Insurance is a side bet of half the bet, paying 2:1
+                self.insurance_bet = self.bet / 2
+                self.player.balance -= self.insurance_bet
+                if dealer_blackjack:
+                    self.player.receive_winnings(self.insurance_bet * 3)
 
         if player_blackjack and dealer_blackjack:
             # Push - both have blackjack
             self.player.receive_winnings(self.bet)  # Return the bet
             return True, "push"
         elif player_blackjack:
-            # Player wins with blackjack (3:2 payout)
-            self.player.receive_winnings(self.bet * 2.5)  # Original bet + 1.5x win
+            # Player wins with blackjack (3:2 or 6:5 payout)
+            self.player.receive_winnings(self.bet * (1 + self.rules.blackjack_payout))
             return True, "player_blackjack"
-        elif dealer_blackjack:
-            # Dealer wins with blackjack
+        elif dealer_blackjack and self.rules.dealer_peek:
+            # Dealer peeks and wins with blackjack; without a peek the natural
+            # is only revealed after the player has acted
             return True, "dealer_blackjack"
 
         # No blackjack, continue the game
         return False, None
 
-    def player_turn(self):
+    def wants_insurance(self):
         """
-        Execute the player's turn according to perfect strategy.
+        Ask the decision tables whether to insure, or take even money on a
+        natural, against the dealer's ace.
 
         Returns:
-            bool: True if the player busts, False otherwise.
+            bool: True to insure or take even money.
         """
-        first_action = True
-        bust = False
+        if self.decisions is None:
+            return False
+        if self.player.hand.is_blackjack():
+            return self.decisions.should_take_even_money(self.deck)
+        return self.decisions.should_insure(self.deck)
 
-        # Handle potential splits
-        split_result = self.handle_splits()
-        if isinstance(split_result, dict):
-            # Split was executed, use the split results
-            self.split_results = split_result
-            return split_result["both_bust"]
+    def wants_surrender(self):
+        """
+        Decide whether to late surrender the starting hand.
 
-        # Regular (non-split) play
-        while True:
-            action = self.player.decide_action(self.dealer.upcard, first_action)
-
-            if action == Strategy.HIT:
-                self.player.hand.add_card(self.deck.deal_card())
-                if self.player.hand.get_value() > 21:
-                    return True  # Player busts
-                first_action = False
-
-            elif action == Strategy.STAND:
-                return False  # Player stands, no bust
-
-            elif action == Strategy.DOUBLE:
-                # Double the bet if balance allows
-                if self.player.balance >= self.bet:
-                    self.player.balance -= self.bet
-                    self.bet *= 2
-                    self.player.hand.add_card(self.deck.deal_card())
-                    return self.player.hand.get_value() > 21  # True if bust
-                else:
-                    print("Cannot double: insufficient balance.")
-                    continue
-
-            elif action == Strategy.SPLIT:
-                return self.handle_splits()
-
-    def handle_splits(self):
-        """
-        Handle splitting in the simulation.
         Returns:
-            dict: Results of split hands {"first_hand_result": result1, "second_hand_result": result2}
+            bool: True to surrender.
         """
-        # Check if we should split
-        if not self.player.hand.is_pair() or len(self.player.hand.cards) != 2:
-            return False  # Not a valid split situation
+        if self.decisions is not None:
+            return self.decisions.should_surrender(self.player.hand, self.dealer.upcard)
+        return self.player.strategy.should_surrender(
+            self.player.hand, self.dealer.upcard
+        )
 
-        original_bet = self.bet
-        original_hand = self.player.hand
-
-        # Split the hand
-        split_card = original_hand.cards[1]
-        original_hand.cards.pop()  # Remove second card
+    def surrender(self):
+        """
+        Late surrender the starting hand, getting half the bet back unless
+        the dealer turns out to have blackjack.
+        """
+        self.surrendered = True
+        if not self.dealer.hand.is_blackjack():
+            self.player.receive_winnings(self.bet / 2)  # Return half the bet
 
-        # Create second hand with the split card
-        second_hand = Hand()
-        second_hand.add_card(split_card)
+    def player_turn(self):
+        """
+        Execute the player's turn according to perfect strategy.
 
-        # Place additional bet
-        additional_bet = min(original_bet, self.player.balance)
-        if additional_bet <= 0:
-            return False  # Not enough balance
+        Pairs are split and resplit into the player's preallocated hand pool
+        as far as the rules and balance allow, and each hand is then played
+        out in order.
 
-        self.player.balance -= additional_bet
+        Returns:
+            bool: True if every player hand busts (or the player surrenders),
+                  False otherwise.
+        """
+        player = self.player
+
+        # Late surrender is only offered on the first two cards
+        if self.rules.late_surrender and self.wants_surrender():
+            self.surrender()
+            return True
+
+        player.hand_bets[0] = self.bet
+        all_bust = True
+        index = 0
+        while index < player.hand_count:
+            hand = player.hands[index]
+            if len(hand.cards) == 1:
+                # A split hand receives its second card when its turn comes
+                hand.add_card(self.deck.deal_card())
+            self.handle_splits(index)
+
+            if (
+                player.hand_count > 1
+                and hand.cards[0].rank == "A"
+                and not self.rules.hit_split_aces
+            ):
+                bust = False  # Split aces receive one card each
+            else:
+                bust = self.play_hand(hand, index)
+            all_bust = all_bust and bust
+            index += 1
+
+        return all_bust
+
+    def handle_splits(self, index=0):
+        """
+        Split a pooled hand for as long as the strategy, rules and balance allow.
 
-        # Deal one card to each hand
-        original_hand.add_card(self.deck.deal_card())
-        second_hand.add_card(self.deck.deal_card())
+        The hand keeps its first card and draws a new second card after each
+        split; the split-off hands draw theirs when they are played.
 
-        # Track results
-        results = {"total_win": 0, "first_hand_win": 0, "second_hand_win": 0}
+        Args:
+            index (int, optional): The pooled hand to split. Defaults to 0.
 
-        # Play first hand
-        first_hand_bust = self.play_hand(original_hand)
+        Returns:
+            int: The number of times the hand was split.
+        """
+        player = self.player
+        hand = player.hands[index]
+        splits = 0
+
+        while (
+            self.rules.can_split(hand, player.hand_count)
+            and player.strategy.decide_action(hand, self.dealer.upcard)
+            == Strategy.SPLIT
+            and player.balance >= player.hand_bets[index]
+        ):
+            player.balance -= player.hand_bets[index]
+            player.split_hand(index)
+            hand.add_card(self.deck.deal_card())
+            splits += 1
+
+        return splits
+
+    def choose_action(self, hand, first_action=True, split_hand=False):
+        """
+        Get the strategy's action for a hand, replacing plays the rules forbid.
 
-        # Play second hand
-        self.player.hand = second_hand
-        second_hand_bust = self.play_hand(second_hand)
+        A pair that cannot be split is played by its total, and a double that
+        is not allowed becomes a hit (or a stand on soft 18 and above).
 
-        # Dealer plays (if either hand didn't bust)
-        if not (first_hand_bust and second_hand_bust):
-            dealer_bust = self.dealer_turn()
-            dealer_value = self.dealer.hand.get_value()
+        Args:
+            hand (Hand): The hand to play.
+            first_action (bool, optional): Whether the hand has not acted yet.
+            split_hand (bool, optional): Whether the hand came from a split.
 
-            # Calculate first hand result
-            if not first_hand_bust:
-                first_value = original_hand.get_value()
-                if dealer_bust or first_value > dealer_value:
-                    results["first_hand_win"] = original_bet
-                    results["total_win"] += original_bet
-                    self.player.receive_winnings(original_bet * 2)
-                elif first_value == dealer_value:
-                    # Push
-                    self.player.receive_winnings(original_bet)
-
-            # Calculate second hand result
-            if not second_hand_bust:
-                second_value = second_hand.get_value()
-                if dealer_bust or second_value > dealer_value:
-                    results["second_hand_win"] = additional_bet
-                    results["total_win"] += additional_bet
-                    self.player.receive_winnings(additional_bet * 2)
-                elif second_value == dealer_value:
-                    # Push
-                    self.player.receive_winnings(additional_bet)
-
-        # Restore original hand
-        self.player.hand = original_hand
-
-        # Return both bust flag and win amounts
-        return {
-            "both_bust": first_hand_bust and second_hand_bust,
-            "results": results,
-            "hand_results": [
-                (
-                    "win"
-                    if not first_hand_bust
-                    and (dealer_bust or first_value > dealer_value)
-                    else (
-                        "push"
-                        if not first_hand_bust and first_value == dealer_value
-                        else "loss"
-                    )
-                ),
-                (
-                    "win"
-                    if not second_hand_bust
-                    and (dealer_bust or second_value > dealer_value)
-                    else (
-                        "push"
-                        if not second_hand_bust and second_value == dealer_value
-                        else "loss"
-                    )
-                ),
-            ],
-        }
-
-    def play_hand(self, hand):
+        Returns:
+            str: The action to take (HIT, STAND or DOUBLE).
+        """
+        strategy = self.player.strategy
+        action = strategy.decide_action(hand, self.dealer.upcard)
+
+        if action == Strategy.SPLIT:
+            action = strategy.lookup(
+                strategy.total_key(hand), strategy.dealer_key(self.dealer.upcard)
+            )
+        if action == Strategy.DOUBLE and not (
+            first_action and self.rules.can_double(hand, split_hand)
+        ):
+            if hand.is_soft() and hand.get_value() >= 18:
+                action = Strategy.STAND
+            else:
+                action = Strategy.HIT
+
+        return action
+
+    def play_hand(self, hand, index=0):
         """
         Play a single hand according to strategy.
 
         Args:
             hand (Hand): The hand to play
+            index (int, optional): The hand's position in the player's pool,
+                                   whose stake grows if the hand doubles.
 
         Returns:
             bool: True if the hand busts, False otherwise
         """
+        player = self.player
+        split_hand = player.hand_count > 1
         first_action = True
 
         while True:
-            # Determine action based on strategy
-            action = self.player.strategy.decide_action(hand, self.dealer.upcard)
-
-            if action == Strategy.HIT:
-                hand.add_card(self.deck.deal_card())
-                if hand.get_value() > 21:
-                    return True  # Hand busts
-                first_action = False
+            action = self.choose_action(hand, first_action, split_hand)
 
-            elif action == Strategy.STAND:
+            if action == Strategy.STAND:
                 return False  # Hand stands, no bust
 
-            elif action == Strategy.DOUBLE:
-                # Only allowed on first action
-                if not first_action:
-                    hand.add_card(self.deck.deal_card())
-                    return hand.get_value() > 21
-
-                # Double the bet if possible
-                if self.player.balance >= self.bet:
-                    self.player.balance -= self.bet
-                    self.bet *= 2
+            if action == Strategy.DOUBLE:
+                # Double the hand's stake if balance allows
+                stake = player.hand_bets[index]
+                if player.balance >= stake:
+                    player.balance -= stake
+                    player.hand_bets[index] += stake
                     hand.add_card(self.deck.deal_card())
-                    return hand.get_value() > 21
-                else:
-                    print("Cannot double: insufficient balance.")
-                    continue
+                    return hand.get_value() > 21  # True if bust
+                # Not enough balance to double; hit instead
 
-            else:  # Other actions default to hit in this simplified implementation
-                hand.add_card(self.deck.deal_card())
-                if hand.get_value() > 21:
-                    return True  # Hand busts
-                first_action = False
+            hand.add_card(self.deck.deal_card())
+            if hand.get_value() > 21:
+                return True  # Hand busts
+            first_action = False
 
     def dealer_turn(self):
         """
@@ -286,41 +336,116 @@ class Game:
 
         return False  # Dealer doesn't bust
 
-    def determine_winner(self):
+    def settle_hand(self, hand, bet, dealer_value=None, dealer_blackjack=None):
         """
-        Determine the winner of the round and update player's balance.
+        Settle one player hand against the dealer's final hand and pay out.
+
+        Args:
+            hand (Hand): The player's hand.
+            bet (float): The amount staked on the hand.
+            dealer_value (int, optional): The dealer's final total, when already
+                                          known. Defaults to evaluating it.
+            dealer_blackjack (bool, optional): Whether the dealer has a natural,
+                                               when already known.
 
         Returns:
-            str: The result of the round ("player_wins", "dealer_wins", or "push").
+            str: The result ("player_wins", "dealer_wins", or "push").
         """
-        player_value = self.player.hand.get_value()
-        dealer_value = self.dealer.hand.get_value()
+        player_value = hand.get_value()
+        if dealer_value is None:
+            dealer_value = self.dealer.hand.get_value()
+        if dealer_blackjack is None:
+            dealer_blackjack = self.dealer.hand.is_blackjack()
 
         if player_value > 21:
             # Player busts, dealer wins
             return "dealer_wins"
+        elif dealer_blackjack:
+            # Without a peek a dealer natural takes every bet still in play
+            return "dealer_wins"
         elif dealer_value > 21:
             # Dealer busts, player wins
-            self.player.receive_winnings(self.bet * 2)  # Original bet + 1x win
+            self.player.receive_winnings(bet * 2)  # Original bet + 1x win
             return "player_wins"
         elif player_value > dealer_value:
             # Player's hand value is higher, player wins
-            self.player.receive_winnings(self.bet * 2)  # Original bet + 1x win
+            self.player.receive_winnings(bet * 2)  # Original bet + 1x win
             return "player_wins"
         elif dealer_value > player_value:
             # Dealer's hand value is higher, dealer wins
             return "dealer_wins"
         else:
             # Equal values, push
-            self.player.receive_winnings(self.bet)  # Return the bet
+            self.player.receive_winnings(bet)  # Return the bet
             return "push"
 
-    def play_round(self, bet_amount):
+    def has_live_hand(self):
+        """
+        Check whether any player hand is still in play (not bust).
+
+        Returns:
+            bool: True if the dealer needs to play out their hand.
+        """
+        player = self.player
+        for index in range(player.hand_count):
+            if player.hands[index].get_value() <= 21:
+                return True
+        return False
+
+    def settle_round(self, dealer_value=None, dealer_blackjack=None):
+        """
+        Play out the dealer's hand if any player hand is live, then settle
+        every player hand at its own stake.
+
+        Args:
+            dealer_value (int, optional): The dealer's final total, when the
+                                          dealer's hand has already been played
+                                          (e.g. once for a whole table).
+            dealer_blackjack (bool, optional): Whether the dealer has a natural,
+                                               given with dealer_value.
+
+        Returns:
+            list: The result of each hand in play, in order.
+        """
+        player = self.player
+        if dealer_value is None:
+            if self.has_live_hand():
+                self.dealer_turn()
+            dealer_value = self.dealer.hand.get_value()
+            dealer_blackjack = self.dealer.hand.is_blackjack()
+
+        for index in range(player.hand_count):
+            player.hand_results[index] = self.settle_hand(
+                player.hands[index],
+                player.hand_bets[index],
+                dealer_value,
+                dealer_blackjack,
+            )
+        return player.hand_results[: player.hand_count]
+
+    def determine_winner(self):
+        """
+        Determine the winner of the round and update player's balance.
+
+        Returns:
+            str: The result of the round ("player_wins", "dealer_wins", or "push").
+        """
+        return self.settle_hand(self.player.hand, self.bet)
+
+    def end_round(self):
+        """Reveal the dealer's hole card so a counting shoe can see it."""
+        if len(self.dealer.hand.cards) > 1:
+            self.deck.reveal(self.dealer.hand.cards[1])
+
+    def play_round(self, bet_amount, insure=None):
         """
         Play a complete round of blackjack.
 
         Args:
             bet_amount (float): The amount to bet for this round.
+            insure (bool, optional): Whether to take insurance or even money if
+                                     offered. Defaults to None, which asks the
+                                     game's decision tables.
 
         Returns:
             tuple: (result, player_hand, dealer_hand, bet, win_amount)
@@ -331,11 +456,13 @@ class Game:
             return "insufficient_balance", None, None, 0, 0
 
         # Check for blackjack
-        blackjack_result, outcome = self.check_blackjack()
+        blackjack_result, outcome = self.check_blackjack(insure)
         if blackjack_result:
             win_amount = 0
             if outcome == "player_blackjack":
-                win_amount = self.bet * 1.5
+                win_amount = self.bet * self.rules.blackjack_payout
+            elif outcome == "even_money":
+                win_amount = self.bet
             elif outcome == "push":
                 win_amount = 0
             return outcome, self.player.hand, self.dealer.hand, self.bet, win_amount
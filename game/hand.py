@@ -20,8 +20,8 @@ class Hand:
         self.cards.append(card)
 
     def clear(self):
-        """Clear all cards from the hand."""
-        self.cards = []
+        """Clear all cards from the hand, reusing its card list."""
+        self.cards.clear()
 
     def get_value(self):
         """
@@ -69,14 +69,18 @@ class Hand:
         Returns:
             bool: True if the hand is soft, False otherwise.
         """
+        # Count every ace as 1; the hand is soft if one of them can count as
+        # 11 without busting. (Cards may be shared instances, so aces are
+        # counted rather than compared by identity.)
+        hard_value = 0
+        has_ace = False
         for card in self.cards:
             if card.rank == "A":
-                # Calculate value without this ace
-                other_cards_value = sum(c.value for c in self.cards if c != card)
-                # If counting this ace as 11 doesn't bust, it's a soft hand
-                if other_cards_value + 11 <= 21:
-                    return True
-        return False
+                has_ace = True
+                hard_value += 1
+            else:
+                hard_value += card.value
+        return has_ace and hard_value + 10 <= 21
 
     def __repr__(self):
         """
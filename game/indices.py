@@ -0,0 +1,199 @@
+import json
+from game.strategy import Strategy
+
+
+class IndexEntry:
+    """
+    A count-based deviation from basic strategy for one (hand, upcard) cell.
+
+    Attributes:
+        index (float): True count at or above which `action` is played.
+        action (str): The action taken at or above the index.
+        alternative (str): The action taken below the index.
+    """
+
+    def __init__(self, index, action, alternative):
+        """
+        Initialize an index entry.
+
+        Args:
+            index (float): The true-count threshold.
+            action (str): The action at or above the threshold.
+            alternative (str): The action below the threshold.
+        """
+        self.index = index
+        self.action = action
+        self.alternative = alternative
+
+    def __repr__(self):
+        """
+        Return a string representation of the entry.
+
+        Returns:
+            str: The string representation of the entry.
+        """
+        return f"IndexEntry({self.action} at {self.index:+g}, else {self.alternative})"
+
+
+class IndexTable:
+    """
+    A table of index plays keyed by hand class/total and dealer upcard.
+
+    Hand keys follow `Strategy.hand_key` (e.g. ("hard", 16), ("pair", "10"))
+    and upcard keys follow `Strategy.dealer_key` (2-10 or "A").
+
+    Attributes:
+        entries (dict): (hand_key, dealer_key) -> IndexEntry.
+    """
+
+    def __init__(self, entries=None):
+        """
+        Initialize an index table.
+
+        Args:
+            entries (dict, optional): Initial entries. Defaults to empty.
+        """
+        self.entries = dict(entries) if entries else {}
+
+    def add(self, hand_key, dealer_key, entry):
+        """
+        Add or replace the entry for a cell.
+
+        Args:
+            hand_key (tuple): The hand class and total.
+            dealer_key (int or str): The dealer upcard key.
+            entry (IndexEntry): The index play.
+        """
+        self.entries[(tuple(hand_key), dealer_key)] = entry
+
+    def get(self, hand_key, dealer_key):
+        """
+        Get the entry for a cell.
+
+        Args:
+            hand_key (tuple): The hand class and total.
+            dealer_key (int or str): The dealer upcard key.
+
+        Returns:
+            IndexEntry: The entry, or None if the cell has no index play.
+        """
+        return self.entries.get((hand_key, dealer_key))
+
+    def to_dict(self):
+        """
+        Convert the table to a JSON-serialisable list of rows.
+
+        Returns:
+            list: One dict per entry.
+        """
+        rows = []
+        for (hand_key, dealer_key), entry in self.entries.items():
+            rows.append(
+                {
+                    "hand": list(hand_key),
+                    "upcard": dealer_key,
+                    "index": entry.index,
+                    "action": entry.action,
+                    "alternative": entry.alternative,
+                }
+            )
+        return rows
+
+    @classmethod
+    def from_dict(cls, rows):
+        """
+        Build a table from rows produced by `to_dict`.
+
+        Args:
+            rows (list): One dict per entry.
+
+        Returns:
+            IndexTable: The reconstructed table.
+        """
+        table = cls()
+        for row in rows:
+            table.add(
+                tuple(row["hand"]),
+                row["upcard"],
+                IndexEntry(row["index"], row["action"], row["alternative"]),
+            )
+        return table
+
+    def save(self, path):
+        """
+        Save the table as JSON.
+
+        Args:
+            path (str): Destination file path.
+        """
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=4)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a table saved with `save`.
+
+        Args:
+            path (str): Source file path.
+
+        Returns:
+            IndexTable: The loaded table.
+        """
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
+
+    def __len__(self):
+        """
+        Get the number of index plays.
+
+        Returns:
+            int: The number of entries.
+        """
+        return len(self.entries)
+
+
+class IndexStrategy(Strategy):
+    """
+    Basic strategy with count-based deviations from an IndexTable.
+
+    The true count is read live from the attached Counter, so the same
+    strategy object follows the count through the whole shoe.
+
+    Attributes:
+        index_table (IndexTable): The index plays to apply.
+        counter (Counter): The counter supplying the true count.
+    """
+
+    def __init__(self, index_table, counter):
+        """
+        Initialize the strategy.
+
+        Args:
+            index_table (IndexTable): The index plays to apply.
+            counter (Counter): The counter supplying the true count.
+        """
+        super().__init__()
+        self.index_table = index_table
+        self.counter = counter
+
+    def decide_action(self, player_hand, dealer_upcard):
+        """
+        Determine the action, deviating from basic strategy where the true
+        count crosses an index.
+
+        Args:
+            player_hand (Hand): The player's current hand.
+            dealer_upcard (Card): The dealer's face-up card.
+
+        Returns:
+            str: The recommended action (hit, stand, double, split).
+        """
+        hand_key = self.hand_key(player_hand)
+        dealer_key = self.dealer_key(dealer_upcard)
+        entry = self.index_table.entries.get((hand_key, dealer_key))
+        if entry is None:
+            return self.lookup(hand_key, dealer_key)
+        if self.counter.true_count() >= entry.index:
+            return entry.action
+        return entry.alternative
@@ -6,25 +6,46 @@ class Player:
     """
     Represents a player in the blackjack game.
 
+    The player's hands live in a fixed pool allocated up front, so splitting
+    and resplitting reuse the same Hand objects every round.
+
     Attributes:
-        hand (Hand): The player's current hand.
-        split_hands (list): List of split hands if the player splits.
+        hand (Hand): The player's current hand (the first hand in the pool).
+        hands (list): Preallocated pool of hands; the first hand_count are in play.
+        hand_bets (list): The amount staked on each pooled hand.
+        hand_results (list): The settled result of each pooled hand.
+        hand_count (int): Number of hands in play this round.
         strategy (Strategy): The strategy object for decision-making.
         balance (float): Player's current balance.
     """
 
-    def __init__(self, initial_balance=1000.0):
+    def __init__(self, initial_balance=1000.0, max_hands=4):
         """
         Initialize a player with an empty hand and the specified balance.
 
         Args:
             initial_balance (float, optional): Initial player balance. Defaults to 1000.0.
+            max_hands (int, optional): Most hands the player can split into.
+                                       Defaults to 4.
         """
-        self.hand = Hand()
-        self.split_hands = []
+        self.hands = [Hand() for _ in range(max(max_hands, 1))]
+        self.hand_bets = [0.0] * len(self.hands)
+        self.hand_results = [None] * len(self.hands)
+        self.hand_count = 1
+        self.hand = self.hands[0]
         self.strategy = Strategy()
         self.balance = initial_balance
 
+    @property
+    def split_hands(self):
+        """
+        Get the hands created by splitting this round.
+
+        Returns:
+            list: The split hands after the first.
+        """
+        return self.hands[1 : self.hand_count]
+
     def place_bet(self, amount):
         """
         Place a bet with the specified amount.
@@ -56,7 +77,7 @@ class Player:
 
         # If it's not the first action or there are split hands,
         # we cannot double or split
-        if not first_hand or self.split_hands:
+        if not first_hand or self.hand_count > 1:
             if action == Strategy.DOUBLE:
                 action = Strategy.HIT
             elif action == Strategy.SPLIT:
@@ -75,23 +96,33 @@ class Player:
 
     def clear_hands(self):
         """Clear the player's hand and split hands."""
-        self.hand.clear()
-        self.split_hands = []
+        for index in range(self.hand_count):
+            self.hands[index].clear()
+        self.hand_count = 1
+        self.hand = self.hands[0]
 
-    def split_hand(self):
+    def split_hand(self, index=0):
         """
-        Split the current hand into two separate hands.
+        Split a pooled hand by moving its second card into the next free hand.
+
+        The new hand is staked with the same amount as the hand it came from;
+        taking that amount from the balance is left to the caller.
+
+        Args:
+            index (int, optional): The pooled hand to split. Defaults to 0.
 
         Returns:
-            Hand: The new split hand
+            Hand: The new split hand, or None if the hand cannot be split or
+                  the pool is full.
         """
-        if not self.hand.is_pair() or len(self.hand.cards) != 2:
+        hand = self.hands[index]
+        if not hand.is_pair() or self.hand_count >= len(self.hands):
             return None
 
-        # Create a new hand with the second card only (just tracking the split)
-        # Note: The actual splitting logic happens in main.py for clarity
-        new_hand = Hand()
-        new_hand.add_card(self.hand.cards[1])
-        self.split_hands.append(new_hand)
+        new_hand = self.hands[self.hand_count]
+        new_hand.clear()
+        new_hand.add_card(hand.cards.pop())
+        self.hand_bets[self.hand_count] = self.hand_bets[index]
+        self.hand_count += 1
 
         return new_hand
@@ -0,0 +1,226 @@
+from game.deck import Deck
+from game.shoe import Shoe
+
+
+class Rules:
+    """
+    Describes the table rules a game is played under.
+
+    The defaults are an infinite deck, dealer hits soft 17, blackjack pays
+    3:2, double on any two cards, double after split, resplitting to four
+    hands (but not aces), no surrender and a dealer who peeks. Before these
+    rules were configurable a pair could only be split once; pass
+    max_split_hands=2 to play that way.
+
+    Attributes:
+        num_decks (int): Decks in the shoe, or None for an infinite deck.
+        penetration (float): Fraction of a finite shoe dealt before reshuffling.
+        hit_soft_17 (bool): Whether the dealer hits soft 17 (H17) or stands (S17).
+        blackjack_payout (float): Amount won per unit on a natural (1.5 or 1.2).
+        double_on (str): Two-card totals that may double: "any", "9-11" or "10-11".
+        double_after_split (bool): Whether split hands may double (DAS).
+        max_split_hands (int): Most hands a player may split into (1 = no splits).
+        resplit_aces (bool): Whether split aces may be split again (RSA).
+        hit_split_aces (bool): Whether split aces may draw more than one card.
+        late_surrender (bool): Whether late surrender is offered.
+        dealer_peek (bool): Whether the dealer checks for blackjack before play.
+                            Without a peek (ENHC) a dealer natural takes every
+                            bet, including doubles and splits.
+    """
+
+    DOUBLE_OPTIONS = {"any": None, "9-11": (9, 10, 11), "10-11": (10, 11)}
+
+    def __init__(
+        self,
+        num_decks=None,
+        penetration=0.75,
+        hit_soft_17=True,
+        blackjack_payout=1.5,
+        double_on="any",
+        double_after_split=True,
+        max_split_hands=4,
+        resplit_aces=False,
+        hit_split_aces=True,
+        late_surrender=False,
+        dealer_peek=True,
+    ):
+        """
+        Initialize a rule set.
+
+        Args:
+            num_decks (int, optional): Decks in the shoe. Defaults to None (infinite).
+            penetration (float, optional): Fraction dealt before reshuffling.
+                                           Defaults to 0.75.
+            hit_soft_17 (bool, optional): Dealer hits soft 17. Defaults to True.
+            blackjack_payout (float, optional): Natural payout. Defaults to 1.5.
+            double_on (str, optional): Doubling restriction. Defaults to "any".
+            double_after_split (bool, optional): Allow DAS. Defaults to True.
+            max_split_hands (int, optional): Hands a player may split into.
+                                             Defaults to 4.
+            resplit_aces (bool, optional): Allow RSA. Defaults to False.
+            hit_split_aces (bool, optional): Allow hitting split aces.
+                                             Defaults to True.
+            late_surrender (bool, optional): Offer late surrender. Defaults to False.
+            dealer_peek (bool, optional): Dealer peeks for blackjack.
+                                          Defaults to True.
+        """
+        if num_decks is not None and num_decks < 1:
+            raise ValueError("num_decks must be at least 1, or None for infinite.")
+        if double_on not in self.DOUBLE_OPTIONS:
+            raise ValueError(
+                f"double_on must be one of {', '.join(self.DOUBLE_OPTIONS)}."
+            )
+        if max_split_hands < 1:
+            raise ValueError("max_split_hands must be at least 1.")
+        if blackjack_payout <= 0:
+            raise ValueError("blackjack_payout must be positive.")
+
+        self.num_decks = num_decks
+        self.penetration = penetration
+        self.hit_soft_17 = hit_soft_17
+        self.blackjack_payout = blackjack_payout
+        self.double_on = double_on
+        self.double_after_split = double_after_split
+        self.max_split_hands = max_split_hands
+        self.resplit_aces = resplit_aces
+        self.hit_split_aces = hit_split_aces
+        self.late_surrender = late_surrender
+        self.dealer_peek = dealer_peek
+
+    def can_double(self, hand, split_hand=False):
+        """
+        Check whether a hand may double down.
+
+        Args:
+            hand (Hand): The hand to check.
+            split_hand (bool, optional): Whether the hand came from a split.
+
+        Returns:
+            bool: True if doubling is allowed.
+        """
+        if len(hand.cards) != 2:
+            return False
+        if split_hand and not self.double_after_split:
+            return False
+        totals = self.DOUBLE_OPTIONS[self.double_on]
+        if totals is None:
+            return True
+        return not hand.is_soft() and hand.get_value() in totals
+
+    def can_split(self, hand, hands_in_play):
+        """
+        Check whether a hand may be split.
+
+        Args:
+            hand (Hand): The hand to check.
+            hands_in_play (int): Number of player hands currently in the round.
+
+        Returns:
+            bool: True if splitting is allowed.
+        """
+        if not hand.is_pair() or hands_in_play >= self.max_split_hands:
+            return False
+        if hands_in_play > 1 and hand.cards[0].rank == "A":
+            return self.resplit_aces
+        return True
+
+    def create_deck(self, rng=None, counter=None):
+        """
+        Create the card source these rules call for.
+
+        Args:
+            rng (random.Random, optional): Random generator for the deck.
+            counter (Counter, optional): Counter to attach to a finite shoe.
+
+        Returns:
+            Deck or Shoe: An infinite Deck, or a Shoe of num_decks decks.
+        """
+        if self.num_decks is None:
+            return Deck(rng)
+        return Shoe(self.num_decks, self.penetration, rng, counter)
+
+    def to_dict(self):
+        """
+        Convert the rules to a plain dictionary.
+
+        Returns:
+            dict: Every rule by name.
+        """
+        return {
+            "num_decks": self.num_decks,
+            "penetration": self.penetration,
+            "hit_soft_17": self.hit_soft_17,
+            "blackjack_payout": self.blackjack_payout,
+            "double_on": self.double_on,
+            "double_after_split": self.double_after_split,
+            "max_split_hands": self.max_split_hands,
+            "resplit_aces": self.resplit_aces,
+            "hit_split_aces": self.hit_split_aces,
+            "late_surrender": self.late_surrender,
+            "dealer_peek": self.dealer_peek,
+        }
+
+    @classmethod
+    def from_dict(cls, values):
+        """
+        Build rules from a dictionary produced by `to_dict`.
+
+        Args:
+            values (dict): Rules by name; missing rules take their defaults.
+
+        Returns:
+            Rules: The rule set.
+        """
+        return cls(**values)
+
+    def describe(self):
+        """
+        Get the conventional short description of the rules.
+
+        Returns:
+            str: e.g. "6D H17 3:2 DAS SP4 LS".
+        """
+        decks = "INF" if self.num_decks is None else f"{self.num_decks}D"
+        payout = {1.5: "3:2", 1.2: "6:5", 1.0: "1:1", 2.0: "2:1"}.get(
+            self.blackjack_payout, f"{self.blackjack_payout:g}:1"
+        )
+        parts = [decks, "H17" if self.hit_soft_17 else "S17", payout]
+        if self.double_on != "any":
+            parts.append(f"D{self.double_on}")
+        if self.double_after_split:
+            parts.append("DAS")
+        parts.append(f"SP{self.max_split_hands}")
+        if self.resplit_aces:
+            parts.append("RSA")
+        if self.late_surrender:
+            parts.append("LS")
+        if not self.dealer_peek:
+            parts.append("ENHC")
+        return " ".join(parts)
+
+    def __eq__(self, other):
+        """
+        Compare two rule sets.
+
+        Returns:
+            bool: True if every rule matches.
+        """
+        return isinstance(other, Rules) and self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        """
+        Hash the rule set so it can key dictionaries.
+
+        Returns:
+            int: The hash of the rules.
+        """
+        return hash(tuple(sorted(self.to_dict().items())))
+
+    def __repr__(self):
+        """
+        Return a string representation of the rules.
+
+        Returns:
+            str: The string representation of the rules.
+        """
+        return f"Rules({self.describe()})"
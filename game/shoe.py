@@ -0,0 +1,151 @@
+import random
+from game.card import Card
+
+
+class Shoe:
+    """
+    Represents a finite multi-deck shoe dealt without replacement.
+
+    All cards are shuffled into a single list and dealt by advancing a position
+    index, so dealing never allocates new Card objects. Once play passes the
+    cut card the shoe should be reshuffled before the next round.
+
+    Attributes:
+        num_decks (int): Number of 52-card decks in the shoe.
+        penetration (float): Fraction of the shoe dealt before the cut card.
+        rng (random.Random): Source of randomness used for shuffling.
+        counter (Counter): Optional counter notified of every visible card.
+        cards (list): The shuffled cards, dealt from index `position` onward.
+        position (int): Index of the next card to deal.
+        cut_position (int): Index of the cut card.
+        shuffles (int): Number of times the shoe has been shuffled.
+        cards_seen (int): Cards shown face up since the last shuffle.
+        tens_seen (int): Ten-valued cards shown face up since the last shuffle.
+    """
+
+    RANKS = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
+
+    def __init__(self, num_decks=6, penetration=0.75, rng=None, counter=None):
+        """
+        Initialize and shuffle a new shoe.
+
+        Args:
+            num_decks (int, optional): Number of decks. Defaults to 6.
+            penetration (float, optional): Fraction dealt before reshuffling.
+                                           Defaults to 0.75.
+            rng (random.Random, optional): Random generator to shuffle with.
+                                           Defaults to the global random module.
+            counter (Counter, optional): Counter to keep updated. Defaults to None.
+        """
+        if num_decks < 1:
+            raise ValueError("A shoe needs at least one deck.")
+        if not 0.0 < penetration <= 1.0:
+            raise ValueError("Penetration must be in (0, 1].")
+
+        self.num_decks = num_decks
+        self.penetration = penetration
+        self.rng = rng if rng is not None else random
+        self.counter = counter
+
+        # One shared Card instance per rank and suit; the shoe only holds
+        # references
+        distinct = [Card(rank, suit) for rank in self.RANKS for suit in Card.SUITS]
+        self.cards = [card for card in distinct for _ in range(num_decks)]
+        self.cut_position = int(len(self.cards) * penetration)
+        self.position = 0
+        self.shuffles = 0
+        self.shuffle()
+
+    def shuffle(self):
+        """Shuffle every card back into the shoe and reset any attached counter."""
+        self.rng.shuffle(self.cards)
+        self.position = 0
+        self.shuffles += 1
+        self.cards_seen = 0
+        self.tens_seen = 0
+        if self.counter is not None:
+            self.counter.reset(self)
+
+    def deal_card(self, visible=True):
+        """
+        Deal the next card from the shoe.
+
+        Args:
+            visible (bool, optional): Whether the card is dealt face up. Face-down
+                                      cards are only counted once revealed.
+                                      Defaults to True.
+
+        Returns:
+            Card: The dealt card.
+        """
+        if self.position >= len(self.cards):
+            # Ran out mid-round (deep penetration with many splits); start over
+            self.shuffle()
+
+        card = self.cards[self.position]
+        self.position += 1
+        if visible:
+            self._see(card)
+        return card
+
+    def reveal(self, card):
+        """
+        Turn a face-down card face up so the counter can see it.
+
+        Args:
+            card (Card): The card being revealed.
+        """
+        self._see(card)
+
+    def _see(self, card):
+        """
+        Record a card shown face up and pass it to the counter.
+
+        Args:
+            card (Card): The visible card.
+        """
+        self.cards_seen += 1
+        if card.value == 10:
+            self.tens_seen += 1
+        if self.counter is not None:
+            self.counter.observe(card)
+
+    def unseen_tens(self):
+        """
+        Get the ten-valued cards among the cards not yet seen, which include
+        any face-down card.
+
+        Returns:
+            tuple: (unseen tens, unseen cards).
+        """
+        return (
+            16 * self.num_decks - self.tens_seen,
+            len(self.cards) - self.cards_seen,
+        )
+
+    def needs_shuffle(self):
+        """
+        Check whether the cut card has been reached.
+
+        Returns:
+            bool: True if the shoe should be reshuffled before the next round.
+        """
+        return self.position >= self.cut_position
+
+    def cards_remaining(self):
+        """
+        Get the number of undealt cards.
+
+        Returns:
+            int: Cards left in the shoe.
+        """
+        return len(self.cards) - self.position
+
+    def decks_remaining(self):
+        """
+        Get the number of undealt decks.
+
+        Returns:
+            float: Decks left in the shoe.
+        """
+        return (len(self.cards) - self.position) / 52.0
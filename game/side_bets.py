@@ -0,0 +1,284 @@
+import numpy as np
+from game.card import Card
+
+# Rank and suit of every card code (code = rank index * 4 + suit index)
+CODE_RANKS = np.arange(52) // 4
+CODE_SUITS = np.arange(52) % 4
+CODE_RED = np.isin(CODE_SUITS, [Card.SUITS.index("H"), Card.SUITS.index("D")])
+CODE_VALUES = np.array([Card(Card.RANKS[rank]).value for rank in CODE_RANKS])
+
+ACE = Card.RANKS.index("A")
+QUEEN_OF_HEARTS = Card.RANKS.index("Q") * 4 + Card.SUITS.index("H")
+
+
+class SideBet:
+    """
+    A side bet settled from the cards dealt at the start of a round.
+
+    Every possible deal is classified once into an outcome table indexed by
+    card codes, so settling a side bet during play is a single lookup and the
+    exact evaluator can enumerate all deals with array operations.
+
+    Attributes:
+        name (str): The side bet's name.
+        outcomes (list): Outcome names; index 0 is always "lose".
+        paytable (dict): Outcome name -> amount won per unit staked.
+        payouts (numpy.ndarray): Net result per unit for each outcome index.
+        cards (int): Cards the bet is decided on: 2 (player pair) or 3
+                     (player pair and dealer upcard).
+        table (numpy.ndarray): Outcome index for every deal, indexed by card code.
+    """
+
+    name = "side bet"
+    outcomes = ["lose"]
+    cards = 2
+
+    def __init__(self, paytable):
+        """
+        Initialize a side bet and build its outcome table.
+
+        Args:
+            paytable (dict): Outcome name -> amount won per unit staked.
+        """
+        unknown = set(paytable) - set(self.outcomes)
+        if unknown:
+            raise ValueError(f"Unknown {self.name} outcomes: {', '.join(unknown)}")
+        self.paytable = dict(paytable)
+        self.payouts = np.array(
+            [-1.0] + [float(self.paytable.get(o, -1.0)) for o in self.outcomes[1:]]
+        )
+        self.table = self._build_table()
+        self._lookup = self.table.tolist()
+        self._payout_list = self.payouts.tolist()
+
+    def _build_table(self):
+        """
+        Classify every deal.
+
+        Returns:
+            numpy.ndarray: Outcome indices, shape (52,) * cards.
+        """
+        raise NotImplementedError
+
+    def outcome(self, first, second, upcard, dealer_blackjack=False):
+        """
+        Classify a deal.
+
+        Args:
+            first (Card): The player's first card.
+            second (Card): The player's second card.
+            upcard (Card): The dealer's upcard.
+            dealer_blackjack (bool, optional): Whether the dealer has a natural.
+
+        Returns:
+            str: The outcome name.
+        """
+        return self.outcomes[
+            self._outcome_index(first, second, upcard, dealer_blackjack)
+        ]
+
+    def _outcome_index(self, first, second, upcard, dealer_blackjack=False):
+        """
+        Look up a deal's outcome index.
+
+        Args:
+            first (Card): The player's first card.
+            second (Card): The player's second card.
+            upcard (Card): The dealer's upcard.
+            dealer_blackjack (bool, optional): Whether the dealer has a natural.
+
+        Returns:
+            int: Index into outcomes.
+        """
+        if self.cards == 2:
+            return self._lookup[first.code][second.code]
+        return self._lookup[first.code][second.code][upcard.code]
+
+    def settle(self, first, second, upcard, dealer_blackjack=False):
+        """
+        Get the net result of a unit side bet on a deal.
+
+        Args:
+            first (Card): The player's first card.
+            second (Card): The player's second card.
+            upcard (Card): The dealer's upcard.
+            dealer_blackjack (bool, optional): Whether the dealer has a natural.
+
+        Returns:
+            float: Units won (negative if the bet loses).
+        """
+        return self._payout_list[
+            self._outcome_index(first, second, upcard, dealer_blackjack)
+        ]
+
+
+class PerfectPairs(SideBet):
+    """Pays when the player's first two cards are a pair."""
+
+    name = "Perfect Pairs"
+    outcomes = ["lose", "mixed_pair", "colored_pair", "perfect_pair"]
+    PAYTABLE = {"perfect_pair": 25, "colored_pair": 12, "mixed_pair": 6}
+
+    def __init__(self, paytable=None):
+        """
+        Initialize Perfect Pairs.
+
+        Args:
+            paytable (dict, optional): Outcome payouts. Defaults to 25/12/6.
+        """
+        super().__init__(paytable if paytable is not None else self.PAYTABLE)
+
+    def _build_table(self):
+        """
+        Classify every pair of first two cards.
+
+        Returns:
+            numpy.ndarray: Outcome indices, shape (52, 52).
+        """
+        first, second = np.meshgrid(np.arange(52), np.arange(52), indexing="ij")
+        pair = CODE_RANKS[first] == CODE_RANKS[second]
+        table = np.zeros((52, 52), dtype=np.int8)
+        table[pair] = 1
+        table[pair & (CODE_RED[first] == CODE_RED[second])] = 2
+        table[pair & (CODE_SUITS[first] == CODE_SUITS[second])] = 3
+        return table
+
+
+class TwentyOnePlusThree(SideBet):
+    """Pays on a poker hand made of the player's two cards and the upcard."""
+
+    name = "21+3"
+    outcomes = [
+        "lose",
+        "flush",
+        "straight",
+        "three_of_a_kind",
+        "straight_flush",
+        "suited_trips",
+    ]
+    PAYTABLE = {
+        "suited_trips": 100,
+        "straight_flush": 40,
+        "three_of_a_kind": 30,
+        "straight": 10,
+        "flush": 5,
+    }
+    cards = 3
+
+    def __init__(self, paytable=None):
+        """
+        Initialize 21+3.
+
+        Args:
+            paytable (dict, optional): Outcome payouts. Defaults to
+                                       100/40/30/10/5.
+        """
+        super().__init__(paytable if paytable is not None else self.PAYTABLE)
+
+    def _build_table(self):
+        """
+        Classify every player pair and upcard.
+
+        Returns:
+            numpy.ndarray: Outcome indices, shape (52, 52, 52).
+        """
+        codes = np.arange(52)
+        a, b, c = np.meshgrid(codes, codes, codes, indexing="ij")
+        ranks = np.sort(np.stack([CODE_RANKS[a], CODE_RANKS[b], CODE_RANKS[c]]), axis=0)
+        low, mid, high = ranks
+        suits = [CODE_SUITS[a], CODE_SUITS[b], CODE_SUITS[c]]
+
+        flush = (suits[0] == suits[1]) & (suits[1] == suits[2])
+        trips = (low == mid) & (mid == high)
+        # Aces play high (Q-K-A) or low (A-2-3)
+        straight = ((mid == low + 1) & (high == mid + 1)) | (
+            (low == 0) & (mid == 1) & (high == ACE)
+        )
+
+        table = np.zeros((52, 52, 52), dtype=np.int8)
+        table[flush] = 1
+        table[straight] = 2
+        table[trips] = 3
+        table[straight & flush] = 4
+        table[trips & flush] = 5
+        return table
+
+
+class LuckyLadies(SideBet):
+    """Pays when the player's first two cards total 20."""
+
+    name = "Lucky Ladies"
+    outcomes = [
+        "lose",
+        "unsuited_20",
+        "suited_20",
+        "matched_20",
+        "queen_hearts_pair",
+        "queen_hearts_pair_dealer_blackjack",
+    ]
+    PAYTABLE = {
+        "queen_hearts_pair_dealer_blackjack": 1000,
+        "queen_hearts_pair": 125,
+        "matched_20": 19,
+        "suited_20": 9,
+        "unsuited_20": 4,
+    }
+
+    def __init__(self, paytable=None):
+        """
+        Initialize Lucky Ladies.
+
+        Args:
+            paytable (dict, optional): Outcome payouts. Defaults to
+                                       1000/125/19/9/4.
+        """
+        super().__init__(paytable if paytable is not None else self.PAYTABLE)
+
+    def _build_table(self):
+        """
+        Classify every pair of first two cards. The dealer-blackjack jackpot
+        is decided at settlement.
+
+        Returns:
+            numpy.ndarray: Outcome indices, shape (52, 52).
+        """
+        first, second = np.meshgrid(np.arange(52), np.arange(52), indexing="ij")
+        # Two aces are 12, not 22; every other pair of values simply adds up
+        total = CODE_VALUES[first] + CODE_VALUES[second]
+        twenty = total == 20
+        suited = CODE_SUITS[first] == CODE_SUITS[second]
+        matched = suited & (CODE_RANKS[first] == CODE_RANKS[second])
+
+        table = np.zeros((52, 52), dtype=np.int8)
+        table[twenty] = 1
+        table[twenty & suited] = 2
+        table[twenty & matched] = 3
+        table[(first == QUEEN_OF_HEARTS) & (second == QUEEN_OF_HEARTS)] = 4
+        return table
+
+    def _outcome_index(self, first, second, upcard, dealer_blackjack=False):
+        """
+        Look up a deal's outcome index, upgrading a queen of hearts pair when
+        the dealer has a natural.
+
+        Args:
+            first (Card): The player's first card.
+            second (Card): The player's second card.
+            upcard (Card): The dealer's upcard.
+            dealer_blackjack (bool, optional): Whether the dealer has a natural.
+
+        Returns:
+            int: Index into outcomes.
+        """
+        index = self._lookup[first.code][second.code]
+        if index == 4 and dealer_blackjack:
+            return 5
+        return index
+
+
+# The side bets by name
+SIDE_BETS = {
+    "perfect_pairs": PerfectPairs,
+    "21+3": TwentyOnePlusThree,
+    "lucky_ladies": LuckyLadies,
+}
@@ -11,6 +11,7 @@ class Strategy:
     STAND = "stand"
     DOUBLE = "double"
     SPLIT = "split"
+    SURRENDER = "surrender"
 
     def __init__(self):
         """Initialize the strategy with predefined decision tables."""
@@ -423,6 +424,30 @@ class Strategy:
             },
         }
 
+        # Late surrender (hand key -> dealer upcards to surrender against)
+        self.surrender_strategy = {
+            ("hard", 15): [10, "A"],
+            ("hard", 16): [9, 10, "A"],
+            ("hard", 17): ["A"],
+            ("pair", "8"): ["A"],
+        }
+
+    def should_surrender(self, player_hand, dealer_upcard):
+        """
+        Determine whether to surrender, where late surrender is offered.
+
+        Args:
+            player_hand (Hand): The player's current hand.
+            dealer_upcard (Card): The dealer's face-up card.
+
+        Returns:
+            bool: True if surrendering is the better play.
+        """
+        if len(player_hand.cards) != 2:
+            return False
+        upcards = self.surrender_strategy.get(self.hand_key(player_hand), ())
+        return self.dealer_key(dealer_upcard) in upcards
+
     def decide_action(self, player_hand, dealer_upcard):
         """
         Determine the best action for the player based on perfect strategy.
@@ -434,32 +459,88 @@ class Strategy:
         Returns:
             str: The recommended action (hit, stand, double, split).
         """
+        return self.lookup(self.hand_key(player_hand), self.dealer_key(dealer_upcard))
+
+    def lookup(self, hand_key, dealer_key):
+        """
+        Look up the basic strategy action for a classified hand.
+
+        Args:
+            hand_key (tuple): Hand class and total from `hand_key`.
+            dealer_key (int or str): Dealer upcard key from `dealer_key`.
+
+        Returns:
+            str: The recommended action (hit, stand, double, split).
+        """
+        hand_class, total = hand_key
+        if hand_class == "pair":
+            return self.pair_strategy.get(total, {}).get(dealer_key, self.HIT)
+        elif hand_class == "soft":
+            return self.soft_strategy.get(total, {}).get(dealer_key, self.HIT)
+        # For low totals not explicitly in our table, default to hit
+        if total < 8:
+            return self.HIT
+        return self.hard_strategy.get(total, {}).get(dealer_key, self.HIT)
+
+    @staticmethod
+    def dealer_key(dealer_upcard):
+        """
+        Convert a dealer upcard to the key used by the strategy tables.
+
+        Args:
+            dealer_upcard (Card): The dealer's face-up card.
+
+        Returns:
+            int or str: 2-10 for numbered and face cards, "A" for an ace.
+        """
         dealer_rank = dealer_upcard.rank
 
         # Convert face cards to 10 for strategy lookup
         if dealer_rank in ["J", "Q", "K"]:
-            dealer_rank = 10
+            return 10
         # Convert numeric dealer_rank from string to int for strategy lookup
         elif dealer_rank not in ["A"]:
-            dealer_rank = int(dealer_rank)
+            return int(dealer_rank)
+        return dealer_rank
+
+    @staticmethod
+    def total_key(player_hand):
+        """
+        Classify a hand by its total only, ignoring pairs.
+
+        Args:
+            player_hand (Hand): The player's current hand.
 
+        Returns:
+            tuple: ("soft", total) or ("hard", total).
+        """
+        if player_hand.is_soft():
+            return ("soft", player_hand.get_value())
+        return ("hard", player_hand.get_value())
+
+    @staticmethod
+    def hand_key(player_hand):
+        """
+        Classify a hand for strategy lookup.
+
+        Args:
+            player_hand (Hand): The player's current hand.
+
+        Returns:
+            tuple: ("pair", rank), ("soft", total) or ("hard", total), where
+                   face-card pairs use the rank "10".
+        """
         # Check for pairs first (if exactly 2 cards of the same rank)
         if player_hand.is_pair():
             rank = player_hand.cards[0].rank
             # Convert face cards to "10" for strategy lookup
             if rank in ["J", "Q", "K"]:
                 rank = "10"
-            return self.pair_strategy.get(rank, {}).get(dealer_rank, self.HIT)
+            return ("pair", rank)
 
         # Check for soft hands (if hand contains an ace counting as 11)
         elif player_hand.is_soft():
-            total = player_hand.get_value()
-            return self.soft_strategy.get(total, {}).get(dealer_rank, self.HIT)
+            return ("soft", player_hand.get_value())
 
         # Otherwise, use hard strategy
-        else:
-            total = player_hand.get_value()
-            # For low totals not explicitly in our table, default to hit
-            if total < 8:
-                return self.HIT
-            return self.hard_strategy.get(total, {}).get(dealer_rank, self.HIT)
+        return ("hard", player_hand.get_value())
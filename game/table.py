@@ -0,0 +1,197 @@
+from game.game import Game
+from game.dealer import Dealer
+from game.rules import Rules
+
+
+class Seat:
+    """
+    One seat at a table: a player with their own strategy and betting policy.
+
+    Attributes:
+        name (str): Label for reports.
+        strategy (Strategy): The seat's playing strategy, or None for basic strategy.
+        bet_size (float): Value of one betting unit.
+        bet_spread (BetSpread): Ramp from the table's count to units, or None
+                                to flat bet one unit.
+        decisions (DecisionTables): Surrender and insurance decisions, or None.
+        game (Game): The seat's view of the game, sharing the table's deck and
+                     dealer. Set when the seat joins a table.
+        bet (float): The bet placed this round (0 if the seat sat out).
+    """
+
+    def __init__(
+        self, strategy=None, bet_size=1.0, bet_spread=None, decisions=None, name=None
+    ):
+        """
+        Initialize a seat.
+
+        Args:
+            strategy (Strategy, optional): Playing strategy. Defaults to basic strategy.
+            bet_size (float, optional): Value of one betting unit. Defaults to 1.0.
+            bet_spread (BetSpread, optional): Count-based bet ramp. Defaults to
+                                              flat betting.
+            decisions (DecisionTables, optional): Surrender and insurance
+                                                  decisions. Defaults to None.
+            name (str, optional): Label for reports. Defaults to the seat number.
+        """
+        self.name = name
+        self.strategy = strategy
+        self.bet_size = bet_size
+        self.bet_spread = bet_spread
+        self.decisions = decisions
+        self.game = None
+        self.bet = 0.0
+
+    @property
+    def player(self):
+        """
+        Get the seat's player.
+
+        Returns:
+            Player: The player sitting in this seat.
+        """
+        return self.game.player
+
+    def bet_amount(self, counter=None):
+        """
+        Size this round's bet from the betting policy.
+
+        Args:
+            counter (Counter, optional): The table's counter, if any.
+
+        Returns:
+            float: The amount to bet.
+        """
+        if self.bet_spread is None or counter is None:
+            return self.bet_size
+        return self.bet_size * self.bet_spread.units(counter.betting_count())
+
+
+class Table:
+    """
+    A blackjack table where several seats share one shoe and one dealer hand.
+
+    Each round deals every seat from the same card source in table order, the
+    dealer's hand is played once for everyone, and each seat settles against
+    it. Seats reuse the single-player Game logic through a Game that shares
+    the table's deck and dealer, so a round with N seats costs one shuffle
+    check, one dealer hand and one dealer evaluation instead of N.
+
+    Attributes:
+        rules (Rules): The table rules.
+        deck (Deck or Shoe): The shared card source.
+        counter (Counter): The counter attached to the shoe, if any.
+        dealer (Dealer): The shared dealer.
+        seats (list): The seats, in dealing order.
+    """
+
+    MAX_SEATS = 7
+
+    def __init__(self, seats=1, rules=None, deck=None, counter=None):
+        """
+        Initialize a table.
+
+        Args:
+            seats (int or list, optional): Number of basic-strategy seats, or a
+                                           list of Seat objects. Defaults to 1.
+            rules (Rules, optional): The table rules. Defaults to Rules().
+            deck (Deck or Shoe, optional): The shared card source. Defaults to
+                                           the deck the rules call for.
+            counter (Counter, optional): Counter to attach to a new shoe and to
+                                         size counting seats' bets. Defaults to None.
+        """
+        if isinstance(seats, int):
+            seats = [Seat() for _ in range(seats)]
+        if not 1 <= len(seats) <= self.MAX_SEATS:
+            raise ValueError(f"A table seats between 1 and {self.MAX_SEATS} players.")
+
+        self.rules = rules if rules is not None else Rules()
+        self.counter = counter
+        self.deck = deck if deck is not None else self.rules.create_deck(None, counter)
+        self.dealer = Dealer(self.rules)
+        self.seats = list(seats)
+
+        for number, seat in enumerate(self.seats, 1):
+            seat.game = Game(self.deck, self.rules, seat.decisions)
+            seat.game.dealer = self.dealer
+            if seat.strategy is not None:
+                seat.game.player.strategy = seat.strategy
+            if seat.name is None:
+                seat.name = f"Seat {number}"
+
+    def play_round(self):
+        """
+        Play one round for every seat.
+
+        Seats that cannot cover their bet sit the round out (their bet is 0).
+        Each seat's results are left in its game: the surrendered flag, the
+        hand results in its player's pool, and its balance.
+
+        Returns:
+            list: Per seat, the list of hand results this round (empty for a
+                  seat that sat out).
+        """
+        deck = self.deck
+        dealer = self.dealer
+
+        # Reshuffle once the cut card has come out, before bets are sized
+        if deck.needs_shuffle():
+            deck.shuffle()
+        dealer.clear_hand()
+
+        active = []
+        for index, seat in enumerate(self.seats):
+            seat.bet = seat.bet_amount(self.counter)
+            if seat.game.place_bet(seat.bet):
+                active.append((index, seat))
+            else:
+                seat.bet = 0.0
+        if not active:
+            # Every seat sat out, so no cards are dealt
+            return [[] for _ in self.seats]
+
+        # Deal in table order: one card each, the upcard, then the second
+        # card each and the dealer's hole card
+        deal = deck.deal_card
+        hands = [seat.game.player.hand for _, seat in active]
+        for hand in hands:
+            hand.add_card(deal())
+        dealer.hand.add_card(deal())
+        for hand in hands:
+            hand.add_card(deal())
+        dealer.hand.add_card(deal(visible=False))
+        dealer.set_upcard()
+
+        results = [[] for _ in self.seats]
+        playing = []
+        dealer_blackjack = dealer.hand.is_blackjack()
+        for index, seat in active:
+            round_over, result = seat.game.check_blackjack(
+                dealer_blackjack=dealer_blackjack
+            )
+            if round_over:
+                results[index].append(result)
+            else:
+                playing.append((index, seat))
+
+        for _, seat in playing:
+            seat.game.player_turn()
+
+        # Play the shared dealer hand once, then settle every seat against it
+        for _, seat in playing:
+            if not seat.game.surrendered and seat.game.has_live_hand():
+                seat.game.dealer_turn()
+                break
+        dealer_value = dealer.hand.get_value()
+
+        for index, seat in playing:
+            if seat.game.surrendered:
+                results[index].append("surrender")
+            else:
+                results[index].extend(
+                    seat.game.settle_round(dealer_value, dealer_blackjack)
+                )
+
+        # Turn the hole card over so a counting shoe sees it
+        deck.reveal(dealer.hand.cards[1])
+        return results
@@ -1,5 +1,13 @@
 from input.input_handler import InputHandler
 from input.keyboard_input import KeyboardInputHandler
-from input.video_input import VideoInputHandler
 
 __all__ = ["InputHandler", "KeyboardInputHandler", "VideoInputHandler"]
+
+
+def __getattr__(name):
+    """Import the video handler, and with it OpenCV and MediaPipe, on first use."""
+    if name == "VideoInputHandler":
+        from input.video_input import VideoInputHandler
+
+        return VideoInputHandler
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,620 @@
+import csv
+import json
+import math
+import numpy as np
+from game.card import Card
+from game.strategy import Strategy
+
+# Hand classes, indexing the first axis of the decision and hand tables
+HARD, SOFT, PAIR = range(3)
+HAND_CLASSES = ["hard", "soft", "pair"]
+
+# Actions, indexing the last axis of the decision table
+STAND, HIT, DOUBLE, SPLIT, SURRENDER = range(5)
+ACTIONS = [
+    Strategy.STAND,
+    Strategy.HIT,
+    Strategy.DOUBLE,
+    Strategy.SPLIT,
+    Strategy.SURRENDER,
+]
+
+# Dealer upcards by card value (2-11) minus two
+UPCARDS = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "A"]
+
+# The dealer's final hands, indexing the last axis of the dealer table
+DEALER_OUTCOMES = ["17", "18", "19", "20", "21", "blackjack", "bust"]
+DEALER_BLACKJACK, DEALER_BUST = 5, 6
+
+# Totals index the second axis directly; pairs are indexed by card value
+TOTALS = 22
+
+# Rows of the flattened (class, total) axes, and each two-card non-pair's row
+# by first card value * 12 + second card value
+_SOFT_ROW = SOFT * TOTALS
+_PAIR_ROW = PAIR * TOTALS
+_HARD_VALUES = [0, 0, 2, 3, 4, 5, 6, 7, 8, 9, 10, 1]
+_TWO_CARD_ROWS = [0] * 144
+_TWO_CARD_TOTALS = [0] * 144
+for _first in range(2, 12):
+    for _second in range(2, 12):
+        _hard = _HARD_VALUES[_first] + _HARD_VALUES[_second]
+        _soft = 11 in (_first, _second)
+        _TWO_CARD_ROWS[_first * 12 + _second] = (
+            _SOFT_ROW + _hard + 10 if _soft else _hard
+        )
+        _TWO_CARD_TOTALS[_first * 12 + _second] = _hard + 10 if _soft else _hard
+
+# A decision cell, row * 50 + upcard * 5, is where a hand's five action counts
+# start. A two-card hand's cell is _RANK_CELLS[ranks] + upcard value * 5, and a
+# hand that draws a card of value v moves from `cell` to
+# _NEXT_CELLS[cell * 12 + v]; cells of busted hands are never used.
+_RANK_CELLS = {}
+for _first in Card.RANKS:
+    for _second in Card.RANKS:
+        _value = Card(_first).value
+        if _first == _second:
+            _row = _PAIR_ROW + _value
+        else:
+            _row = _TWO_CARD_ROWS[_value * 12 + Card(_second).value]
+        _RANK_CELLS[_first, _second] = _row * 50 - 10
+
+# Each row's hard total (aces as 1) and whether it holds an ace that could
+# count as 11; a hard total of 11 or less holds no ace
+_ROW_STATES = (
+    [(_row, _row, False) for _row in range(4, 22)]
+    + [(_SOFT_ROW + _total, _total - 10, True) for _total in range(12, 22)]
+    + [(_PAIR_ROW + _v, 2 * _HARD_VALUES[_v], _v == 11) for _v in range(2, 12)]
+)
+_NEXT_CELLS = [0] * (3 * TOTALS * 50 * 12)
+for _row, _hard, _aces in _ROW_STATES:
+    for _value in range(2, 12):
+        _next = _hard + _HARD_VALUES[_value]
+        if _next > 21:
+            continue
+        if (_aces or _value == 11) and _next <= 11:
+            _next += _SOFT_ROW + 10
+        for _upcard in range(0, 50, 5):
+            _NEXT_CELLS[(_row * 50 + _upcard) * 12 + _value] = _next * 50 + _upcard
+
+# The dealer's outcome by the row of a hand that drew; row 0 is a bust
+_ROW_OUTCOMES = [DEALER_BUST] * (3 * TOTALS)
+for _total in range(17, 22):
+    _ROW_OUTCOMES[_total] = _ROW_OUTCOMES[_SOFT_ROW + _total] = _total - 17
+
+# Marks RoundCounters.record logs after each hand's cards, numbered on from
+# the rank indexes (Card.RANKS) so they map to themselves: the end of a
+# player's hand, doubled or not, and of the dealer's, surrendered or not
+_HAND_END, _DOUBLED_END, _ROUND_END, _SURRENDER_END = range(13, 17)
+_MARK_INDEXES = {_mark: _mark for _mark in range(13, 17)}
+_ACE = Card.RANKS.index("A")
+
+# The same tables as arrays for RoundCounters._fold, which indexes cards by
+# rank index and two-card hands by first * 13 + second
+_RANK_VALUES = np.array([Card(_first).value for _first in Card.RANKS] + [0] * 4)
+_FIRST_CELLS = np.array(
+    [_RANK_CELLS[_first, _second] for _first in Card.RANKS for _second in Card.RANKS]
+)
+_NEXT_CELL_ARRAY = np.array(_NEXT_CELLS)
+_TWO_CARD_TOTAL_ARRAY = np.array(_TWO_CARD_TOTALS)
+_ROW_OUTCOME_ARRAY = np.array(_ROW_OUTCOMES)
+
+# Rounds RoundCounters.record logs before counting them
+_FOLD_ROUNDS = 8192
+
+
+class RoundCounters:
+    """
+    Counts what happens in a simulation's rounds in preallocated arrays.
+
+    Every decision is counted by hand class, total (card value for a pair),
+    dealer upcard and action, where the action is the one actually taken
+    once the rules have had their say. The dealer's final hand is counted
+    per upcard, and every round's net result is added to its starting hand,
+    so the EV of each starting hand and its share of the overall edge can be
+    read off.
+
+    The counts are rebuilt from the cards once a round is over, so the
+    game's hot path is untouched. `record` only logs a round's cards and
+    result, and `_fold` counts the logged rounds in batches: a hand's
+    decisions follow from its starting cell and the cards it ended with,
+    walked through a precomputed next-cell table with array operations.
+    The properties fold whatever is still logged before returning the
+    counts as shaped arrays. Counters from several workers are merged with
+    `merge`.
+
+    The dealer's final hand is only counted when the dealer played it out
+    (or had a natural) and the player had no natural of their own; rounds
+    where every hand busted or the player surrendered leave it unplayed.
+    """
+
+    def __init__(self):
+        """Initialize empty counters."""
+        self.reset()
+
+    def reset(self):
+        """Zero every counter."""
+        cells = 3 * TOTALS * len(UPCARDS)
+        self._decisions = np.zeros(cells * len(ACTIONS), np.int64)
+        self._dealer = np.zeros(len(UPCARDS) * len(DEALER_OUTCOMES), np.int64)
+        self._rounds = np.zeros(cells, np.int64)
+        self._profit = np.zeros(cells)
+        self._squared = np.zeros(cells)
+        self._cards = []  # Cards and marks of the rounds since the last fold
+        self._results = []  # Their results
+        self._rules = None  # The rules they were played under
+        # Each card object seen, and each mark, by its index in Card.RANKS
+        self._ranks = dict(_MARK_INDEXES)
+
+    def __getstate__(self):
+        """Fold the logged rounds before pickling, e.g. to return from a worker."""
+        self._fold()
+        self._ranks = dict(_MARK_INDEXES)
+        return vars(self)
+
+    @property
+    def decisions(self):
+        """numpy.ndarray: Decision counts, shaped (class, total, upcard, action)."""
+        self._fold()
+        return self._decisions.reshape(3, TOTALS, len(UPCARDS), len(ACTIONS)).copy()
+
+    @property
+    def dealer_totals(self):
+        """numpy.ndarray: Dealer final hands, shaped (upcard, DEALER_OUTCOMES)."""
+        self._fold()
+        return self._dealer.reshape(len(UPCARDS), len(DEALER_OUTCOMES)).copy()
+
+    @property
+    def hand_rounds(self):
+        """numpy.ndarray: Rounds per starting hand, shaped (class, total, upcard)."""
+        self._fold()
+        return self._rounds.reshape(3, TOTALS, len(UPCARDS)).copy()
+
+    @property
+    def hand_profit(self):
+        """numpy.ndarray: Net units won per starting hand."""
+        self._fold()
+        return self._profit.reshape(3, TOTALS, len(UPCARDS)).copy()
+
+    @property
+    def hand_squared(self):
+        """numpy.ndarray: Sum of squared net units per starting hand."""
+        self._fold()
+        return self._squared.reshape(3, TOTALS, len(UPCARDS)).copy()
+
+    @property
+    def rounds(self):
+        """int: Rounds counted."""
+        self._fold()
+        return int(self._rounds.sum())
+
+    def record(self, game, profit):
+        """
+        Log a finished round for `_fold` to count.
+
+        Only the round's cards, each hand followed by a mark saying how it
+        ended, and its result are logged here; the counts are rebuilt from
+        them in batches of `_FOLD_ROUNDS`.
+
+        Args:
+            game (Game): The game, before its next round is dealt.
+            profit (float): The round's net result in units of the initial bet.
+        """
+        if game.rules is not self._rules:
+            self._fold()
+            self._rules = game.rules
+        player = game.player
+        logged = self._cards
+        if player.hand_count > 1 or game.surrendered:
+            self._log_split(game)
+        else:
+            logged += player.hand.cards
+            logged.append(_DOUBLED_END if player.hand_bets[0] > game.bet else _HAND_END)
+            logged += game.dealer.hand.cards
+            logged.append(_ROUND_END)
+        results = self._results
+        results.append(profit)
+        if len(results) >= _FOLD_ROUNDS:
+            self._fold()
+
+    def _log_split(self, game):
+        """
+        Log the cards of a round the player split or surrendered.
+
+        Args:
+            game (Game): The game, before its next round is dealt.
+        """
+        player = game.player
+        logged = self._cards
+        for index in range(player.hand_count):
+            logged += player.hands[index].cards
+            logged.append(
+                _DOUBLED_END if player.hand_bets[index] > game.bet else _HAND_END
+            )
+        logged += game.dealer.hand.cards
+        logged.append(_SURRENDER_END if game.surrendered else _ROUND_END)
+
+    def _fold(self):
+        """
+        Count the rounds logged by `record` with array operations.
+
+        Each hand's decisions follow from its first two cards and the cards
+        it ended with: every card the hand drew was a hit, or a double if
+        its stake grew, taken in the cell the hand was in at the time, and a
+        hand that did not bust stood in its final cell. A split round starts
+        from the pair, whose first card every split hand keeps; split aces
+        that could not be hit took no decision but still faced the dealer.
+        """
+        if not self._results:
+            return
+        profit = np.fromiter(self._results, float, len(self._results))
+        cards = self._cards
+        ranks = self._rank_indexes(cards)
+        self._results.clear()
+        cards.clear()
+
+        # Where each hand and dealer hand starts and ends in the log
+        ends = np.flatnonzero(ranks >= _HAND_END)
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        dealt = ranks[ends] >= _ROUND_END
+        hands = ~dealt
+        hand_first = starts[hands]
+        hand_cards = ends[hands] - hand_first
+        doubled = ranks[ends[hands]] == _DOUBLED_END
+        upcard_at = starts[dealt]
+        dealer_cards = ends[dealt] - upcard_at
+        surrendered = ranks[ends[dealt]] == _SURRENDER_END
+        hand_counts = np.diff(np.flatnonzero(dealt), prepend=-1) - 1
+        first_hand = np.cumsum(hand_counts) - hand_counts
+        round_of = np.repeat(np.arange(len(hand_counts)), hand_counts)
+
+        values = _RANK_VALUES[ranks]
+        upcard = values[upcard_at]
+        first = hand_first[first_hand]
+        split = hand_counts > 1
+        second = np.where(split, ranks[first], ranks[first + 1])
+        cell = _FIRST_CELLS[ranks[first] * 13 + second] + upcard * 5
+        self._count_rounds(cell // 5, profit)
+
+        dealer = _TWO_CARD_TOTAL_ARRAY[upcard * 12 + values[upcard_at + 1]]
+        dealer_natural = (dealer_cards == 2) & (dealer == 21)
+        natural = (cell // 50 == _SOFT_ROW + 21) & (hand_cards[first_hand] == 2)
+        peeked = dealer_natural & ~natural & self._rules.dealer_peek
+        played = ~(natural | peeked | surrendered)
+        self._decisions += np.bincount(
+            np.concatenate(
+                [
+                    cell[surrendered] + SURRENDER,
+                    np.repeat(cell[split] + SPLIT, hand_counts[split] - 1),
+                ]
+            ),
+            minlength=len(self._decisions),
+        )
+
+        live = played[round_of]
+        walked = live.copy()
+        if not self._rules.hit_split_aces:
+            walked &= ~split[round_of] | (ranks[hand_first] != _ACE)
+        walked = np.flatnonzero(walked)
+        hand_first = hand_first[walked]
+        live[walked] = self._count_hands(
+            _FIRST_CELLS[ranks[hand_first] * 13 + ranks[hand_first + 1]]
+            + upcard[round_of[walked]] * 5,
+            hand_cards[walked],
+            doubled[walked],
+            values,
+            hand_first,
+        )
+
+        # Every hand busting leaves the dealer's hand unplayed
+        shown = peeked | (np.bincount(round_of, live, len(hand_counts)) > 0)
+        self._count_dealer(ranks, values, upcard_at[shown], dealer_cards[shown])
+
+    def _count_rounds(self, start, profit):
+        """
+        Add rounds and their results to their starting hands.
+
+        Args:
+            start (numpy.ndarray): Each round's starting hand and upcard index.
+            profit (numpy.ndarray): Each round's net result.
+        """
+        self._rounds += np.bincount(start, minlength=len(self._rounds))
+        self._profit += np.bincount(start, profit, len(self._profit))
+        self._squared += np.bincount(start, profit * profit, len(self._squared))
+
+    def _count_hands(self, cell, cards, doubled, values, first):
+        """
+        Count the decisions of hands that were played out.
+
+        The hands are walked through the next-cell table a card at a time,
+        all at once.
+
+        Args:
+            cell (numpy.ndarray): Each hand's two-card decision cell.
+            cards (numpy.ndarray): Each hand's final card count.
+            doubled (numpy.ndarray): Whether each hand's stake grew.
+            values (numpy.ndarray): The card values of the logged cards.
+            first (numpy.ndarray): Where each hand's cards start in `values`.
+
+        Returns:
+            numpy.ndarray: Whether each hand ended without busting.
+        """
+        counted = []
+        live = np.zeros(len(cell), bool)
+        stood = cards == 2
+        counted.append(cell[stood] + STAND)
+        live[stood] = True
+        doubles = np.flatnonzero(doubled)
+        counted.append(cell[doubles] + DOUBLE)
+        live[doubles] = (
+            _NEXT_CELL_ARRAY[cell[doubles] * 12 + values[first[doubles] + 2]] > 0
+        )
+        hits = np.flatnonzero(~doubled & (cards > 2))
+        hit_cells = cell[hits]
+        for drawn in range(2, cards[hits].max(initial=2)):
+            going = cards[hits] > drawn
+            counted.append(hit_cells[going] + HIT)
+            hit_cells[going] = _NEXT_CELL_ARRAY[
+                hit_cells[going] * 12 + values[first[hits][going] + drawn]
+            ]
+        counted.append(hit_cells[hit_cells > 0] + STAND)  # A bust leaves no cell
+        live[hits] = hit_cells > 0
+        self._decisions += np.bincount(
+            np.concatenate(counted), minlength=len(self._decisions)
+        )
+        return live
+
+    def _count_dealer(self, ranks, values, upcard_at, cards):
+        """
+        Count the dealer's final hands.
+
+        Args:
+            ranks (numpy.ndarray): The rank indexes of the logged cards.
+            values (numpy.ndarray): Their card values.
+            upcard_at (numpy.ndarray): Where each dealer hand starts.
+            cards (numpy.ndarray): Each dealer hand's card count.
+        """
+        upcard = values[upcard_at]
+        dealer = _TWO_CARD_TOTAL_ARRAY[upcard * 12 + values[upcard_at + 1]]
+        outcome = np.where(dealer == 21, DEALER_BLACKJACK, dealer - 17)
+        drew = np.flatnonzero(cards > 2)
+        drawn_at = upcard_at[drew]
+        cell = _FIRST_CELLS[ranks[drawn_at] * 13 + ranks[drawn_at + 1]] + 10
+        for drawn in range(2, cards.max(initial=2)):
+            going = cards[drew] > drawn
+            cell[going] = _NEXT_CELL_ARRAY[
+                cell[going] * 12 + values[drawn_at[going] + drawn]
+            ]
+        outcome[drew] = _ROW_OUTCOME_ARRAY[cell // 50]
+        self._dealer += np.bincount(
+            upcard * 7 - 14 + outcome, minlength=len(self._dealer)
+        )
+
+    def _rank_indexes(self, cards):
+        """
+        Get the index in Card.RANKS of every card, remembering new cards.
+
+        Args:
+            cards (list): Card objects.
+
+        Returns:
+            numpy.ndarray: The rank indexes.
+        """
+        indexes = self._ranks
+        try:
+            ranks = bytes(map(indexes.__getitem__, cards))
+        except KeyError:
+            for card in cards:
+                if card not in indexes:
+                    indexes[card] = Card.RANKS.index(card.rank)
+            ranks = bytes(map(indexes.__getitem__, cards))
+        return np.frombuffer(ranks, np.uint8).astype(int)
+
+    def stratified_ev(self, probabilities=None):
+        """
+        Estimate the EV per round by post-stratifying on the starting hand.
+
+        Each starting hand and upcard's mean result is weighted by its known
+        probability instead of how often it happened to be dealt, which
+        takes the luck of the deal out of the estimate.
+
+        Args:
+            probabilities (numpy.ndarray, optional): Probability of each
+                                                     starting hand, shaped like
+                                                     hand_rounds. Defaults to
+                                                     the infinite deck's.
+
+        Returns:
+            tuple: (EV per round, standard error); the error is infinite until
+                   every starting hand has been dealt at least twice.
+        """
+        if probabilities is None:
+            probabilities = starting_hand_probabilities()
+        counts = self.hand_rounds
+        dealt = probabilities > 0
+        if (counts[dealt] < 2).any():
+            return float("nan"), float("inf")
+        n = counts[dealt]
+        means = self.hand_profit[dealt] / n
+        variances = (self.hand_squared[dealt] / n - means * means) * n / (n - 1)
+        weights = probabilities[dealt]
+        ev = float((weights * means).sum())
+        se = math.sqrt(float((weights * weights * np.maximum(variances, 0) / n).sum()))
+        return ev, se
+
+    def merge(self, other):
+        """
+        Add another set of counters to this one.
+
+        Args:
+            other (RoundCounters): Counters from another run or worker.
+
+        Returns:
+            RoundCounters: self, for chaining.
+        """
+        other._fold()
+        self._decisions += other._decisions
+        self._dealer += other._dealer
+        self._rounds += other._rounds
+        self._profit += other._profit
+        self._squared += other._squared
+        return self
+
+    def heatmaps(self):
+        """
+        Lay the counters out as tables with one column per dealer upcard.
+
+        Only rows with something counted are kept. "decisions" has a row per
+        hand and action; "dealer" the share of each final dealer hand per
+        upcard; "ev" the mean net units per round of each starting hand;
+        "contribution" each starting hand's share of the overall result in
+        units per round, so every cell together adds up to the player's edge.
+
+        Returns:
+            dict: Name -> {"rows": row labels, "columns": UPCARDS,
+                  "values": nested lists}.
+        """
+        decisions = {"rows": [], "columns": UPCARDS, "values": []}
+        for hand_class, total, action in np.argwhere(
+            self.decisions.sum(axis=2) > 0
+        ).tolist():
+            decisions["rows"].append(
+                f"{hand_label(hand_class, total)} {ACTIONS[action]}"
+            )
+            decisions["values"].append(
+                self.decisions[hand_class, total, :, action].tolist()
+            )
+
+        seen = self.dealer_totals.sum(axis=1, keepdims=True)
+        shares = self.dealer_totals / np.maximum(seen, 1)
+        dealer = {
+            "rows": DEALER_OUTCOMES,
+            "columns": UPCARDS,
+            "values": shares.T.tolist(),
+        }
+
+        ev = {"rows": [], "columns": UPCARDS, "values": []}
+        contribution = {"rows": [], "columns": UPCARDS, "values": []}
+        rounds = max(self.rounds, 1)
+        for hand_class, total in np.argwhere(self.hand_rounds.sum(axis=2) > 0).tolist():
+            label = hand_label(hand_class, total)
+            counts = self.hand_rounds[hand_class, total]
+            profit = self.hand_profit[hand_class, total]
+            means = np.where(counts > 0, profit / np.maximum(counts, 1), np.nan)
+            ev["rows"].append(label)
+            ev["values"].append([None if np.isnan(x) else x for x in means.tolist()])
+            contribution["rows"].append(label)
+            contribution["values"].append((profit / rounds).tolist())
+
+        return {
+            "decisions": decisions,
+            "dealer": dealer,
+            "ev": ev,
+            "contribution": contribution,
+        }
+
+    def save_csv(self, path, name="decisions"):
+        """
+        Write one heatmap as CSV.
+
+        Args:
+            path (str): The file to write.
+            name (str, optional): A key of `heatmaps`. Defaults to "decisions".
+        """
+        heatmap = self.heatmaps()[name]
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow([name] + heatmap["columns"])
+            for label, values in zip(heatmap["rows"], heatmap["values"]):
+                writer.writerow([label] + ["" if x is None else x for x in values])
+
+    def to_dict(self):
+        """
+        Convert the counters to a JSON-friendly dict.
+
+        Returns:
+            dict: The raw arrays as nested lists, the axis labels and the
+                  heatmaps.
+        """
+        return {
+            "hand_classes": HAND_CLASSES,
+            "actions": ACTIONS,
+            "upcards": UPCARDS,
+            "dealer_outcomes": DEALER_OUTCOMES,
+            "rounds": self.rounds,
+            "decisions": self.decisions.tolist(),
+            "dealer_totals": self.dealer_totals.tolist(),
+            "hand_rounds": self.hand_rounds.tolist(),
+            "hand_profit": self.hand_profit.tolist(),
+            "hand_squared": self.hand_squared.tolist(),
+            "heatmaps": self.heatmaps(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuild counters from `to_dict` output.
+
+        Args:
+            data (dict): Output of `to_dict`.
+
+        Returns:
+            RoundCounters: The counters.
+        """
+        counters = cls()
+        counters._decisions[:] = np.ravel(data["decisions"])
+        counters._dealer[:] = np.ravel(data["dealer_totals"])
+        counters._rounds[:] = np.ravel(data["hand_rounds"])
+        counters._profit[:] = np.ravel(data["hand_profit"])
+        counters._squared[:] = np.ravel(data["hand_squared"])
+        return counters
+
+    def save_json(self, path):
+        """
+        Write the counters and heatmaps as JSON.
+
+        Args:
+            path (str): The file to write.
+        """
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+
+
+def starting_hand_probabilities():
+    """
+    Get the probability of every starting hand and upcard from an infinite deck.
+
+    Returns:
+        numpy.ndarray: Probabilities shaped (class, total, upcard), like
+                       RoundCounters.hand_rounds.
+    """
+    values = [Card(rank).value for rank in Card.RANKS]
+    share = 1 / len(Card.RANKS)
+    probabilities = np.zeros((3, TOTALS, len(UPCARDS)))
+    rows = probabilities.reshape(-1, len(UPCARDS))
+    for first, first_value in enumerate(values):
+        for second, second_value in enumerate(values):
+            if first == second:
+                row = _PAIR_ROW + first_value
+            else:
+                row = _TWO_CARD_ROWS[first_value * 12 + second_value]
+            for upcard_value in values:
+                rows[row, upcard_value - 2] += share**3
+    return probabilities
+
+
+def hand_label(hand_class, total):
+    """
+    Name a row of the hand tables.
+
+    Args:
+        hand_class (int): HARD, SOFT or PAIR.
+        total (int): The total, or the card value of a pair.
+
+    Returns:
+        str: e.g. "hard 16", "soft 18" or "pair A".
+    """
+    if hand_class == PAIR and total == 11:
+        return "pair A"
+    return f"{HAND_CLASSES[hand_class]} {total}"
@@ -1,12 +1,12 @@
 import time
-import cv2
 from game.game import Game
+from game.rules import Rules
+from analysis.decisions import DecisionTables
 from game.strategy import Strategy
 from game.hand import Hand
 from game.card import Card
 from ui.display import display_hand, display_game_state, display_input_method
 from input.keyboard_input import KeyboardInputHandler
-from input.video_input import VideoInputHandler
 from config import Config
 
 
@@ -23,6 +23,13 @@ def get_input_handler(config):
     use_video = config.get("input", "use_video", False)
 
     if use_video:
+        # OpenCV and MediaPipe are only imported once video input is used
+        try:
+            from input.video_input import VideoInputHandler
+        except ImportError:
+            print("OpenCV or MediaPipe is not installed. Falling back to keyboard.")
+            return KeyboardInputHandler()
+
         display_video = config.get("input", "display_video", True)
         keyboard_fallback = config.get("input", "keyboard_fallback", True)
         handler = VideoInputHandler(
@@ -190,6 +197,50 @@ def settings_menu(config):
             time.sleep(1)
 
 
+def ask_insurance(game, show_strategy):
+    """
+    Offer insurance, or even money on a natural, against a dealer ace.
+
+    Args:
+        game (Game): The game in progress.
+        show_strategy (bool): Whether to show the exact EV recommendation.
+
+    Returns:
+        bool: True if the player accepts.
+    """
+    if game.player.hand.is_blackjack():
+        offer = "Dealer shows an Ace. Take even money?"
+    else:
+        offer = f"Dealer shows an Ace. Insure for ${game.bet / 2:.2f}?"
+
+    if show_strategy:
+        advice = "TAKE IT" if game.wants_insurance() else "DECLINE"
+        print(f"The strategy suggests to {advice}.")
+
+    return input(f"{offer} (y/n): ").lower() in ["y", "yes"]
+
+
+def ask_surrender(game, show_strategy):
+    """
+    Offer late surrender on the first two cards.
+
+    Args:
+        game (Game): The game in progress.
+        show_strategy (bool): Whether to show the exact EV recommendation.
+
+    Returns:
+        bool: True if the player surrenders.
+    """
+    if show_strategy:
+        advice = "SURRENDER" if game.wants_surrender() else "PLAY ON"
+        print(f"The strategy suggests to {advice}.")
+
+    return input(f"Surrender for ${game.bet / 2:.2f} back? (y/n): ").lower() in [
+        "y",
+        "yes",
+    ]
+
+
 def play_game():
     """Main function to play the blackjack game with configurable input."""
     # Load configuration
@@ -198,8 +249,9 @@ def play_game():
     # Get the appropriate input handler
     input_handler = get_input_handler(config)
 
-    # Initialize game
-    game = Game()
+    # Initialize game, with exact tables for insurance and surrender advice
+    rules = Rules(late_surrender=config.get("game", "late_surrender", False))
+    game = Game(rules=rules, decisions=DecisionTables(rules))
 
     # Set initial balance from config
     initial_balance = config.get("game", "initial_balance", 1000.0)
@@ -296,17 +348,37 @@ def play_game():
                         print("Invalid input. Please enter a number.")
 
             # Start the round
-            result, player_hand, dealer_hand, bet, win_amount = game.play_round(
-                bet_amount
-            )
+            if not game.start_round(bet_amount):
+                print("Insufficient balance for that bet.")
+                continue
+            player_hand = game.player.hand
 
             # Display initial state
             print("\nDealing cards...")
             time.sleep(1)
             display_game_state(game)
 
-            # Check for blackjack
-            if result == "player_blackjack":
+            # Offer insurance or even money, then check for blackjack
+            insure = False
+            if game.dealer.upcard.rank == "A":
+                insure = ask_insurance(game, show_strategy)
+            round_over, result = game.check_blackjack(insure)
+            if not round_over:
+                result = "continue"
+
+            if game.insurance_bet > 0:
+                if game.dealer.hand.is_blackjack():
+                    print("Insurance pays 2:1.")
+                else:
+                    print("Dealer does not have Blackjack. Insurance lost.")
+
+            if result == "even_money":
+                print("Even money taken. You win 1:1.")
+                time.sleep(1)
+                display_game_state(game, hide_dealer=False)
+                continue
+
+            elif result == "player_blackjack":
                 print("Blackjack! You win 3:2.")
                 time.sleep(1)
                 display_game_state(game, hide_dealer=False)
@@ -328,6 +400,14 @@ def play_game():
                 # Something unexpected happened
                 continue
 
+            # Late surrender is only offered on the first two cards
+            if game.rules.late_surrender and ask_surrender(game, show_strategy):
+                game.surrender()
+                print(f"You surrender. ${game.bet / 2:.2f} returned.")
+                time.sleep(1)
+                display_game_state(game, hide_dealer=False)
+                continue
+
             # Player's turn
             print("\nPlayer's turn...")
             time.sleep(1)
@@ -0,0 +1,404 @@
+import argparse
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from parallel import mean_interval
+
+# Fields of a worker's row in the block
+HANDS, TARGET, ROUNDS, PROFIT, SQUARED, STARTED, UPDATED, FIRST = range(8)
+FIELDS = 8
+
+# Blocks open in this process by name, so a handle reuses its creator's
+_open_blocks = {}
+
+
+class MetricsBlock:
+    """
+    Live simulation metrics in a shared memory block.
+
+    The block holds one row of float64 fields per worker about its current
+    run: hands played and to play, rounds, net result and sum of squared
+    results in units of the bet, when the run started and last updated, and
+    the hands it started from (more than zero for a resumed run). Each
+    worker writes only its own row, and only at Simulation.run's progress
+    interval, so there are no locks and the hot loop is untouched. Readers such as the
+    Prometheus endpoint and the dashboard map the same block, so watching a
+    run costs it nothing. A reader may catch a row halfway through an
+    update, which is off by one interval at most.
+
+    Attributes:
+        name (str): The shared memory block's name.
+        workers (int): Worker rows.
+        values (numpy.ndarray): The (workers, FIELDS) rows.
+    """
+
+    def __init__(self, workers=1, name=None, create=True):
+        """
+        Create a block, or attach to an existing one.
+
+        Args:
+            workers (int, optional): Worker rows. Defaults to 1.
+            name (str, optional): The block's name. Defaults to a generated
+                                  one when creating.
+            create (bool, optional): Whether to create the block, rather than
+                                     attach to `name`. Defaults to True.
+        """
+        size = workers * FIELDS * 8
+        self._owner = create
+        self._memory = shared_memory.SharedMemory(name=name, create=create, size=size)
+        if not create:
+            # Only the creator unlinks the block, so attached processes must
+            # not leave its cleanup to the resource tracker
+            resource_tracker.unregister(self._memory._name, "shared_memory")
+            workers = self._memory.size // (FIELDS * 8)
+        self.name = self._memory.name
+        self.workers = workers
+        self.values = np.ndarray(
+            (workers, FIELDS), dtype=np.float64, buffer=self._memory.buf
+        )
+        if create:
+            self.values[:] = 0.0
+        _open_blocks[self.name] = self
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Attach to an existing block.
+
+        Args:
+            name (str): The block's name.
+
+        Returns:
+            MetricsBlock: The attached block.
+        """
+        return cls(name=name, create=False)
+
+    def worker(self, index):
+        """
+        Get the handle a worker updates its row through.
+
+        Args:
+            index (int): The worker's row.
+
+        Returns:
+            WorkerMetrics: A handle that can be sent to another process.
+        """
+        return WorkerMetrics(self.name, index)
+
+    def close(self):
+        """Detach from the block, removing it if this process created it."""
+        _open_blocks.pop(self.name, None)
+        self.values = None
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+    def __enter__(self):
+        """Use the block as a context manager that closes it on exit."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the block."""
+        self.close()
+
+    def snapshot(self, z=1.96):
+        """
+        Summarize the block.
+
+        Args:
+            z (float, optional): Normal quantile of the confidence interval.
+                                 Defaults to 1.96 (95%).
+
+        Returns:
+            dict: Totals over the workers (hands, target, rounds, hands per
+                  second, house edge per initial bet and its confidence
+                  half-width in percent) and a "workers" list of each
+                  worker's hands, target, progress and hands per second.
+        """
+        values = self.values.copy()
+        now = time.time()
+        workers = []
+        for index, row in enumerate(values):
+            elapsed = (row[UPDATED] - row[STARTED]) if row[STARTED] else 0.0
+            played = row[HANDS] - row[FIRST]
+            workers.append(
+                {
+                    "worker": index,
+                    "hands": int(row[HANDS]),
+                    "target": int(row[TARGET]),
+                    "progress": (
+                        float(row[HANDS] / row[TARGET]) if row[TARGET] else 0.0
+                    ),
+                    "hands_per_second": (
+                        float(played / elapsed) if elapsed > 0 else 0.0
+                    ),
+                    "seconds_since_update": (
+                        float(now - row[UPDATED]) if row[UPDATED] else None
+                    ),
+                }
+            )
+        rounds = values[:, ROUNDS].sum()
+        mean, half_width = mean_interval(
+            rounds, float(values[:, PROFIT].sum()), float(values[:, SQUARED].sum()), z
+        )
+        edge = -mean * 100 if rounds else 0.0
+        half_width *= 100
+        return {
+            "hands": int(values[:, HANDS].sum()),
+            "target": int(values[:, TARGET].sum()),
+            "rounds": int(rounds),
+            "hands_per_second": sum(worker["hands_per_second"] for worker in workers),
+            "house_edge": edge,
+            "ci_half_width": half_width,
+            "workers": workers,
+        }
+
+
+class WorkerMetrics:
+    """
+    One worker's row of a MetricsBlock, updated by Simulation.run.
+
+    The handle only holds the block's name and row, so it pickles into a
+    worker process and attaches there on its first update.
+
+    Attributes:
+        name (str): The block's name.
+        index (int): The worker's row.
+    """
+
+    def __init__(self, name, index):
+        """
+        Initialize a handle.
+
+        Args:
+            name (str): The block's name.
+            index (int): The worker's row.
+        """
+        self.name = name
+        self.index = index
+        self._block = None
+
+    def __getstate__(self):
+        """Pickle the name and row only."""
+        return {"name": self.name, "index": self.index, "_block": None}
+
+    def update(self, hands, target, rounds, profit, squared):
+        """
+        Write the worker's progress.
+
+        Args:
+            hands (int): Hands played so far.
+            target (int): Hands to play.
+            rounds (int): Rounds played so far.
+            profit (float): Net result so far in units of the bet.
+            squared (float): Sum of squared round results in units of the bet.
+        """
+        if self._block is None:
+            self._block = _open_blocks.get(self.name) or MetricsBlock.attach(self.name)
+        row = self._block.values[self.index]
+        now = time.time()
+        if not row[STARTED] or hands < row[HANDS]:
+            row[STARTED] = now  # A new run
+            row[FIRST] = hands
+        row[HANDS] = hands
+        row[TARGET] = target
+        row[ROUNDS] = rounds
+        row[PROFIT] = profit
+        row[SQUARED] = squared
+        row[UPDATED] = now
+
+
+def prometheus_text(block):
+    """
+    Render a block's metrics in the Prometheus text exposition format.
+
+    Args:
+        block (MetricsBlock): The block.
+
+    Returns:
+        str: The metrics.
+    """
+    snapshot = block.snapshot()
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP blackjack_{name} {help_text}")
+        lines.append(f"# TYPE blackjack_{name} {kind}")
+        for labels, value in samples:
+            lines.append(f"blackjack_{name}{labels} {value:.10g}")
+
+    # Per-worker series only, so a family never mixes a total with its
+    # parts; sum() over the worker label gives the totals
+    workers = snapshot["workers"]
+    metric(
+        "hands_total",
+        "counter",
+        "Hands simulated by each worker.",
+        [(f'{{worker="{w["worker"]}"}}', w["hands"]) for w in workers],
+    )
+    metric(
+        "hands_target",
+        "gauge",
+        "Hands each worker is to simulate.",
+        [(f'{{worker="{w["worker"]}"}}', w["target"]) for w in workers],
+    )
+    metric(
+        "progress_ratio",
+        "gauge",
+        "Share of each worker's hands simulated.",
+        [(f'{{worker="{w["worker"]}"}}', w["progress"]) for w in workers],
+    )
+    metric(
+        "hands_per_second",
+        "gauge",
+        "Simulation speed of each worker.",
+        [(f'{{worker="{w["worker"]}"}}', w["hands_per_second"]) for w in workers],
+    )
+    metric(
+        "house_edge_percent",
+        "gauge",
+        "Current house edge per initial bet.",
+        [("", snapshot["house_edge"])],
+    )
+    metric(
+        "house_edge_ci_half_width_percent",
+        "gauge",
+        "Half-width of the 95% confidence interval of the house edge.",
+        [("", snapshot["ci_half_width"])],
+    )
+    return "\n".join(lines) + "\n"
+
+
+def serve_metrics(block, host="127.0.0.1", port=9100):
+    """
+    Serve a block's metrics over HTTP in the background.
+
+    Every path answers with the Prometheus text of `prometheus_text`.
+
+    Args:
+        block (MetricsBlock): The block.
+        host (str, optional): Interface to listen on. Defaults to "127.0.0.1".
+        port (int, optional): Port to listen on; 0 picks a free one. Defaults
+                              to 9100.
+
+    Returns:
+        ThreadingHTTPServer: The running server; call `shutdown` to stop it.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = prometheus_text(block).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def format_dashboard(snapshot, width=80):
+    """
+    Format a snapshot as dashboard lines.
+
+    Args:
+        snapshot (dict): Output of `MetricsBlock.snapshot`.
+        width (int, optional): Columns available. Defaults to 80.
+
+    Returns:
+        list: The lines.
+    """
+    target = snapshot["target"]
+    progress = snapshot["hands"] / target if target else 0.0
+    lines = [
+        f"Hands {snapshot['hands']:,} / {target:,} ({progress:.1%})",
+        f"Speed {snapshot['hands_per_second']:,.0f} hands/s",
+        f"House edge {snapshot['house_edge']:+.4f}% "
+        f"+/- {snapshot['ci_half_width']:.4f}%",
+        "",
+        f"{'Worker':>6} {'Hands':>14} {'Hands/s':>10}  Progress",
+    ]
+    bar_width = max(width - 46, 10)
+    for worker in snapshot["workers"]:
+        filled = int(round(worker["progress"] * bar_width))
+        lines.append(
+            f"{worker['worker']:>6} {worker['hands']:>14,} "
+            f"{worker['hands_per_second']:>10,.0f}  "
+            f"[{'#' * filled}{'.' * (bar_width - filled)}]"
+        )
+    return [line[: width - 1] for line in lines]
+
+
+def dashboard(block, interval=1.0):
+    """
+    Show a block's metrics in a curses dashboard until q is pressed.
+
+    Args:
+        block (MetricsBlock): The block.
+        interval (float, optional): Seconds between refreshes. Defaults to 1.
+    """
+    import curses
+
+    def draw(screen):
+        curses.curs_set(0)
+        screen.timeout(int(interval * 1000))
+        while True:
+            height, width = screen.getmaxyx()
+            screen.erase()
+            lines = format_dashboard(block.snapshot(), width)
+            lines += ["", "q to quit"]
+            for row, line in enumerate(lines[: height - 1]):
+                screen.addstr(row, 0, line)
+            screen.refresh()
+            if screen.getch() in (ord("q"), ord("Q")):
+                return
+
+    curses.wrapper(draw)
+
+
+def main(argv=None):
+    """
+    Serve or show a running simulation's metrics from the command line.
+
+    Args:
+        argv (list, optional): Command-line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: Exit status.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m metrics",
+        description="Watch simulations through their shared metrics block.",
+    )
+    parser.add_argument("command", choices=["serve", "dashboard"])
+    parser.add_argument("name", help="the shared memory block's name")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to serve on")
+    parser.add_argument("--port", type=int, default=9100, help="port to serve on")
+    args = parser.parse_args(argv)
+
+    block = MetricsBlock.attach(args.name)
+    try:
+        if args.command == "dashboard":
+            dashboard(block)
+        else:
+            server = serve_metrics(block, args.host, args.port)
+            print(f"Serving metrics on http://{args.host}:{server.server_port}/")
+            try:
+                threading.Event().wait()
+            except KeyboardInterrupt:
+                server.shutdown()
+    finally:
+        block.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
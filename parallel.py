@@ -0,0 +1,67 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+
+def split_evenly(total, parts):
+    """
+    Split a number of items into at most `parts` near-equal chunks.
+
+    Args:
+        total (int): Items to split.
+        parts (int): Chunks to split them into.
+
+    Returns:
+        list: The chunk sizes, largest first; empty chunks are left out, so
+              a chunk's position is also its number.
+    """
+    sizes = [
+        total // parts + (1 if part < total % parts else 0) for part in range(parts)
+    ]
+    return [size for size in sizes if size]
+
+
+def map_tasks(function, tasks, workers=None):
+    """
+    Apply a function to every task on a process pool, in order.
+
+    The pool is shut down once the results are used up or the generator is
+    closed.
+
+    Args:
+        function (callable): A module-level function taking one task.
+        tasks (list): The tasks.
+        workers (int, optional): Worker processes; 1 runs inline. Defaults to
+                                 the number of CPUs.
+
+    Yields:
+        The function's result for each task.
+    """
+    if workers == 1:
+        yield from map(function, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(function, tasks)
+
+
+def mean_interval(rounds, total, squared, z=1.96):
+    """
+    Get the mean result per round and the half-width of its confidence interval.
+
+    Args:
+        rounds (int): Rounds played.
+        total (float): Sum of the round results.
+        squared (float): Sum of the squared round results.
+        z (float, optional): Normal quantile of the interval. Defaults to
+                             1.96 (95%).
+
+    Returns:
+        tuple: (mean, half-width), both 0 without rounds and the half-width
+               0 for a single round.
+    """
+    if rounds == 0:
+        return 0.0, 0.0
+    mean = total / rounds
+    if rounds == 1:
+        return mean, 0.0
+    variance = max(squared / rounds - mean * mean, 0.0) * rounds / (rounds - 1)
+    return mean, z * math.sqrt(variance / rounds)
@@ -0,0 +1,268 @@
+import cProfile
+import io
+import json
+import pstats
+import time
+import tracemalloc
+
+# Phases of a round, in the order they happen
+DEAL, SIDE_BETS, PLAYER_TURN, STRATEGY, DEALER_TURN, SETTLE, BOOKKEEPING = range(7)
+PHASES = [
+    "deal",
+    "side_bets",
+    "player_turn",
+    "strategy",
+    "dealer_turn",
+    "settle",
+    "bookkeeping",
+]
+
+
+class PhaseProfiler:
+    """
+    Accumulates where a simulation's time goes, phase by phase.
+
+    Simulation.run only takes the timed path when a profiler is passed, so a
+    normal run pays nothing. Each phase adds its perf_counter_ns duration to
+    a preallocated list. Strategy lookups are timed inside the player's
+    turn, which is reported without them. The whole run can also be wrapped
+    in cProfile and tracemalloc, which slow it down and inflate the phase
+    timings taken alongside them.
+
+    Attributes:
+        totals_ns (list): Nanoseconds spent in each phase, indexed like PHASES.
+        calls (list): Times each phase ran.
+        wall_ns (int): Nanoseconds from start to stop.
+        hands (int): Rounds played while profiling.
+        use_cprofile (bool): Whether to run cProfile over the run.
+        trace_memory (bool): Whether to trace allocations with tracemalloc.
+        report_path (str): JSON file the report is written to on stop, or None.
+    """
+
+    def __init__(
+        self, use_cprofile=False, trace_memory=False, report_path=None, top=15
+    ):
+        """
+        Initialize a profiler.
+
+        Args:
+            use_cprofile (bool, optional): Run cProfile over the run. Defaults
+                                           to False.
+            trace_memory (bool, optional): Trace allocations. Defaults to False.
+            report_path (str, optional): Write the JSON report here when the
+                                         run ends. Defaults to None.
+            top (int, optional): Functions and allocation sites to keep from
+                                 cProfile and tracemalloc. Defaults to 15.
+        """
+        self.use_cprofile = use_cprofile
+        self.trace_memory = trace_memory
+        self.report_path = report_path
+        self.top = top
+        self.reset()
+
+    def reset(self):
+        """Clear every accumulated timing."""
+        self.totals_ns = [0] * len(PHASES)
+        self.calls = [0] * len(PHASES)
+        self.wall_ns = 0
+        self.hands = 0
+        self._start_ns = 0
+        self._depth = 0
+        self._strategy = None
+        self._cprofile = None
+        self._cprofile_rows = []
+        self._memory_rows = []
+        self._memory_peak = None
+
+    def add(self, phase, elapsed_ns):
+        """
+        Add time to a phase.
+
+        Args:
+            phase (int): Index into PHASES.
+            elapsed_ns (int): Nanoseconds spent.
+        """
+        self.totals_ns[phase] += elapsed_ns
+        self.calls[phase] += 1
+
+    def _timed(self, method):
+        """
+        Wrap a strategy method so its outermost calls add to STRATEGY.
+
+        Args:
+            method (callable): The bound method.
+
+        Returns:
+            callable: The timed method.
+        """
+        clock = time.perf_counter_ns
+
+        def timed(*args):
+            if self._depth:
+                return method(*args)
+            self._depth = 1
+            start = clock()
+            try:
+                return method(*args)
+            finally:
+                self._depth = 0
+                self.add(STRATEGY, clock() - start)
+
+        return timed
+
+    def start(self, strategy=None):
+        """
+        Start profiling a run.
+
+        Args:
+            strategy (Strategy, optional): The player's strategy, whose lookups
+                                           are timed until `stop`.
+        """
+        self.reset()
+        if strategy is not None:
+            self._strategy = strategy
+            for name in ("decide_action", "lookup", "should_surrender"):
+                setattr(strategy, name, self._timed(getattr(strategy, name)))
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.use_cprofile:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        self._start_ns = time.perf_counter_ns()
+
+    def stop(self, hands):
+        """
+        Stop profiling and collect the cProfile and tracemalloc results.
+
+        Args:
+            hands (int): Rounds played during the run.
+
+        Returns:
+            dict: The report (see `report`).
+        """
+        self.wall_ns = time.perf_counter_ns() - self._start_ns
+        self.hands = hands
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self.trace_memory:
+            # Snapshot before the cProfile results are processed, leaving out
+            # the profilers' own allocations
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, cProfile.__file__),
+                ]
+            )
+            self._memory_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            for stat in snapshot.statistics("lineno")[: self.top]:
+                frame = stat.traceback[0]
+                self._memory_rows.append(
+                    {
+                        "location": f"{frame.filename}:{frame.lineno}",
+                        "size_bytes": stat.size,
+                        "blocks": stat.count,
+                    }
+                )
+        if self._cprofile is not None:
+            stats = pstats.Stats(self._cprofile, stream=io.StringIO())
+            for (filename, line, function), row in stats.stats.items():
+                calls, _, own, cumulative, _ = row
+                self._cprofile_rows.append(
+                    {
+                        "function": f"{filename}:{line}({function})",
+                        "calls": calls,
+                        "own_s": own,
+                        "cumulative_s": cumulative,
+                    }
+                )
+            self._cprofile_rows.sort(key=lambda row: row["cumulative_s"], reverse=True)
+            del self._cprofile_rows[self.top :]
+        if self._strategy is not None:
+            # Drop the timed wrappers so the strategy's own methods come back
+            for name in ("decide_action", "lookup", "should_surrender"):
+                del self._strategy.__dict__[name]
+            self._strategy = None
+
+        report = self.report()
+        if self.report_path is not None:
+            self.save(self.report_path)
+        return report
+
+    def report(self):
+        """
+        Build the machine-readable report.
+
+        The player's turn is reported without the strategy lookups made
+        during it, and "other" is the run's time outside every phase (the
+        loop, progress output and the timing itself).
+
+        Returns:
+            dict: Hands, wall time, per-phase time, calls, share and
+                  nanoseconds per hand, plus any cProfile and tracemalloc
+                  results.
+        """
+        totals = list(self.totals_ns)
+        totals[PLAYER_TURN] -= totals[STRATEGY]
+        other = max(self.wall_ns - sum(totals), 0)
+        phases = {}
+        for name, total, calls in zip(
+            PHASES + ["other"], totals + [other], self.calls + [0]
+        ):
+            phases[name] = {
+                "ns": total,
+                "calls": calls,
+                "share": total / self.wall_ns if self.wall_ns else 0.0,
+                "ns_per_hand": total / self.hands if self.hands else 0.0,
+            }
+        report = {"hands": self.hands, "wall_ns": self.wall_ns, "phases": phases}
+        if self.use_cprofile:
+            report["cprofile"] = self._cprofile_rows
+        if self.trace_memory:
+            report["memory"] = {
+                "peak_bytes": self._memory_peak,
+                "top": self._memory_rows,
+            }
+        return report
+
+    def format_report(self):
+        """
+        Format the phase timings as a text table.
+
+        Returns:
+            str: One phase per line.
+        """
+        report = self.report()
+        lines = [f"{'Phase':<14} {'Seconds':>9} {'Share':>7} {'ns/hand':>9}"]
+        for name, row in report["phases"].items():
+            lines.append(
+                f"{name:<14} {row['ns'] / 1e9:>9.3f} {row['share']:>7.1%} "
+                f"{row['ns_per_hand']:>9.0f}"
+            )
+        lines.append(
+            f"{'total':<14} {self.wall_ns / 1e9:>9.3f} over {self.hands} hands"
+        )
+        if self.use_cprofile:
+            lines.append("\nTop functions by cumulative time:")
+            for row in self._cprofile_rows:
+                lines.append(
+                    f"  {row['cumulative_s']:>8.3f}s {row['calls']:>9} {row['function']}"
+                )
+        if self.trace_memory:
+            lines.append(f"\nPeak traced memory: {self._memory_peak / 1024:.1f} KiB")
+            for row in self._memory_rows:
+                lines.append(
+                    f"  {row['size_bytes'] / 1024:>8.1f} KiB {row['location']}"
+                )
+        return "\n".join(lines)
+
+    def save(self, path):
+        """
+        Write the report as JSON.
+
+        Args:
+            path (str): The file to write.
+        """
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+            f.write("\n")
@@ -0,0 +1,367 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+import time
+from game import Rules, Strategy
+from game.counting import Counter
+from simulation import ADDITIVE_STATS, Simulation
+
+
+def code_version():
+    """
+    Fingerprint the source code that decides a simulation's results.
+
+    Returns:
+        str: SHA-256 over the game package and the simulation module.
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    paths = sorted(glob.glob(os.path.join(root, "game", "*.py")))
+    paths.append(os.path.join(root, "simulation.py"))
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _canonical(value):
+    """
+    Turn nested strategy tables into something json can dump deterministically.
+
+    Dictionaries mix int and str keys (2-10 and "A"), so they become lists of
+    [key, value] pairs sorted by the key's text. Objects with a `to_dict`
+    (such as an IndexTable) are described by it. A Counter is described by
+    its counting system alone, since its running count is live state.
+
+    Args:
+        value: A table, list, scalar or object with a `to_dict`.
+
+    Returns:
+        The canonical form.
+    """
+    if isinstance(value, dict):
+        return sorted(([str(k), _canonical(v)] for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, Counter):
+        value = value.system
+    if hasattr(value, "to_dict"):
+        return [type(value).__name__, _canonical(value.to_dict())]
+    # A repr would hold object addresses and change from process to process
+    raise TypeError(f"Cannot describe a {type(value).__name__} reproducibly.")
+
+
+def strategy_hash(strategy):
+    """
+    Hash a strategy's class and tables.
+
+    Args:
+        strategy (Strategy): The strategy.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    payload = [type(strategy).__name__, _canonical(vars(strategy))]
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+
+
+def rules_hash(rules):
+    """
+    Hash a rule set.
+
+    Args:
+        rules (Rules): The rules.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    return hashlib.sha256(
+        json.dumps(rules.to_dict(), sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def configuration(bet_size=100.0, seed=0, rules=None, strategy=None):
+    """
+    Describe everything that decides a run's results apart from its length.
+
+    Args:
+        bet_size (float, optional): The bet size. Defaults to 100.0.
+        seed (int or str, optional): The run's seed. Defaults to 0.
+        rules (Rules, optional): The table rules. Defaults to Rules().
+        strategy (Strategy, optional): The player's strategy. Defaults to
+                                       basic strategy.
+
+    Returns:
+        dict: The configuration, including the code version.
+    """
+    rules = rules if rules is not None else Rules()
+    strategy = strategy if strategy is not None else Strategy()
+    return {
+        "bet_size": bet_size,
+        "seed": seed,
+        "rules": rules.to_dict(),
+        "strategy": type(strategy).__name__,
+        "strategy_tables": _canonical(vars(strategy)),
+        "code_version": code_version(),
+    }
+
+
+def configuration_hash(config, num_hands=None):
+    """
+    Hash a configuration, optionally with the number of hands.
+
+    Args:
+        config (dict): Output of `configuration`.
+        num_hands (int, optional): The run's length. Defaults to None, which
+                                   hashes the configuration alone.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    payload = {"config": config, "hands": num_hands}
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def simulation_results(simulation):
+    """
+    Collect a simulation's statistics after a run.
+
+    Args:
+        simulation (Simulation): The simulation.
+
+    Returns:
+        dict: The additive statistics, the side-bet results, and the house
+              edge, standard deviation and 95% confidence half-width.
+    """
+    results = {name: getattr(simulation, name) for name in ADDITIVE_STATS}
+    results["side_bet_profit"] = dict(simulation.side_bet_profit)
+    bets = simulation.total_bets_placed
+    results["house_edge"] = -simulation.total_profit / bets * 100 if bets else 0.0
+    results["sd_per_round"] = simulation.standard_deviation()
+    _, results["ci_half_width"] = simulation.confidence_interval()
+    return results
+
+
+class ResultCache:
+    """
+    Disk cache of Simulation.run results keyed by a configuration hash.
+
+    Each entry holds a run's results and the pickled simulation as it was
+    when the run ended. A request for more hands than a cached run of the
+    same configuration tops that run up: the simulation carries on from
+    where it stopped and the statistics are added together, which gives the
+    same hands as a fresh run of the full length. The cache is bounded in
+    bytes and evicts the least recently used entries first.
+
+    Attributes:
+        directory (str): Where the entries and the index are stored.
+        max_bytes (int): Largest total size of the entries.
+    """
+
+    INDEX = "index.json"
+
+    def __init__(self, directory=".simulation_cache", max_bytes=256 * 1024 * 1024):
+        """
+        Initialize a cache, creating its directory if needed.
+
+        Args:
+            directory (str, optional): Where to store entries. Defaults to
+                                       ".simulation_cache".
+            max_bytes (int, optional): Largest total size of the entries.
+                                       Defaults to 256 MiB.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._index = self._load_index()
+
+    def _load_index(self):
+        """
+        Read the index, dropping entries whose files have gone.
+
+        Returns:
+            dict: Key -> {"base", "hands", "bytes", "used"}.
+        """
+        path = os.path.join(self.directory, self.INDEX)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {
+            key: entry
+            for key, entry in index.items()
+            if os.path.exists(self._path(key))
+        }
+
+    def _save_index(self):
+        """Write the index atomically."""
+        path = os.path.join(self.directory, self.INDEX)
+        temporary = path + ".tmp"
+        with open(temporary, "w") as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(temporary, path)
+
+    def _path(self, key):
+        """Get the file an entry is stored in."""
+        return os.path.join(self.directory, key + ".pkl")
+
+    def __len__(self):
+        """int: Number of cached runs."""
+        return len(self._index)
+
+    @property
+    def size(self):
+        """int: Total bytes of the cached runs."""
+        return sum(entry["bytes"] for entry in self._index.values())
+
+    def run(self, num_hands=1000, bet_size=100.0, seed=0, rules=None, strategy=None):
+        """
+        Get the results of a run, from the cache when possible.
+
+        Args:
+            num_hands (int, optional): Hands to simulate. Defaults to 1000.
+            bet_size (float, optional): The bet size. Defaults to 100.0.
+            seed (int or str, optional): The run's seed; a cached run has to be
+                                         reproducible. Defaults to 0.
+            rules (Rules, optional): The table rules. Defaults to Rules().
+            strategy (Strategy, optional): The player's strategy. Defaults to
+                                           basic strategy.
+
+        Returns:
+            dict: The results (see `simulation_results`), with "source" set to
+                  "cache", "top_up" or "simulated".
+        """
+        if seed is None:
+            raise ValueError("Only seeded runs can be cached.")
+        config = configuration(bet_size, seed, rules, strategy)
+        base = configuration_hash(config)
+        key = configuration_hash(config, num_hands)
+
+        entry = self._read(key)
+        if entry is not None:
+            results = entry["results"]
+            results["source"] = "cache"
+            return results
+
+        # Top up the longest shorter run of the same configuration
+        shorter = sorted(
+            (entry["hands"], other)
+            for other, entry in self._index.items()
+            if entry["base"] == base and entry["hands"] < num_hands
+        )
+        previous = None
+        while shorter and previous is None:
+            _, other = shorter.pop()
+            previous = self._read(other)
+
+        if previous is None:
+            simulation = Simulation(bet_size, seed, rules)
+            if strategy is not None:
+                simulation.game.player.strategy = strategy
+            simulation.run(num_hands, display_progress=False)
+            source = "simulated"
+        else:
+            simulation = previous["simulation"]
+            simulation.run(num_hands - previous["hands"], display_progress=False)
+            cached = previous["results"]
+            for name in ADDITIVE_STATS:
+                setattr(simulation, name, getattr(simulation, name) + cached[name])
+            for name, profit in cached["side_bet_profit"].items():
+                simulation.side_bet_profit[name] += profit
+            source = "top_up"
+
+        results = simulation_results(simulation)
+        self._write(
+            key,
+            base,
+            num_hands,
+            {"hands": num_hands, "results": results, "simulation": simulation},
+        )
+        results = dict(results)
+        results["source"] = source
+        return results
+
+    def _read(self, key):
+        """
+        Load an entry and mark it as used.
+
+        Args:
+            key (str): The entry's key.
+
+        Returns:
+            dict: The entry, or None if it is missing or unreadable.
+        """
+        if key not in self._index:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            self._remove(key)
+            self._save_index()
+            return None
+        self._index[key]["used"] = time.time()
+        self._save_index()
+        return entry
+
+    def _write(self, key, base, num_hands, entry):
+        """
+        Store an entry, then evict until the cache fits.
+
+        Args:
+            key (str): The entry's key.
+            base (str): The hash of its configuration without the hand count.
+            num_hands (int): Hands in the run.
+            entry (dict): What to pickle.
+        """
+        path = self._path(key)
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+        self._index[key] = {
+            "base": base,
+            "hands": num_hands,
+            "bytes": os.path.getsize(path),
+            "used": time.time(),
+        }
+        self._evict(keep=key)
+        self._save_index()
+
+    def _evict(self, keep=None):
+        """
+        Remove the least recently used entries until the cache fits.
+
+        Args:
+            keep (str, optional): An entry never to evict, such as the one
+                                  just written.
+        """
+        for key in sorted(self._index, key=lambda key: self._index[key]["used"]):
+            if self.size <= self.max_bytes:
+                break
+            if key != keep:
+                self._remove(key)
+
+    def _remove(self, key):
+        """Delete an entry's file and index record."""
+        self._index.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        """Remove every entry."""
+        for key in list(self._index):
+            self._remove(key)
+        self._save_index()
@@ -0,0 +1,424 @@
+import json
+import os
+import queue
+import threading
+from array import array
+import numpy as np
+from game.card import Card
+from game.rules import Rules
+from instrumentation import DOUBLE, HIT, SPLIT, STAND, SURRENDER
+
+# Cards kept per hand; longer hands are cut short and flagged
+CARDS_PER_HAND = 12
+
+# Bits of the flags column
+SURRENDERED, INSURED, TRUNCATED = 1, 2, 4
+
+# Rank codes index Card.RANKS; -1 pads unused card and action slots
+RANK_CODES = {rank: code for code, rank in enumerate(Card.RANKS)}
+PAD = -1
+
+META = "meta.json"
+
+# Each rank code's value with aces as one
+_HARD_VALUES = [2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 1]
+
+# Actions of a hand by its number of cards: hit until standing or busting,
+# or double; and the splits that opened a round of that many hands
+_STOOD = [
+    bytes([HIT] * max(cards - 2, 0) + [STAND])[:CARDS_PER_HAND] for cards in range(64)
+]
+_BUSTED = [bytes([HIT] * max(cards - 2, 0))[:CARDS_PER_HAND] for cards in range(64)]
+_DOUBLED = bytes([DOUBLE])
+_SPLITS = [bytes([SPLIT] * max(hands - 1, 0)) for hands in range(256)]
+
+
+def _columns(capacity, max_hands):
+    """
+    Describe the log's columns.
+
+    Args:
+        capacity (int): Rows in every column.
+        max_hands (int): Most hands a round can split into.
+
+    Returns:
+        dict: Column name -> (dtype, shape).
+    """
+    return {
+        "player_cards": (np.int8, (capacity, max_hands, CARDS_PER_HAND)),
+        "dealer_cards": (np.int8, (capacity, CARDS_PER_HAND)),
+        "actions": (np.int8, (capacity, max_hands, CARDS_PER_HAND)),
+        "hand_count": (np.uint8, (capacity,)),
+        "net": (np.int32, (capacity,)),
+        "flags": (np.uint8, (capacity,)),
+    }
+
+
+class RoundRecorder:
+    """
+    Records every round of a simulation into memory-mapped column files.
+
+    Each round becomes one fixed-width row: the rank codes of every player
+    hand and of the dealer's hand, the actions taken on each hand, the
+    number of hands, the net result in half bets and a few flags. Columns
+    are `.npy` files preallocated to the log's capacity, so a `RoundLog` can
+    map them without copying.
+
+    Rounds are packed into a chunk of plain byte buffers, which takes a
+    scalar write far faster than an array. A full chunk is handed to a
+    background thread that copies it into the memory maps while the next
+    chunk fills, with two chunks in rotation. Every call to `flush` (made by
+    Simulation.run when it finishes) writes the partial chunk and records
+    the row count in the log's metadata; rows past it are not part of the
+    log.
+
+    Actions use the codes of the instrumentation module, in the order taken.
+    Splits are recorded on the first hand, and a surrender or a natural
+    leaves no other action. Net results are kept in half bets, so rules
+    paying 6:5 on a natural cannot be recorded and are refused up front.
+
+    Attributes:
+        directory (str): Where the column files are kept.
+        capacity (int): Most rows the log can hold.
+        rules (Rules): The rules the rounds are played under.
+        max_hands (int): Hands per row.
+        chunk_rows (int): Rows written to the files at a time.
+        rows (int): Rows recorded so far.
+    """
+
+    def __init__(self, directory, capacity, rules=None, chunk_rows=65536):
+        """
+        Create a log, preallocating its column files.
+
+        Args:
+            directory (str): Where to keep the log. Existing column files are
+                             replaced.
+            capacity (int): Most rows the log can hold. The files are sparse
+                            until written, so a generous capacity is cheap.
+            rules (Rules, optional): The table rules, which set the hands per
+                                     row. Defaults to Rules().
+            chunk_rows (int, optional): Rows written to the files at a time.
+                                        Defaults to 65536.
+        """
+        rules = rules if rules is not None else Rules()
+        units = rules.blackjack_payout * 2
+        if abs(units - round(units)) > 1e-9:
+            raise ValueError(
+                "Only rules paying naturals in half bets can be recorded, "
+                f"not {rules.describe()}."
+            )
+        self.directory = directory
+        self.capacity = capacity
+        self.max_hands = rules.max_split_hands
+        self.chunk_rows = chunk_rows
+        self.rows = 0
+        self.rules = rules
+
+        os.makedirs(directory, exist_ok=True)
+        self._files = {
+            name: np.lib.format.open_memmap(
+                os.path.join(directory, name + ".npy"),
+                mode="w+",
+                dtype=dtype,
+                shape=shape,
+            )
+            for name, (dtype, shape) in _columns(capacity, self.max_hands).items()
+        }
+        self._write_meta()
+
+        # Byte widths of a row in the card and action buffers
+        self._hand_width = self.max_hands * CARDS_PER_HAND
+        self._free = queue.Queue()
+        for _ in range(2):
+            self._free.put(self._new_chunk())
+        self._pending = queue.Queue(maxsize=1)
+        self._error = None
+        self._writer = threading.Thread(target=self._write_chunks, daemon=True)
+        self._writer.start()
+        self._take_chunk()
+
+    def _new_chunk(self):
+        """
+        Allocate a chunk of row buffers, padded.
+
+        Returns:
+            dict: Column name -> buffer.
+        """
+        rows = self.chunk_rows
+        return {
+            "player_cards": bytearray(b"\xff" * (rows * self._hand_width)),
+            "dealer_cards": bytearray(b"\xff" * (rows * CARDS_PER_HAND)),
+            "actions": bytearray(b"\xff" * (rows * self._hand_width)),
+            "hand_count": bytearray(rows),
+            "net": array("i", bytes(4 * rows)),
+            "flags": bytearray(rows),
+        }
+
+    def _take_chunk(self):
+        """Start filling the next free chunk."""
+        chunk = self._free.get()
+        self._chunk = chunk
+        self._player = chunk["player_cards"]
+        self._dealer = chunk["dealer_cards"]
+        self._actions = chunk["actions"]
+        self._hand_counts = chunk["hand_count"]
+        self._net = chunk["net"]
+        self._flags = chunk["flags"]
+        self._start = self.rows
+        self._row = 0
+        self._limit = min(self.chunk_rows, self.capacity - self.rows)
+
+    def record(self, game, profit):
+        """
+        Record a finished round.
+
+        Args:
+            game (Game): The game, before its next round is dealt.
+            profit (float): The round's net result in units of the initial bet.
+        """
+        row = self._row
+        if row >= self._limit:
+            raise ValueError(f"The round log is full ({self.capacity} rows).")
+        units = profit * 2
+        net = round(units)
+        if abs(net - units) > 0.01:
+            raise ValueError("Only results in half bets can be recorded.")
+
+        player = game.player
+        hands = player.hands
+        hand_count = player.hand_count
+        dealer_cards = game.dealer.hand.cards
+        first = hands[0].cards
+        base = row * self._hand_width
+        actions = self._actions
+        flags = INSURED if game.insurance_bet > 0 else 0
+
+        # Which hands had decisions; the actions are rebuilt from the cards
+        # and bets
+        played = 0
+        splits = _SPLITS[hand_count]
+        if game.surrendered:
+            flags |= SURRENDERED
+            actions[base] = SURRENDER
+        elif (
+            hand_count == 1
+            and len(first) == 2
+            and first[0].value + first[1].value == 21
+        ):
+            pass  # A player natural: nothing to decide
+        elif (
+            len(dealer_cards) == 2
+            and dealer_cards[0].value + dealer_cards[1].value == 21
+            and game.rules.dealer_peek
+        ):
+            pass  # The dealer's natural ended the round before any decision
+        elif splits and first[0].value == 11 and not game.rules.hit_split_aces:
+            actions[base : base + len(splits)] = splits  # One card each
+        else:
+            played = hand_count
+
+        # The player's cards and actions, hand by hand, then the dealer's cards
+        buffer = self._player
+        base_bet = game.bet
+        hand_bets = player.hand_bets
+        start = base
+        for index in range(hand_count):
+            cards = hands[index].cards
+            if len(cards) > CARDS_PER_HAND:
+                cards = cards[:CARDS_PER_HAND]
+                flags |= TRUNCATED
+            codes = [RANK_CODES[card.rank] for card in cards]
+            buffer[start : start + len(codes)] = bytes(codes)
+            if index < played:
+                if hand_bets[index] > base_bet:
+                    taken = _DOUBLED
+                elif sum([_HARD_VALUES[code] for code in codes]) <= 21:
+                    taken = _STOOD[len(codes)]
+                else:
+                    taken = _BUSTED[len(codes)]
+                if index == 0 and splits:
+                    taken = (splits + taken)[:CARDS_PER_HAND]
+                actions[start : start + len(taken)] = taken
+            start += CARDS_PER_HAND
+        cards = dealer_cards
+        if len(cards) > CARDS_PER_HAND:
+            cards = cards[:CARDS_PER_HAND]
+            flags |= TRUNCATED
+        start = row * CARDS_PER_HAND
+        self._dealer[start : start + len(cards)] = bytes(
+            [RANK_CODES[card.rank] for card in cards]
+        )
+
+        self._hand_counts[row] = hand_count
+        self._net[row] = net
+        self._flags[row] = flags
+        self._row = row + 1
+        self.rows += 1
+        if self._row == self._limit:
+            self._submit()
+
+    def _submit(self):
+        """Hand the filled part of the current chunk to the writer."""
+        if self._error is not None:
+            raise self._error
+        self._pending.put((self._start, self._row, self._chunk))
+        self._take_chunk()
+
+    def _write_chunks(self):
+        """Copy chunks into the column files. Runs on the writer thread."""
+        while True:
+            item = self._pending.get()
+            if item is None:
+                self._pending.task_done()
+                return
+            start, rows, chunk = item
+            try:
+                if self._error is None:
+                    self._write_chunk(start, rows, chunk)
+            except Exception as error:  # Raised again on the recording thread
+                self._error = error
+            self._free.put(chunk)
+            self._pending.task_done()
+
+    def _write_chunk(self, start, rows, chunk):
+        """
+        Copy the first rows of a chunk into the column files and repad it.
+
+        Args:
+            start (int): The chunk's first row in the log.
+            rows (int): Rows filled.
+            chunk (dict): The chunk's buffers.
+        """
+        end = start + rows
+        for name, buffer in chunk.items():
+            column = self._files[name]
+            width = column[0].size
+            values = np.frombuffer(buffer, dtype=column.dtype, count=rows * width)
+            column[start:end] = values.reshape((rows,) + column.shape[1:])
+        for name in ("player_cards", "dealer_cards", "actions"):
+            used = rows * self._files[name][0].size
+            chunk[name][:used] = b"\xff" * used
+
+    def flush(self):
+        """Write every recorded row to the files and update the metadata."""
+        if self._row:
+            self._submit()
+        self._pending.join()
+        if self._error is not None:
+            raise self._error
+        for column in self._files.values():
+            column.flush()
+        self._write_meta()
+
+    def close(self):
+        """Flush the log and stop the writer."""
+        self.flush()
+        self._pending.put(None)
+        self._writer.join()
+        self._files = {}
+
+    def __enter__(self):
+        """Use the recorder as a context manager that closes it on exit."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the recorder."""
+        self.close()
+
+    def _write_meta(self):
+        """Write the metadata atomically."""
+        path = os.path.join(self.directory, META)
+        temporary = path + ".tmp"
+        with open(temporary, "w") as f:
+            json.dump(
+                {
+                    "rows": self.rows,
+                    "capacity": self.capacity,
+                    "max_hands": self.max_hands,
+                    "cards_per_hand": CARDS_PER_HAND,
+                    "rules": self.rules.to_dict(),
+                },
+                f,
+                indent=2,
+            )
+        os.replace(temporary, path)
+
+
+class RoundLog:
+    """
+    Read-only view of a round log written by RoundRecorder.
+
+    The column files are memory-mapped, so opening a log of any size is
+    instant and slicing it only reads the pages touched.
+
+    Attributes:
+        directory (str): Where the log is kept.
+        rows (int): Rounds in the log.
+        max_hands (int): Hands per row.
+        rules (Rules): The rules the rounds were played under.
+        columns (dict): Column name -> read-only array of the log's rows.
+    """
+
+    def __init__(self, directory):
+        """
+        Open a log.
+
+        Args:
+            directory (str): Where the log is kept.
+        """
+        self.directory = directory
+        with open(os.path.join(directory, META), "r") as f:
+            meta = json.load(f)
+        self.rows = meta["rows"]
+        self.max_hands = meta["max_hands"]
+        self.rules = Rules.from_dict(meta["rules"])
+        self.columns = {
+            name: np.load(os.path.join(directory, name + ".npy"), mmap_mode="r")[
+                : self.rows
+            ]
+            for name in _columns(0, self.max_hands)
+        }
+
+    def __len__(self):
+        """int: Rounds in the log."""
+        return self.rows
+
+    def __getitem__(self, key):
+        """
+        Get a column, or some rows of every column.
+
+        Args:
+            key: A column name, or an index, slice or index array of rows.
+
+        Returns:
+            numpy.ndarray or dict: The column, or column name -> rows.
+        """
+        if isinstance(key, str):
+            return self.columns[key]
+        return {name: column[key] for name, column in self.columns.items()}
+
+    def profit(self, rows=slice(None)):
+        """
+        Get net results in units of the initial bet.
+
+        Args:
+            rows (optional): Index, slice or index array of rows. Defaults to
+                             every row.
+
+        Returns:
+            numpy.ndarray: The results.
+        """
+        return self.columns["net"][rows] / 2.0
+
+    @staticmethod
+    def ranks(codes):
+        """
+        Turn rank codes back into ranks.
+
+        Args:
+            codes: Rank codes, such as one hand's row of player_cards.
+
+        Returns:
+            list: The ranks, without padding.
+        """
+        return [Card.RANKS[code] for code in np.ravel(codes) if code != PAD]
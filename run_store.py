@@ -0,0 +1,326 @@
+import json
+import sqlite3
+from datetime import datetime, timezone
+from game import Rules
+from instrumentation import ACTIONS, DEALER_OUTCOMES, UPCARDS, hand_label
+from result_cache import code_version, rules_hash, simulation_results, strategy_hash
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created TEXT NOT NULL,
+    label TEXT,
+    rules_hash TEXT NOT NULL,
+    rules TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    strategy_hash TEXT NOT NULL,
+    seed TEXT,
+    bet_size REAL NOT NULL,
+    hands INTEGER NOT NULL,
+    rounds INTEGER NOT NULL,
+    total_bets REAL NOT NULL,
+    total_profit REAL NOT NULL,
+    sum_squared_profit REAL NOT NULL,
+    house_edge REAL NOT NULL,
+    sd_per_round REAL NOT NULL,
+    ci_half_width REAL NOT NULL,
+    blackjacks INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    pushes INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    surrenders INTEGER NOT NULL,
+    duration_s REAL,
+    code_version TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_rules ON runs (rules_hash, ci_half_width);
+CREATE INDEX IF NOT EXISTS runs_strategy ON runs (strategy_hash, created);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created);
+
+CREATE TABLE IF NOT EXISTS dealer_outcomes (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    upcard TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dealer_outcomes_run ON dealer_outcomes (run_id);
+
+CREATE TABLE IF NOT EXISTS decisions (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    hand TEXT NOT NULL,
+    upcard TEXT NOT NULL,
+    action TEXT NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS decisions_run ON decisions (run_id, hand);
+
+CREATE TABLE IF NOT EXISTS starting_hands (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    hand TEXT NOT NULL,
+    upcard TEXT NOT NULL,
+    rounds INTEGER NOT NULL,
+    profit REAL NOT NULL,
+    sum_squared REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS starting_hands_run ON starting_hands (run_id, hand);
+"""
+
+
+class RunStore:
+    """
+    SQLite store of simulation runs.
+
+    Each run keeps its metadata (date, rules, strategy, seed, code version)
+    and aggregate statistics. It can also keep the breakdowns from
+    RoundCounters: dealer outcomes per upcard, decisions and starting-hand
+    results. A run and its breakdowns go in with one transaction of batched
+    inserts after the simulation has finished, so recording adds nothing to
+    the run itself. Runs are indexed by rules, strategy and date.
+
+    Attributes:
+        path (str): The database file, or ":memory:".
+        connection (sqlite3.Connection): The open connection.
+    """
+
+    def __init__(self, path="simulation_runs.sqlite"):
+        """
+        Open a store, creating its tables if needed.
+
+        Args:
+            path (str, optional): The database file. Defaults to
+                                  "simulation_runs.sqlite".
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """Close the connection."""
+        self.connection.close()
+
+    def __enter__(self):
+        """Use the store as a context manager that closes it on exit."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the store."""
+        self.close()
+
+    def record(self, simulation, seed=None, label=None, counters=None, duration=None):
+        """
+        Store a finished run.
+
+        Args:
+            simulation (Simulation): The simulation, after `run`.
+            seed (int or str, optional): The seed it was created with.
+            label (str, optional): A free-form name for the run.
+            counters (RoundCounters, optional): Breakdowns to store with it.
+                                                Defaults to the simulation's
+                                                own counters, if any.
+            duration (float, optional): Seconds the run took.
+
+        Returns:
+            int: The run's id.
+        """
+        return self.record_many([(simulation, seed, label, counters, duration)])[0]
+
+    def record_many(self, runs):
+        """
+        Store several finished runs in one transaction.
+
+        Args:
+            runs (list): (simulation, seed, label, counters, duration) tuples,
+                         as for `record`.
+
+        Returns:
+            list: The runs' ids, in order.
+        """
+        created = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        version = code_version()
+        ids = []
+        with self.connection:
+            for simulation, seed, label, counters, duration in runs:
+                results = simulation_results(simulation)
+                strategy = simulation.game.player.strategy
+                cursor = self.connection.execute(
+                    "INSERT INTO runs (created, label, rules_hash, rules, strategy, "
+                    "strategy_hash, seed, bet_size, hands, rounds, total_bets, "
+                    "total_profit, sum_squared_profit, house_edge, sd_per_round, "
+                    "ci_half_width, blackjacks, wins, pushes, losses, surrenders, "
+                    "duration_s, code_version) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, "
+                    "?, ?, ?, ?, ?)",
+                    (
+                        created,
+                        label,
+                        rules_hash(simulation.rules),
+                        json.dumps(simulation.rules.to_dict(), sort_keys=True),
+                        type(strategy).__name__,
+                        strategy_hash(strategy),
+                        None if seed is None else str(seed),
+                        simulation.bet_size,
+                        results["hands_played"],
+                        results["rounds_played"],
+                        results["total_bets_placed"],
+                        results["total_profit"],
+                        results["sum_squared_profit"],
+                        results["house_edge"],
+                        results["sd_per_round"],
+                        results["ci_half_width"],
+                        results["blackjacks_won"],
+                        results["normal_wins"],
+                        results["pushes"],
+                        results["losses"],
+                        results["surrenders"],
+                        duration,
+                        version,
+                    ),
+                )
+                run_id = cursor.lastrowid
+                ids.append(run_id)
+                if counters is None:
+                    counters = getattr(simulation, "counters", None)
+                if counters is not None:
+                    self._record_breakdowns(run_id, counters)
+        return ids
+
+    def _record_breakdowns(self, run_id, counters):
+        """
+        Insert a run's non-zero counters in batches.
+
+        Args:
+            run_id (int): The run.
+            counters (RoundCounters): Its counters.
+        """
+        dealer = counters.dealer_totals
+        self.connection.executemany(
+            "INSERT INTO dealer_outcomes VALUES (?, ?, ?, ?)",
+            (
+                (
+                    run_id,
+                    UPCARDS[upcard],
+                    DEALER_OUTCOMES[outcome],
+                    int(dealer[upcard, outcome]),
+                )
+                for upcard, outcome in zip(*dealer.nonzero())
+            ),
+        )
+        decisions = counters.decisions
+        self.connection.executemany(
+            "INSERT INTO decisions VALUES (?, ?, ?, ?, ?)",
+            (
+                (
+                    run_id,
+                    hand_label(hand_class, total),
+                    UPCARDS[upcard],
+                    ACTIONS[action],
+                    int(decisions[hand_class, total, upcard, action]),
+                )
+                for hand_class, total, upcard, action in zip(*decisions.nonzero())
+            ),
+        )
+        rounds = counters.hand_rounds
+        profit = counters.hand_profit
+        squared = counters.hand_squared
+        self.connection.executemany(
+            "INSERT INTO starting_hands VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    run_id,
+                    hand_label(hand_class, total),
+                    UPCARDS[upcard],
+                    int(rounds[hand_class, total, upcard]),
+                    float(profit[hand_class, total, upcard]),
+                    float(squared[hand_class, total, upcard]),
+                )
+                for hand_class, total, upcard in zip(*rounds.nonzero())
+            ),
+        )
+
+    def find_runs(
+        self,
+        rules=None,
+        strategy=None,
+        max_ci_half_width=None,
+        since=None,
+        until=None,
+        label=None,
+    ):
+        """
+        Query runs, newest first.
+
+        Args:
+            rules (Rules, optional): Only runs under these rules.
+            strategy (Strategy, optional): Only runs of this strategy, tables
+                                           included.
+            max_ci_half_width (float, optional): Only runs whose 95%
+                                                 confidence half-width, in
+                                                 percent, is narrower than this.
+            since (str, optional): Only runs created at or after this ISO date.
+            until (str, optional): Only runs created before this ISO date.
+            label (str, optional): Only runs with this label.
+
+        Returns:
+            list: One dict per run, with the rules decoded.
+        """
+        clauses, values = [], []
+        if rules is not None:
+            clauses.append("rules_hash = ?")
+            values.append(rules_hash(rules))
+        if strategy is not None:
+            clauses.append("strategy_hash = ?")
+            values.append(strategy_hash(strategy))
+        if max_ci_half_width is not None:
+            clauses.append("ci_half_width < ?")
+            values.append(max_ci_half_width)
+        if since is not None:
+            clauses.append("created >= ?")
+            values.append(since)
+        if until is not None:
+            clauses.append("created < ?")
+            values.append(until)
+        if label is not None:
+            clauses.append("label = ?")
+            values.append(label)
+        query = "SELECT * FROM runs"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY created DESC, id DESC"
+        rows = []
+        for row in self.connection.execute(query, values):
+            run = dict(row)
+            run["rules"] = Rules.from_dict(json.loads(run["rules"]))
+            rows.append(run)
+        return rows
+
+    def breakdown(self, run_id, table="decisions"):
+        """
+        Get one of a run's stored breakdowns.
+
+        Args:
+            run_id (int): The run.
+            table (str, optional): "decisions", "dealer_outcomes" or
+                                   "starting_hands". Defaults to "decisions".
+
+        Returns:
+            list: One dict per stored row.
+        """
+        if table not in ("decisions", "dealer_outcomes", "starting_hands"):
+            raise ValueError(f"Unknown breakdown: {table}")
+        return [
+            dict(row)
+            for row in self.connection.execute(
+                f"SELECT * FROM {table} WHERE run_id = ?", (run_id,)
+            )
+        ]
+
+    def delete_run(self, run_id):
+        """
+        Delete a run and its breakdowns.
+
+        Args:
+            run_id (int): The run.
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM runs WHERE id = ?", (run_id,))
@@ -1,6 +1,46 @@
+import argparse
+import json
+import math
+import os
+import pickle
+import random
+import signal
+import sys
+import threading
 import time
 import numpy as np
-from game import Game
+from game import Game, Rules
+from game.counting import HI_LO, BetSpread, Counter
+from game.indices import IndexStrategy
+from game.table import Table
+from instrumentation import RoundCounters
+from parallel import map_tasks, mean_interval
+from profiling import (
+    BOOKKEEPING,
+    DEAL,
+    DEALER_TURN,
+    PLAYER_TURN,
+    SETTLE,
+    SIDE_BETS,
+    PhaseProfiler,
+)
+
+# Statistics of a run that add up when runs are combined (see reset_stats)
+ADDITIVE_STATS = [
+    "hands_played",
+    "rounds_played",
+    "total_profit",
+    "total_bets_placed",
+    "sum_squared_profit",
+    "blackjacks_won",
+    "normal_wins",
+    "pushes",
+    "losses",
+    "surrenders",
+    "even_money",
+    "insurance_bets",
+    "insurance_profit",
+]
 
 
 class Simulation:
@@ -10,25 +50,79 @@ class Simulation:
     Attributes:
         game (Game): The game object.
         bet_size (float): The size of each bet.
+        rng (random.Random): Random generator the deck deals from.
         hands_played (int): Number of hands played in the simulation.
+        rounds_played (int): Number of rounds played; split hands count once.
         total_profit (float): Total profit or loss.
+        total_bets_placed (float): Total amount wagered, including split bets.
+        sum_squared_profit (float): Sum of squared per-round profits in units
+                                    of bet_size, used for the standard deviation.
         blackjacks_won (int): Number of hands won with blackjack.
         normal_wins (int): Number of hands won without blackjack.
         pushes (int): Number of pushes.
         losses (int): Number of losses.
+        surrenders (int): Number of surrendered hands.
+        even_money (int): Number of naturals settled for even money.
+        insurance_bets (int): Number of insurance bets placed.
+        insurance_profit (float): Net result of all insurance bets.
+        side_bets (list): Side bets placed every round, if any.
+        side_bet_size (float): Stake on each side bet.
+        side_bet_profit (dict): Net result per side bet name. Side bets are
+                                settled apart from the player's balance, so
+                                they never change the house edge figures.
+        rules (Rules): The table rules.
+        profiler (PhaseProfiler): Phase timings of the last profiled run, or None.
+        counters (RoundCounters): Decision and outcome counts of the last
+                                  counted run, or None.
+        recorder (RoundRecorder): Log the last recorded run's rounds went to,
+                                  or None.
     """
 
-    def __init__(self, bet_size=100.0):
+    def __init__(
+        self,
+        bet_size=100.0,
+        seed=None,
+        rules=None,
+        decisions=None,
+        side_bets=None,
+        side_bet_size=None,
+    ):
         """
         Initialize a new simulation.
 
         Args:
             bet_size (float, optional): The bet size for each hand. Defaults to 100.0.
+            seed (int, optional): Seed for a reproducible run. Defaults to None.
+            rules (Rules, optional): The table rules. Defaults to Rules().
+            decisions (DecisionTables, optional): Surrender, insurance and even
+                                                  money decisions. Defaults to
+                                                  None (never insure).
+            side_bets (list, optional): SideBet objects to place every round.
+                                        Defaults to none.
+            side_bet_size (float, optional): Stake on each side bet. Defaults
+                                             to bet_size.
         """
-        self.game = Game()
         self.bet_size = bet_size
+        self.side_bets = list(side_bets) if side_bets else []
+        self.side_bet_size = side_bet_size if side_bet_size is not None else bet_size
+        self.rules = rules if rules is not None else Rules()
+        self.rng = random.Random(seed)
+        self.game = Game(self._create_deck(), self.rules, decisions)
+        self.profiler = None
+        self.counters = None
+        self.recorder = None
         self.reset_stats()
 
+    def _create_deck(self):
+        """
+        Create the card source for the game.
+
+        Returns:
+            Deck or Shoe: The deck the rules call for, dealing from the
+                          simulation's generator.
+        """
+        return self.rules.create_deck(self.rng)
+
     def reset_stats(self):
         """Reset the simulation statistics."""
         self.hands_played = 0
@@ -37,28 +131,115 @@ class Simulation:
         self.normal_wins = 0
         self.pushes = 0
         self.losses = 0
+        self.surrenders = 0
+        self.even_money = 0
+        self.insurance_bets = 0
+        self.insurance_profit = 0.0
+        self.side_bet_profit = {side_bet.name: 0.0 for side_bet in self.side_bets}
+        self.rounds_played = 0
+        self.total_bets_placed = 0.0
+        self.sum_squared_profit = 0.0
 
-    def run(self, num_hands=1000, display_progress=True):
+    def run(
+        self,
+        num_hands=1000,
+        display_progress=True,
+        profile=None,
+        counters=None,
+        recorder=None,
+        checkpoint=None,
+        checkpoint_every=1000000,
+        resume=False,
+        metrics=None,
+    ):
         """
         Run the simulation for a specified number of hands.
 
         Args:
             num_hands (int, optional): The number of hands to simulate. Defaults to 1000.
             display_progress (bool, optional): Whether to display progress. Defaults to True.
+            profile (PhaseProfiler or bool, optional): Time every phase of every
+                                                       round with this profiler
+                                                       (True for a default one),
+                                                       kept as self.profiler.
+                                                       Defaults to None.
+            counters (RoundCounters or bool, optional): Count every decision,
+                                                        dealer hand and
+                                                        starting hand into
+                                                        these counters (True
+                                                        for new ones), kept as
+                                                        self.counters. Defaults
+                                                        to None.
+            recorder (RoundRecorder, optional): Write every round to this log,
+                                                kept as self.recorder and
+                                                flushed when the run ends.
+                                                Defaults to None.
+            checkpoint (str, optional): File to save the run's progress to
+                                        every checkpoint_every hands, when it
+                                        ends, and on SIGINT or SIGTERM before
+                                        the signal is handled as usual.
+                                        Defaults to None.
+            checkpoint_every (int, optional): Hands between checkpoints.
+                                              Defaults to 1,000,000.
+            resume (bool, optional): Carry on from the checkpoint file, if it
+                                     exists, with results identical to a run
+                                     that was never interrupted. Defaults to
+                                     False.
+            metrics (WorkerMetrics, optional): Row of a shared metrics block
+                                               to write progress to at every
+                                               progress interval, for the
+                                               Prometheus endpoint and
+                                               dashboard in metrics.py.
+                                               Defaults to None.
 
         Returns:
             float: The calculated house edge.
         """
+        if checkpoint is not None and recorder is not None:
+            raise ValueError("A recorded run cannot be checkpointed.")
+        if recorder is not None and recorder.rules != self.rules:
+            raise ValueError("The round log was created for other rules.")
         self.reset_stats()
         start_time = time.time()
 
-        # Set essentially infinite balance to ensure player can always double/split
-        initial_balance = 100000000000.0
-        self.game.player.balance = initial_balance
+        self.counters = RoundCounters() if counters is True else counters or None
+        self.recorder = recorder
 
         # Track total bets separately to calculate house edge
         total_bets_placed = 0.0
         total_net_outcome = 0.0
+        first_hand = 0
+        if resume and checkpoint is not None and os.path.exists(checkpoint):
+            first_hand, total_bets_placed, total_net_outcome = self._load_checkpoint(
+                checkpoint, num_hands
+            )
+
+        play_round = self._play_round
+        profiler = PhaseProfiler() if profile is True else profile or None
+        self.profiler = profiler
+        if profiler is not None:
+            profiler.start(self.game.player.strategy)
+
+            def play_round(bet_amount):
+                return self._play_round_profiled(bet_amount, profiler)
+
+        # Set essentially infinite balance to ensure player can always double/split
+        initial_balance = 100000000000.0
+        if not first_hand:
+            self.game.player.balance = initial_balance
+
+        # Checkpoints are saved between rounds, including when a signal
+        # arrives, so a resumed run picks up exactly where this one stopped
+        next_checkpoint = -1
+        signals = []
+        handlers = {}
+        if checkpoint is not None:
+            next_checkpoint = first_hand + checkpoint_every
+            if threading.current_thread() is threading.main_thread():
+                for signum in (signal.SIGINT, signal.SIGTERM):
+                    handlers[signum] = signal.signal(
+                        signum, lambda signum, frame: signals.append(signum)
+                    )
 
         # Adjust update frequency based on total number of hands
         if num_hands > 100000:
@@ -72,122 +253,96 @@ class Simulation:
         else:
             update_frequency = 100
 
-        for i in range(num_hands):
-            # Update progress with the new frequency
-            if display_progress and i > 0 and i % update_frequency == 0:
-                progress = i / num_hands * 100
-                elapsed_time = time.time() - start_time
-                estimated_total = elapsed_time / i * num_hands
-                remaining_time = estimated_total - elapsed_time
-
-                print(f"Progress: {progress:.1f}% ({i}/{num_hands} hands)")
-                print(
-                    f"Elapsed time: {elapsed_time:.1f}s, Estimated time remaining: {remaining_time:.1f}s"
-                )
-                current_edge = (
-                    -total_net_outcome / (total_bets_placed) * 100
-                    if total_bets_placed > 0
-                    else 0
-                )
-                print(f"Current house edge: {current_edge:.4f}%")
-                print("-" * 50)
+        if metrics is not None:
+            metrics.update(
+                first_hand,
+                num_hands,
+                self.rounds_played,
+                total_net_outcome / self.bet_size,
+                self.sum_squared_profit,
+            )
 
-            # No need to check player balance - it's infinite
+        hands_done = num_hands
+        try:
+            for i in range(first_hand, num_hands):
+                if i == next_checkpoint or signals:
+                    self._save_checkpoint(
+                        checkpoint, num_hands, i, total_bets_placed, total_net_outcome
+                    )
+                    next_checkpoint = i + checkpoint_every
+                    if signals:
+                        hands_done = i
+                        break  # The signal is raised again once the run is over
 
-            # Track initial bet
-            initial_bet = self.bet_size
-            total_bets_placed += initial_bet
+                if metrics is not None and i % update_frequency == 0:
+                    metrics.update(
+                        i,
+                        num_hands,
+                        self.rounds_played,
+                        total_net_outcome / self.bet_size,
+                        self.sum_squared_profit,
+                    )
 
-            # Record the balance before this hand
-            balance_before_hand = self.game.player.balance
+                # Update progress with the new frequency
+                if display_progress and i > first_hand and i % update_frequency == 0:
+                    progress = i / num_hands * 100
+                    elapsed_time = time.time() - start_time
+                    estimated_total = (
+                        elapsed_time / (i - first_hand) * (num_hands - first_hand)
+                    )
+                    remaining_time = estimated_total - elapsed_time
 
-            # Play a hand - initial deal and blackjack check
-            result, player_hand, dealer_hand, bet, win_amount = self.game.play_round(
-                self.bet_size
-            )
+                    print(f"Progress: {progress:.1f}% ({i}/{num_hands} hands)")
+                    print(
+                        f"Elapsed time: {elapsed_time:.1f}s, Estimated time remaining: {remaining_time:.1f}s"
+                    )
+                    current_edge = (
+                        -total_net_outcome / (total_bets_placed) * 100
+                        if total_bets_placed > 0
+                        else 0
+                    )
+                    print(f"Current house edge: {current_edge:.4f}%")
+                    print("-" * 50)
 
-            # Complete the round if it's not already resolved by blackjack
-            if result == "continue":
-                # Play through player turn using perfect strategy
-                player_bust = self.game.player_turn()
-
-                if hasattr(self.game, "split_results"):
-                    # Process split results correctly
-                    split_data = self.game.split_results
-
-                    # Track additional bets from splitting
-                    for hand_index in range(len(split_data["hand_results"])):
-                        if (
-                            hand_index > 0
-                        ):  # First hand is already counted in initial bet
-                            total_bets_placed += initial_bet
-
-                    # Loop through all split hands to count them properly
-                    for hand_result in split_data["hand_results"]:
-                        if hand_result == "win":
-                            self.normal_wins += 1
-                        elif hand_result == "blackjack":
-                            self.blackjacks_won += 1
-                        elif hand_result == "push":
-                            self.pushes += 1
-                        elif hand_result == "loss":
-                            self.losses += 1
-
-                    # We've already counted the original hand as played,
-                    # need to add the additional split hands
-                    self.hands_played += len(split_data["hand_results"]) - 1
-
-                    # Remove the split results
-                    delattr(self.game, "split_results")
-                    continue  # Skip the normal result processing
-
-                if player_bust:
-                    result = "dealer_wins"
-                else:
-                    # Play through dealer turn
-                    dealer_bust = self.game.dealer_turn()
-
-                    # Determine the winner
-                    if dealer_bust:
-                        result = "player_wins"
-                        self.game.player.receive_winnings(
-                            self.game.bet * 2
-                        )  # Return bet + win
-                    else:
-                        # Compare hands
-                        player_value = self.game.player.hand.get_value()
-                        dealer_value = self.game.dealer.hand.get_value()
-
-                        if player_value > dealer_value:
-                            result = "player_wins"
-                            self.game.player.receive_winnings(
-                                self.game.bet * 2
-                            )  # Return bet + win
-                        elif dealer_value > player_value:
-                            result = "dealer_wins"
-                        else:
-                            result = "push"
-                            self.game.player.receive_winnings(
-                                self.game.bet
-                            )  # Return the bet
-
-            # Update statistics
-            self.hands_played += 1
-            hand_profit = self.game.player.balance - balance_before_hand
-            total_net_outcome += hand_profit
-
-            # Update win/loss statistics by result type
-            if result == "player_blackjack":
-                self.blackjacks_won += 1
-            elif result == "player_wins":
-                self.normal_wins += 1
-            elif result == "push":
-                self.pushes += 1
-            elif result == "dealer_wins" or result == "split_processed":
-                self.losses += 1
+                # No need to check player balance - it's infinite
+                hand_profit, bets_placed = play_round(self.bet_size)
+                self.rounds_played += 1
+                total_bets_placed += bets_placed
+                total_net_outcome += hand_profit
+                self.sum_squared_profit += (hand_profit / self.bet_size) ** 2
+
+            if checkpoint is not None and hands_done == num_hands:
+                self._save_checkpoint(
+                    checkpoint,
+                    num_hands,
+                    num_hands,
+                    total_bets_placed,
+                    total_net_outcome,
+                )
+        finally:
+            # Put the previous handlers back however the run ends
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+        if signals:
+            # A signal that came in during the run or the final save is
+            # raised again now that its previous handler is back
+            signal.raise_signal(signals[0])
+        if metrics is not None:
+            metrics.update(
+                hands_done,
+                num_hands,
+                self.rounds_played,
+                total_net_outcome / self.bet_size,
+                self.sum_squared_profit,
+            )
+        if profiler is not None:
+            profiler.stop(hands_done - first_hand)
+        if recorder is not None:
+            recorder.flush()
 
         # Calculate house edge based on total bets placed and net outcome
         self.total_profit = total_net_outcome
+        self.total_bets_placed = total_bets_placed
         house_edge = (
             -total_net_outcome / total_bets_placed * 100 if total_bets_placed > 0 else 0
         )
@@ -212,9 +367,287 @@ class Simulation:
             print(
                 f"Losses: {self.losses} ({self.losses / self.hands_played * 100:.2f}%)"
             )
+            for name, edge in self.side_bet_edges().items():
+                print(f"{name} house edge: {edge:.4f}%")
+            if profiler is not None:
+                print("\nTime by phase:")
+                print(profiler.format_report())
 
         return house_edge
 
+    def _save_checkpoint(self, path, num_hands, hands_done, total_bets, total_net):
+        """
+        Save a run's progress atomically.
+
+        The simulation is pickled whole, apart from its profiler and
+        recorder, so the card source and random generator carry on exactly
+        where they were.
+
+        Args:
+            path (str): The checkpoint file.
+            num_hands (int): Hands in the whole run.
+            hands_done (int): Hands played so far.
+            total_bets (float): Amount wagered so far.
+            total_net (float): Net result so far.
+        """
+        state = {
+            name: value
+            for name, value in vars(self).items()
+            if name not in ("profiler", "recorder")
+        }
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as f:
+            pickle.dump(
+                {
+                    "num_hands": num_hands,
+                    "hands_done": hands_done,
+                    "total_bets_placed": total_bets,
+                    "total_net_outcome": total_net,
+                    "simulation": state,
+                },
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+
+    def _load_checkpoint(self, path, num_hands):
+        """
+        Restore a run's progress from a checkpoint.
+
+        Counters passed to the resumed run take on the checkpoint's counts.
+
+        Args:
+            path (str): The checkpoint file.
+            num_hands (int): Hands in the whole run, which must match.
+
+        Returns:
+            tuple: (hands played, amount wagered, net result) so far.
+        """
+        with open(path, "rb") as f:
+            saved = pickle.load(f)
+        if saved["num_hands"] != num_hands:
+            raise ValueError(
+                f"The checkpoint is for a run of {saved['num_hands']} hands, "
+                f"not {num_hands}."
+            )
+        state = saved["simulation"]
+        if state["rules"].to_dict() != self.rules.to_dict():
+            raise ValueError("The checkpoint was saved under other rules.")
+        counters = self.counters
+        vars(self).update(state)
+        if counters is not None:
+            if self.counters is None:
+                raise ValueError("The checkpoint was saved without counters.")
+            vars(counters).update(vars(self.counters))
+            self.counters = counters
+        return (
+            saved["hands_done"],
+            saved["total_bets_placed"],
+            saved["total_net_outcome"],
+        )
+
+    def _play_round(self, bet_amount):
+        """
+        Play one complete round with perfect strategy and record its result.
+
+        Args:
+            bet_amount (float): The initial bet for the round.
+
+        Returns:
+            tuple: (profit, bets_placed) where profit is the net change in the
+                   player's balance and bets_placed includes split bets; both
+                   0 if the balance could not cover the bet.
+        """
+        # Record the balance before this hand
+        balance_before_hand = self.game.player.balance
+
+        # Play a hand - initial deal and blackjack check
+        result, player_hand, dealer_hand, bet, win_amount = self.game.play_round(
+            bet_amount
+        )
+        if result == "insufficient_balance":
+            # No round was dealt, so there is nothing to end or count
+            return 0.0, 0.0
+
+        if self.side_bets:
+            self._settle_side_bets()
+
+        # Complete the round if it's not already resolved by blackjack
+        if result == "continue":
+            # Play through player turn (including any splits) using perfect strategy
+            self.game.player_turn()
+
+            if self.game.surrendered:
+                results = ["surrender"]
+            else:
+                # Play through dealer turn and settle every hand
+                results = self.game.settle_round()
+        else:
+            results = [result]
+
+        return self._record_round(results, bet_amount, balance_before_hand)
+
+    def _play_round_profiled(self, bet_amount, profiler):
+        """
+        Play one round like `_play_round`, timing each phase.
+
+        The dealer's turn is played apart from settlement so the two can be
+        told apart.
+
+        Args:
+            bet_amount (float): The initial bet for the round.
+            profiler (PhaseProfiler): The profiler to add the timings to.
+
+        Returns:
+            tuple: (profit, bets_placed), as from `_play_round`.
+        """
+        clock = time.perf_counter_ns
+        game = self.game
+        start = clock()
+        balance_before_hand = game.player.balance
+        result, _, _, _, _ = game.play_round(bet_amount)
+        now = clock()
+        profiler.add(DEAL, now - start)
+        if result == "insufficient_balance":
+            return 0.0, 0.0
+
+        if self.side_bets:
+            start = now
+            self._settle_side_bets()
+            now = clock()
+            profiler.add(SIDE_BETS, now - start)
+
+        if result == "continue":
+            start = now
+            game.player_turn()
+            now = clock()
+            profiler.add(PLAYER_TURN, now - start)
+
+            if game.surrendered:
+                results = ["surrender"]
+            else:
+                start = now
+                if game.has_live_hand():
+                    game.dealer_turn()
+                now = clock()
+                profiler.add(DEALER_TURN, now - start)
+
+                start = now
+                dealer_hand = game.dealer.hand
+                results = game.settle_round(
+                    dealer_hand.get_value(), dealer_hand.is_blackjack()
+                )
+                now = clock()
+                profiler.add(SETTLE, now - start)
+        else:
+            results = [result]
+
+        start = now
+        outcome = self._record_round(results, bet_amount, balance_before_hand)
+        profiler.add(BOOKKEEPING, clock() - start)
+        return outcome
+
+    def _record_round(self, results, bet_amount, balance_before_hand):
+        """
+        End a round and add its results to the statistics.
+
+        Args:
+            results (list): The result of each hand played.
+            bet_amount (float): The initial bet for the round.
+            balance_before_hand (float): The player's balance before the bet.
+
+        Returns:
+            tuple: (profit, bets_placed) where profit is the net change in the
+                   player's balance and bets_placed includes split bets.
+        """
+        self.game.end_round()
+
+        if self.game.insurance_bet > 0:
+            self.insurance_bets += 1
+            if self.game.dealer.hand.is_blackjack():
+                self.insurance_profit += self.game.insurance_bet * 2
+            else:
+                self.insurance_profit -= self.game.insurance_bet
+
+        # Update statistics; each split hand counts as a hand and a bet
+        self.hands_played += len(results)
+        bets_placed = bet_amount * len(results)
+
+        # Update win/loss statistics by result type
+        for result in results:
+            if result == "player_blackjack":
+                self.blackjacks_won += 1
+            elif result == "player_wins":
+                self.normal_wins += 1
+            elif result == "push":
+                self.pushes += 1
+            elif result == "dealer_wins" or result == "dealer_blackjack":
+                self.losses += 1
+            elif result == "surrender":
+                self.surrenders += 1
+            elif result == "even_money":
+                self.even_money += 1
+
+        profit = self.game.player.balance - balance_before_hand
+        if self.counters is not None:
+            self.counters.record(self.game, profit / bet_amount)
+        if self.recorder is not None:
+            self.recorder.record(self.game, profit / bet_amount)
+        return profit, bets_placed
+
+    def round_results(self, num_rounds, balance=None):
+        """
+        Play rounds and record the net result of each.
+
+        Args:
+            num_rounds (int): Rounds to play.
+            balance (float, optional): Balance to reset the player to before
+                                       every round, which limits the doubles
+                                       and splits they can afford. Defaults to
+                                       an essentially infinite balance.
+
+        Returns:
+            numpy.ndarray: Net result of every round, in units of bet_size.
+        """
+        player = self.game.player
+        results = np.empty(num_rounds)
+        if balance is None:
+            player.balance = 100000000000.0
+        for i in range(num_rounds):
+            if balance is not None:
+                player.balance = balance
+            profit, _ = self._play_round(self.bet_size)
+            results[i] = profit / self.bet_size
+        return results
+
+    def _settle_side_bets(self):
+        """Settle every side bet on the cards just dealt, before play changes them."""
+        game = self.game
+        first, second = game.player.hand.cards[0], game.player.hand.cards[1]
+        upcard = game.dealer.upcard
+        dealer_blackjack = game.dealer.hand.is_blackjack()
+        for side_bet in self.side_bets:
+            self.side_bet_profit[side_bet.name] += self.side_bet_size * side_bet.settle(
+                first, second, upcard, dealer_blackjack
+            )
+
+    def side_bet_edges(self):
+        """
+        Calculate the house edge of each side bet over the rounds played.
+
+        Returns:
+            dict: Side bet name -> house edge as a percentage of the stake.
+        """
+        staked = self.rounds_played * self.side_bet_size
+        if staked == 0:
+            return {name: 0.0 for name in self.side_bet_profit}
+        return {
+            name: -profit / staked * 100
+            for name, profit in self.side_bet_profit.items()
+        }
+
     def calculate_house_edge(self):
         """
         Calculate the house edge based on the simulation results.
@@ -229,9 +662,376 @@ class Simulation:
         # We now use total_profit directly as set in the run method
         return -self.total_profit / (self.hands_played * self.bet_size) * 100
 
+    def standard_deviation(self):
+        """
+        Calculate the standard deviation of a round's result in units of bet_size.
+
+        Returns:
+            float: The per-round standard deviation.
+        """
+        rounds = self.rounds_played
+        if rounds < 2:
+            return 0.0
+        mean = self.total_profit / self.bet_size / rounds
+        variance = (self.sum_squared_profit / rounds - mean * mean) * rounds
+        return math.sqrt(max(variance, 0.0) / (rounds - 1))
+
+    def confidence_interval(self, z=1.96):
+        """
+        Calculate the house edge per initial bet and its confidence interval.
+
+        Args:
+            z (float, optional): Normal quantile of the interval. Defaults to
+                                 1.96 (95%).
+
+        Returns:
+            tuple: (house edge, half-width), both as percentages of bet_size.
+        """
+        rounds = self.rounds_played
+        if rounds == 0:
+            return 0.0, 0.0
+        edge = -self.total_profit / self.bet_size / rounds * 100
+        half_width = z * self.standard_deviation() / math.sqrt(rounds) * 100
+        return edge, half_width
+
 
-def run_simulation():
-    """Run the blackjack simulation with user input."""
+class CountingSimulation(Simulation):
+    """
+    Runs a card-counting simulation on a finite shoe with a bet spread.
+
+    A Counter attached to the shoe keeps the running count as cards are dealt,
+    and each round's bet comes from the BetSpread at the current count. The
+    inherited bet_size is the value of one betting unit.
+
+    Attributes:
+        counter (Counter): The counter attached to the shoe.
+        bet_spread (BetSpread): Maps the betting count to units.
+        hands_per_hour (int): Rounds per hour used for hourly figures.
+        units_wagered (float): Total initial bets in units.
+        count_buckets (dict): True-count bucket -> [rounds, sum, sum of squares]
+                              of the flat-bet result per round.
+    """
+
+    def __init__(
+        self,
+        bet_size=100.0,
+        system=HI_LO,
+        bet_spread=None,
+        rules=None,
+        hands_per_hour=100,
+        seed=None,
+        index_table=None,
+        decisions=None,
+        side_bets=None,
+    ):
+        """
+        Initialize a new counting simulation.
+
+        Args:
+            bet_size (float, optional): Value of one betting unit. Defaults to 100.0.
+            system (CountingSystem, optional): Counting system. Defaults to Hi-Lo.
+            bet_spread (BetSpread, optional): Bet ramp. Defaults to a 1-12 spread.
+            rules (Rules, optional): The table rules; they must use a finite
+                                     shoe. Defaults to six decks with 75%
+                                     penetration.
+            hands_per_hour (int, optional): Rounds per hour. Defaults to 100.
+            seed (int, optional): Seed for a reproducible run. Defaults to None.
+            index_table (IndexTable, optional): Count-based deviations to play.
+                                                Defaults to basic strategy only.
+            decisions (DecisionTables, optional): Surrender, insurance and even
+                                                  money decisions. Defaults to None.
+            side_bets (list, optional): SideBet objects to place every round,
+                                        one unit each. Defaults to none.
+        """
+        if rules is None:
+            rules = Rules(num_decks=6)
+        elif rules.num_decks is None:
+            raise ValueError("Card counting needs a finite shoe (set num_decks).")
+        self.counter = Counter(system)
+        self.bet_spread = bet_spread if bet_spread is not None else BetSpread()
+        self.hands_per_hour = hands_per_hour
+        super().__init__(bet_size, seed, rules, decisions, side_bets)
+        if index_table is not None:
+            self.game.player.strategy = IndexStrategy(index_table, self.counter)
+
+    def _create_deck(self):
+        """
+        Create the card source for the game.
+
+        Returns:
+            Shoe: A finite shoe with the counter attached.
+        """
+        return self.rules.create_deck(self.rng, self.counter)
+
+    def reset_stats(self):
+        """Reset the simulation statistics."""
+        super().reset_stats()
+        self.units_wagered = 0.0
+        self.count_buckets = {}
+
+    def run(self, num_hands=1000, display_progress=True):
+        """
+        Run the counting simulation for a specified number of rounds.
+
+        Args:
+            num_hands (int, optional): The number of rounds to simulate. Defaults to 1000.
+            display_progress (bool, optional): Whether to print the report. Defaults to True.
+
+        Returns:
+            float: The player's edge as a percentage of initial bets.
+        """
+        self.reset_stats()
+        self.game.player.balance = 100000000000.0
+        shoe = self.game.deck
+        counter = self.counter
+        bet_spread = self.bet_spread
+        buckets = self.count_buckets
+        unit = self.bet_size
+        shoe.shuffle()
+
+        for _ in range(num_hands):
+            if shoe.needs_shuffle():
+                shoe.shuffle()
+
+            units = bet_spread.units(counter.betting_count())
+            bucket = counter.true_count_bucket()
+            bet = units * unit
+
+            profit, bets_placed = self._play_round(bet)
+            self.rounds_played += 1
+            self.units_wagered += units
+            self.total_bets_placed += bets_placed
+            self.total_profit += profit
+            self.sum_squared_profit += (profit / unit) ** 2
+
+            # Flat-bet result so buckets measure the advantage at each count
+            result = profit / bet
+            stats = buckets.get(bucket)
+            if stats is None:
+                stats = buckets[bucket] = [0, 0.0, 0.0]
+            stats[0] += 1
+            stats[1] += result
+            stats[2] += result * result
+
+        if display_progress:
+            self.print_report()
+
+        return self.player_edge()
+
+    def player_edge(self):
+        """
+        Calculate the player's edge over the initial amount wagered.
+
+        Returns:
+            float: The player's edge as a percentage.
+        """
+        if self.units_wagered == 0:
+            return 0.0
+        return self.total_profit / (self.units_wagered * self.bet_size) * 100
+
+    def report(self):
+        """
+        Summarise the run.
+
+        Returns:
+            dict: Player edge, per-round and hourly results in units, and the
+                  flat-bet expectation for every true-count bucket.
+        """
+        rounds = self.rounds_played
+        units_per_round = self.total_profit / self.bet_size / rounds if rounds else 0.0
+        sd = self.standard_deviation()
+
+        ev_by_true_count = {}
+        for bucket in sorted(self.count_buckets):
+            count, total, total_squared = self.count_buckets[bucket]
+            mean = total / count
+            variance = total_squared / count - mean * mean
+            ev_by_true_count[bucket] = {
+                "rounds": count,
+                "frequency": count / rounds * 100,
+                "ev": mean * 100,
+                "standard_error": math.sqrt(max(variance, 0.0) / count) * 100,
+            }
+
+        return {
+            "rounds": rounds,
+            "units_wagered": self.units_wagered,
+            "average_bet": self.units_wagered / rounds if rounds else 0.0,
+            "player_edge": self.player_edge(),
+            "units_per_round": units_per_round,
+            "sd_per_round": sd,
+            "units_per_hour": units_per_round * self.hands_per_hour,
+            "sd_per_hour": sd * math.sqrt(self.hands_per_hour),
+            "ev_by_true_count": ev_by_true_count,
+        }
+
+    def print_report(self):
+        """Print the counting simulation report."""
+        report = self.report()
+        print("\nCounting simulation complete!")
+        print(f"System: {self.counter.system.name}, {self.rules.describe()}")
+        print(f"Rounds played: {report['rounds']}")
+        print(f"Average bet: {report['average_bet']:.2f} units")
+        print(f"Player edge: {report['player_edge']:.4f}%")
+        print(f"SD per round: {report['sd_per_round']:.4f} units")
+        print(
+            f"Win rate: {report['units_per_hour']:.4f} units/hour "
+            f"(SD {report['sd_per_hour']:.2f} units/hour)"
+        )
+        print("\nEV by true count (flat bet):")
+        print(f"{'TC':>5} {'Freq %':>8} {'EV %':>9} {'+/-':>8}")
+        for bucket, stats in report["ev_by_true_count"].items():
+            print(
+                f"{bucket:>5} {stats['frequency']:>8.2f} {stats['ev']:>9.3f} "
+                f"{stats['standard_error']:>8.3f}"
+            )
+
+
+class TableSimulation:
+    """
+    Simulates a multi-seat table where every seat shares one shoe and dealer.
+
+    Attributes:
+        table (Table): The table being simulated.
+        rules (Rules): The table rules.
+        rng (random.Random): Random generator the deck deals from.
+        counter (Counter): The table's counter, if a counting system is used.
+        rounds_played (int): Rounds dealt.
+        seat_rounds (list): Rounds each seat played.
+        hands_played (list): Hands each seat played, split hands included.
+        units_wagered (list): Initial bets per seat, in the seat's units.
+        total_profit (list): Net result per seat.
+        sum_squared_profit (list): Sum of squared per-round results per seat,
+                                   in the seat's units.
+    """
+
+    def __init__(self, seats=7, rules=None, seed=None, system=None):
+        """
+        Initialize a table simulation.
+
+        Args:
+            seats (int or list, optional): Number of basic-strategy seats, or a
+                                           list of Seat objects. Defaults to 7.
+            rules (Rules, optional): The table rules. Defaults to Rules().
+            seed (int, optional): Seed for a reproducible run. Defaults to None.
+            system (CountingSystem, optional): Counting system kept on the shoe
+                                               for seats with a bet spread.
+                                               Needs a finite shoe. Defaults to None.
+        """
+        self.rules = rules if rules is not None else Rules()
+        if system is not None and self.rules.num_decks is None:
+            raise ValueError("Card counting needs a finite shoe (set num_decks).")
+        self.rng = random.Random(seed)
+        self.counter = Counter(system) if system is not None else None
+        deck = self.rules.create_deck(self.rng, self.counter)
+        self.table = Table(seats, self.rules, deck, self.counter)
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the simulation statistics."""
+        seats = len(self.table.seats)
+        self.rounds_played = 0
+        self.seat_rounds = [0] * seats
+        self.hands_played = [0] * seats
+        self.units_wagered = [0.0] * seats
+        self.total_profit = [0.0] * seats
+        self.sum_squared_profit = [0.0] * seats
+
+    def run(self, num_rounds=1000, display_progress=True):
+        """
+        Run the table for a number of rounds.
+
+        Args:
+            num_rounds (int, optional): Rounds to deal. Defaults to 1000.
+            display_progress (bool, optional): Whether to print the report.
+                                               Defaults to True.
+
+        Returns:
+            list: The report row of every seat.
+        """
+        self.reset_stats()
+        seats = self.table.seats
+        players = [seat.player for seat in seats]
+        for player in players:
+            player.balance = 100000000000.0
+
+        for _ in range(num_rounds):
+            balances = [player.balance for player in players]
+            results = self.table.play_round()
+            self.rounds_played += 1
+
+            for index, seat in enumerate(seats):
+                if seat.bet == 0:
+                    continue
+                profit = players[index].balance - balances[index]
+                self.seat_rounds[index] += 1
+                self.hands_played[index] += len(results[index])
+                self.units_wagered[index] += seat.bet / seat.bet_size
+                self.total_profit[index] += profit
+                self.sum_squared_profit[index] += (profit / seat.bet_size) ** 2
+
+        if display_progress:
+            self.print_report()
+
+        return self.report()
+
+    def report(self):
+        """
+        Summarise the run per seat.
+
+        Returns:
+            list: One dict per seat with its name, rounds, hands, average bet,
+                  edge over initial bets and SD per round in units.
+        """
+        rows = []
+        for index, seat in enumerate(self.table.seats):
+            rounds = self.seat_rounds[index]
+            units = self.total_profit[index] / seat.bet_size
+            sd = 0.0
+            if rounds > 1:
+                mean = units / rounds
+                variance = self.sum_squared_profit[index] / rounds - mean * mean
+                sd = math.sqrt(max(variance, 0.0) * rounds / (rounds - 1))
+            wagered = self.units_wagered[index]
+            rows.append(
+                {
+                    "seat": seat.name,
+                    "rounds": rounds,
+                    "hands": self.hands_played[index],
+                    "average_bet": wagered / rounds if rounds else 0.0,
+                    "player_edge": units / wagered * 100 if wagered else 0.0,
+                    "sd_per_round": sd,
+                }
+            )
+        return rows
+
+    def print_report(self):
+        """Print the per-seat report."""
+        print("\nTable simulation complete!")
+        print(f"{self.rules.describe()}, {len(self.table.seats)} seats")
+        print(f"Rounds dealt: {self.rounds_played}")
+        if self.rules.num_decks is not None:
+            print(f"Shuffles: {self.table.deck.shuffles}")
+        print(f"{'Seat':<12} {'Hands':>9} {'Avg bet':>8} {'Edge %':>8} {'SD':>7}")
+        for row in self.report():
+            print(
+                f"{row['seat']:<12} {row['hands']:>9} {row['average_bet']:>8.2f} "
+                f"{row['player_edge']:>8.3f} {row['sd_per_round']:>7.3f}"
+            )
+
+
+def run_simulation(store_path="simulation_runs.sqlite"):
+    """
+    Run the blackjack simulation with user input.
+
+    Args:
+        store_path (str, optional): SQLite run store the results are saved
+                                    to, or None not to save them. Defaults to
+                                    "simulation_runs.sqlite".
+
+    Returns:
+        float: The house edge.
+    """
     print("Welcome to the Blackjack Simulation!")
     print(
         "This simulation will estimate the house edge by playing many hands using perfect strategy."
@@ -269,7 +1069,9 @@ def run_simulation():
     print("This may take a while for large numbers of hands.")
 
     simulation = Simulation(bet_size)
+    start_time = time.time()
     house_edge = simulation.run(num_hands)
+    duration = time.time() - start_time
 
     print("\nSimulation Results Summary:")
     print(f"House Edge: {house_edge:.4f}%")
@@ -277,8 +1079,139 @@ def run_simulation():
         f"Player's Expected Loss Per ${bet_size:.2f} Bet: ${house_edge * bet_size / 100:.2f}"
     )
 
+    if store_path is not None:
+        # Imported here: the run store builds on this module
+        from run_store import RunStore
+
+        with RunStore(store_path) as store:
+            run_id = store.record(simulation, duration=duration)
+        print(f"Saved as run {run_id} in {store_path}")
+
     return house_edge
 
 
+def simulate_chunk(task):
+    """
+    Simulate one chunk of hands. Runs in a worker process.
+
+    Args:
+        task (tuple): (bet size, rules dict or None for Rules(), strategy or
+                      None for basic strategy, hands, seed).
+
+    Returns:
+        dict: The chunk's additive statistics.
+    """
+    bet_size, rules, strategy, num_hands, seed = task
+    rules = Rules.from_dict(rules) if rules is not None else None
+    simulation = Simulation(bet_size, seed, rules)
+    if strategy is not None:
+        simulation.game.player.strategy = strategy
+    simulation.run(num_hands, display_progress=False)
+    return {name: getattr(simulation, name) for name in ADDITIVE_STATS}
+
+
+def simulate_headless(
+    num_hands, bet_size=100.0, seed=None, workers=1, chunk_hands=250000
+):
+    """
+    Run a simulation without prompts, split into chunks on a process pool.
+
+    Chunks are seeded by the run's seed and their number, so a seeded run
+    gives the same results with any number of workers.
+
+    Args:
+        num_hands (int): Hands to simulate.
+        bet_size (float, optional): The bet size. Defaults to 100.0.
+        seed (int, optional): Seed for a reproducible run. Defaults to None.
+        workers (int, optional): Worker processes; 1 runs inline. Defaults
+                                 to 1.
+        chunk_hands (int, optional): Hands per chunk. Defaults to 250,000.
+
+    Returns:
+        dict: The settings, the additive statistics, the house edge over
+              the amount bet, the edge per initial bet with its 95%
+              confidence half-width, the standard deviation per round and
+              the seconds taken.
+    """
+    start_time = time.time()
+    tasks = [
+        (
+            bet_size,
+            None,
+            None,
+            min(chunk_hands, num_hands - start),
+            None if seed is None else f"{seed}:{chunk}",
+        )
+        for chunk, start in enumerate(range(0, num_hands, chunk_hands))
+    ]
+    totals = dict.fromkeys(ADDITIVE_STATS, 0)
+    for stats in map_tasks(simulate_chunk, tasks, workers):
+        for name in ADDITIVE_STATS:
+            totals[name] += stats[name]
+
+    rounds = totals["rounds_played"]
+    bets = totals["total_bets_placed"]
+    mean, error = mean_interval(
+        rounds, totals["total_profit"] / bet_size, totals["sum_squared_profit"], 1.0
+    )
+    report = {"hands": num_hands, "bet_size": bet_size, "seed": seed}
+    report["workers"] = workers
+    report.update(totals)
+    report["house_edge"] = -totals["total_profit"] / bets * 100 if bets else 0.0
+    report["edge_per_initial_bet"] = -mean * 100
+    report["ci_half_width"] = 1.96 * error * 100
+    report["sd_per_round"] = error * math.sqrt(rounds)
+    report["elapsed_s"] = time.time() - start_time
+    return report
+
+
+def main(argv=None):
+    """
+    Run a simulation from the command line.
+
+    With no arguments the simulation asks for its settings, as from
+    main.py; with --hands it runs headless.
+
+    Args:
+        argv (list, optional): Command-line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: Exit status.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m simulation",
+        description="Estimate the house edge by simulating hands of basic strategy.",
+    )
+    parser.add_argument("--hands", type=int, help="hands to simulate")
+    parser.add_argument("--bet", type=float, default=100.0, help="bet size")
+    parser.add_argument("--seed", type=int, help="seed for a reproducible run")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="worker processes (default 1)"
+    )
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.hands is None:
+        run_simulation()
+        return 0
+    if args.hands <= 0 or args.bet <= 0 or args.workers <= 0:
+        parser.error("--hands, --bet and --workers must be positive")
+
+    report = simulate_headless(args.hands, args.bet, args.seed, args.workers)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Hands played: {report['hands_played']}")
+        print(f"Total bets placed: ${report['total_bets_placed']:.2f}")
+        print(f"Total profit/loss: ${report['total_profit']:.2f}")
+        print(f"House edge: {report['house_edge']:.4f}%")
+        print(
+            f"Per initial bet: {report['edge_per_initial_bet']:.4f}% "
+            f"+/- {report['ci_half_width']:.4f}%"
+        )
+        print(f"Time: {report['elapsed_s']:.1f}s")
+    return 0
+
+
 if __name__ == "__main__":
-    run_simulation()
+    sys.exit(main())
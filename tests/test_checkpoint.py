@@ -0,0 +1,66 @@
+import signal
+import numpy as np
+import pytest
+from game.rules import Rules
+from simulation import Simulation
+
+HANDS = 3000
+
+
+class _InterruptAt:
+    """Metrics stand-in that sends the process SIGINT once a hand is reached."""
+
+    def __init__(self, hand):
+        self.hand = hand
+
+    def update(self, hands_done, *args):
+        if hands_done >= self.hand:
+            self.hand = float("inf")
+            signal.raise_signal(signal.SIGINT)
+
+
+def _summary(simulation):
+    return (
+        simulation.rounds_played,
+        simulation.total_profit,
+        simulation.total_bets_placed,
+        simulation.sum_squared_profit,
+    )
+
+
+def _counts(counters):
+    return [
+        counters.decisions,
+        counters.dealer_totals,
+        counters.hand_rounds,
+        counters.hand_profit,
+        counters.hand_squared,
+    ]
+
+
+@pytest.mark.parametrize("rules", [Rules(), Rules(num_decks=6)], ids=["inf", "6D"])
+def test_resumed_run_matches_an_uninterrupted_one(tmp_path, rules):
+    whole = Simulation(1.0, seed=3, rules=rules)
+    whole.run(HANDS, display_progress=False, counters=True)
+
+    path = str(tmp_path / "run.ckpt")
+    first = Simulation(1.0, seed=3, rules=rules)
+    with pytest.raises(KeyboardInterrupt):
+        first.run(
+            HANDS,
+            display_progress=False,
+            counters=True,
+            checkpoint=path,
+            metrics=_InterruptAt(1000),
+        )
+    assert first.rounds_played < HANDS
+
+    resumed = Simulation(1.0, seed=99, rules=rules)
+    resumed.run(
+        HANDS, display_progress=False, counters=True, checkpoint=path, resume=True
+    )
+    assert _summary(resumed) == _summary(whole)
+    for resumed_counts, whole_counts in zip(
+        _counts(resumed.counters), _counts(whole.counters)
+    ):
+        assert np.array_equal(resumed_counts, whole_counts)
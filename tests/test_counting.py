@@ -0,0 +1,24 @@
+import random
+import pytest
+from game.counting import HI_LO, KO, SYSTEMS, Counter
+from game.shoe import Shoe
+
+
+@pytest.mark.parametrize("num_decks", [1, 2, 6, 8])
+def test_ko_starts_at_four_minus_four_per_deck(num_decks):
+    assert KO.initial_running_count(num_decks) == 4 - 4 * num_decks
+
+
+@pytest.mark.parametrize("system", list(SYSTEMS.values()), ids=list(SYSTEMS))
+@pytest.mark.parametrize("num_decks", [1, 6])
+def test_counting_a_full_shoe_ends_at_the_pivot(system, num_decks):
+    counter = Counter(system)
+    shoe = Shoe(num_decks, rng=random.Random(1), counter=counter)
+    for _ in range(len(shoe.cards)):
+        shoe.deal_card()
+    assert counter.running_count == pytest.approx(system.pivot)
+
+
+def test_balanced_systems_start_at_zero():
+    assert HI_LO.balanced
+    assert HI_LO.initial_running_count(6) == 0
@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+import pytest
+from game.counting import HI_LO, KO, Counter
+from game.indices import IndexEntry, IndexStrategy, IndexTable
+from result_cache import ADDITIVE_STATS, ResultCache, strategy_hash
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HASH_INDEX_STRATEGY = """
+from game.counting import HI_LO, Counter
+from game.indices import IndexEntry, IndexStrategy, IndexTable
+from result_cache import strategy_hash
+table = IndexTable()
+table.add(("hard", 16), 10, IndexEntry(0, "stand", "hit"))
+print(strategy_hash(IndexStrategy(table, Counter(HI_LO))))
+"""
+
+
+def _index_strategy(system=HI_LO, index=0):
+    table = IndexTable()
+    table.add(("hard", 16), 10, IndexEntry(index, "stand", "hit"))
+    return IndexStrategy(table, Counter(system))
+
+
+def test_index_strategy_hash_is_the_same_in_every_process():
+    digests = {
+        subprocess.run(
+            [sys.executable, "-c", HASH_INDEX_STRATEGY],
+            cwd=ROOT,
+            env=dict(os.environ, PYTHONHASHSEED=str(seed)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        for seed in (1, 2)
+    }
+    assert digests == {strategy_hash(_index_strategy())}
+
+
+def test_index_strategy_hash_follows_the_table_and_system():
+    digest = strategy_hash(_index_strategy())
+    assert strategy_hash(_index_strategy()) == digest
+    assert strategy_hash(_index_strategy(index=1)) != digest
+    assert strategy_hash(_index_strategy(system=KO)) != digest
+
+
+def test_running_count_does_not_change_the_hash():
+    strategy = _index_strategy()
+    digest = strategy_hash(strategy)
+    strategy.counter.running_count = 7
+    assert strategy_hash(strategy) == digest
+
+
+def test_objects_without_a_description_are_refused():
+    strategy = _index_strategy()
+    strategy.extra = object()
+    with pytest.raises(TypeError):
+        strategy_hash(strategy)
+
+
+def test_top_up_matches_a_fresh_run(tmp_path):
+    cache = ResultCache(str(tmp_path / "topped"))
+    assert cache.run(2000, seed=4)["source"] == "simulated"
+    topped = cache.run(5000, seed=4)
+    fresh = ResultCache(str(tmp_path / "fresh")).run(5000, seed=4)
+    assert topped["source"] == "top_up"
+    assert fresh["source"] == "simulated"
+    for name in ADDITIVE_STATS:
+        assert topped[name] == pytest.approx(fresh[name])
+    assert cache.run(5000, seed=4)["source"] == "cache"
@@ -0,0 +1,23 @@
+import pytest
+from game.rules import Rules
+from round_log import RoundLog, RoundRecorder
+from simulation import Simulation
+
+HANDS = 5000
+
+
+@pytest.mark.parametrize(
+    "rules",
+    [Rules(), Rules(num_decks=2, late_surrender=True, dealer_peek=False)],
+    ids=["default", "2D LS ENHC"],
+)
+def test_logged_results_add_up_to_the_total_profit(tmp_path, rules):
+    simulation = Simulation(2.0, seed=11, rules=rules)
+    with RoundRecorder(str(tmp_path), capacity=HANDS, rules=rules) as recorder:
+        simulation.run(HANDS, display_progress=False, recorder=recorder)
+
+    log = RoundLog(str(tmp_path))
+    assert len(log) == simulation.rounds_played == HANDS
+    assert log.profit().sum() * simulation.bet_size == pytest.approx(
+        simulation.total_profit
+    )
@@ -0,0 +1,20 @@
+import pytest
+from game.rules import Rules
+from vector_env import BasicStrategyPolicy, evaluate_policy
+
+# Rules the exact engine models exactly: no resplits, one card to split aces
+EXACT = dict(max_split_hands=2, hit_split_aces=False)
+
+
+@pytest.mark.parametrize(
+    "rules",
+    [
+        Rules(**EXACT),
+        Rules(hit_soft_17=False, **EXACT),
+        Rules(dealer_peek=False, **EXACT),
+    ],
+    ids=["H17", "S17", "ENHC"],
+)
+def test_basic_strategy_matches_the_exact_expectation(rules):
+    result = evaluate_policy(BasicStrategyPolicy(), rounds=500000, rules=rules)
+    assert abs(result["z_score"]) < 4
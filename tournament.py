@@ -0,0 +1,370 @@
+import math
+import random
+from game.rules import Rules
+from game.strategy import Strategy
+from game.table import Table
+from parallel import map_tasks, split_evenly
+
+
+class TournamentFormat:
+    """
+    Describes an elimination tournament table.
+
+    Every player starts with the same chips and plays a fixed number of
+    hands; the players with the most chips at the end advance.
+
+    Attributes:
+        players (int): Players at the table.
+        hands (int): Hands dealt.
+        advance (int): Players who advance.
+        starting_chips (float): Chips each player starts with.
+        min_bet (float): Smallest bet.
+        max_bet (float): Largest bet.
+        rules (Rules): The table rules.
+    """
+
+    def __init__(
+        self,
+        players=6,
+        hands=30,
+        advance=2,
+        starting_chips=1000.0,
+        min_bet=10.0,
+        max_bet=500.0,
+        rules=None,
+    ):
+        """
+        Initialize a tournament format.
+
+        Args:
+            players (int, optional): Players at the table. Defaults to 6.
+            hands (int, optional): Hands dealt. Defaults to 30.
+            advance (int, optional): Players who advance. Defaults to 2.
+            starting_chips (float, optional): Starting chips. Defaults to 1000.
+            min_bet (float, optional): Smallest bet. Defaults to 10.
+            max_bet (float, optional): Largest bet. Defaults to 500.
+            rules (Rules, optional): The table rules. Defaults to Rules().
+        """
+        if not 1 <= players <= Table.MAX_SEATS:
+            raise ValueError(f"A table seats between 1 and {Table.MAX_SEATS} players.")
+        if not 1 <= advance <= players:
+            raise ValueError("Between one and every player can advance.")
+        if not 0 < min_bet <= max_bet:
+            raise ValueError("Need 0 < min_bet <= max_bet.")
+        self.players = players
+        self.hands = hands
+        self.advance = advance
+        self.starting_chips = starting_chips
+        self.min_bet = min_bet
+        self.max_bet = max_bet
+        self.rules = rules if rules is not None else Rules()
+
+
+class TournamentPolicy:
+    """
+    How a tournament player bets and plays.
+
+    The base policy flat bets the minimum with basic strategy. Subclasses
+    override `bet` (and `play_strategy` to change the playing decisions)
+    using the chip standings, since in a tournament only the final ranking
+    matters, not the expected chips.
+
+    Attributes:
+        name (str): Label for reports.
+        strategy (Strategy): Playing strategy, or None for basic strategy.
+    """
+
+    name = "Flat minimum"
+
+    def __init__(self, strategy=None, name=None):
+        """
+        Initialize a policy.
+
+        Args:
+            strategy (Strategy, optional): Playing strategy. Defaults to basic
+                                           strategy.
+            name (str, optional): Label for reports. Defaults to the class's name.
+        """
+        self.strategy = strategy
+        if name is not None:
+            self.name = name
+
+    def bet(self, chips, others, hands_left, tournament):
+        """
+        Size the next bet.
+
+        Args:
+            chips (float): The player's chips.
+            others (list): Every other player's chips.
+            hands_left (int): Hands left including this one.
+            tournament (TournamentFormat): The format.
+
+        Returns:
+            float: The bet; clamped to the table limits and the chips.
+        """
+        return tournament.min_bet
+
+    def play_strategy(self, chips, others, hands_left, tournament):
+        """
+        Choose the playing strategy for the next hand.
+
+        Args:
+            chips (float): The player's chips.
+            others (list): Every other player's chips.
+            hands_left (int): Hands left including this one.
+            tournament (TournamentFormat): The format.
+
+        Returns:
+            Strategy: The strategy, or None for basic strategy.
+        """
+        return self.strategy
+
+
+class MaxBetPolicy(TournamentPolicy):
+    """Bets the table maximum every hand."""
+
+    name = "Max bet"
+
+    def bet(self, chips, others, hands_left, tournament):
+        """Bet the maximum."""
+        return tournament.max_bet
+
+
+class ProportionalPolicy(TournamentPolicy):
+    """Bets a fixed share of the player's chips."""
+
+    name = "Proportional"
+
+    def __init__(self, fraction=0.1, strategy=None, name=None):
+        """
+        Initialize the policy.
+
+        Args:
+            fraction (float, optional): Share of the chips to bet. Defaults to 0.1.
+            strategy (Strategy, optional): Playing strategy. Defaults to basic
+                                           strategy.
+            name (str, optional): Label for reports. Defaults to
+                                  "Proportional <fraction>".
+        """
+        super().__init__(strategy, name or f"Proportional {fraction:g}")
+        self.fraction = fraction
+
+    def bet(self, chips, others, hands_left, tournament):
+        """Bet the share of the chips."""
+        return chips * self.fraction
+
+
+class CatchUpPolicy(TournamentPolicy):
+    """
+    Bets the minimum until the last few hands, then bets to reach the
+    advancing places when outside them and protects a lead when inside.
+    """
+
+    name = "Catch-up"
+
+    def __init__(self, final_hands=5, strategy=None, name=None):
+        """
+        Initialize the policy.
+
+        Args:
+            final_hands (int, optional): Hands at the end played on the
+                                         standings. Defaults to 5.
+            strategy (Strategy, optional): Playing strategy. Defaults to basic
+                                           strategy.
+            name (str, optional): Label for reports. Defaults to "Catch-up".
+        """
+        super().__init__(strategy, name)
+        self.final_hands = final_hands
+
+    def bet(self, chips, others, hands_left, tournament):
+        """Bet on the distance to the last advancing place."""
+        if hands_left > self.final_hands:
+            return tournament.min_bet
+        # The chips of the last player who would advance if it ended now
+        ahead = sorted(others, reverse=True)
+        cutoff = (
+            ahead[tournament.advance - 1] if len(ahead) >= tournament.advance else 0
+        )
+        if chips > cutoff:
+            # Already through: bet small so a loss cannot drop below the line
+            return tournament.min_bet
+        deficit = cutoff - chips + tournament.min_bet
+        if hands_left == 1:
+            # Last chance: a win has to be enough to pass the cutoff
+            return deficit
+        # Win the deficit back if half of the remaining hands are won
+        return deficit * 2 / hands_left
+
+
+def play_tournaments(policies, tournament=None, count=100, seed=None):
+    """
+    Play a batch of tournaments at one table.
+
+    Policies are reseated at random every tournament so no policy keeps the
+    first or last seat.
+
+    Args:
+        policies (list): A TournamentPolicy per seat.
+        tournament (TournamentFormat, optional): The format. Defaults to
+                                                 TournamentFormat() with one
+                                                 player per policy.
+        count (int, optional): Tournaments to play. Defaults to 100.
+        seed (int or str, optional): Seed for a reproducible batch.
+
+    Returns:
+        list: Per policy, [entries, advanced, busted, sum of final chips,
+              sum of squared final chips].
+    """
+    if tournament is None:
+        tournament = TournamentFormat(players=len(policies))
+    if len(policies) != tournament.players:
+        raise ValueError("Need one policy per player.")
+
+    rng = random.Random(seed)
+    rules = tournament.rules
+    table = Table(tournament.players, rules, rules.create_deck(rng))
+    basic = Strategy()
+    totals = [[0, 0, 0, 0.0, 0.0] for _ in policies]
+    order = list(range(len(policies)))
+
+    for _ in range(count):
+        rng.shuffle(order)
+        if rules.num_decks is not None:
+            table.deck.shuffle()
+        for seat in table.seats:
+            seat.player.balance = tournament.starting_chips
+
+        for hands_left in range(tournament.hands, 0, -1):
+            chips = [seat.player.balance for seat in table.seats]
+            for index, seat in enumerate(table.seats):
+                policy = policies[order[index]]
+                others = chips[:index] + chips[index + 1 :]
+                stake = policy.bet(chips[index], others, hands_left, tournament)
+                stake = min(max(stake, tournament.min_bet), tournament.max_bet)
+                # Short players go all in; below the minimum the bet cannot be
+                # placed and the player sits out
+                if stake > chips[index] >= tournament.min_bet:
+                    stake = chips[index]
+                seat.bet_size = stake
+                strategy = policy.play_strategy(
+                    chips[index], others, hands_left, tournament
+                )
+                seat.player.strategy = strategy if strategy is not None else basic
+            table.play_round()
+
+        # Rank on final chips, breaking ties at random
+        finals = [seat.player.balance for seat in table.seats]
+        ranking = sorted(
+            range(len(finals)), key=lambda i: (finals[i], rng.random()), reverse=True
+        )
+        advanced = set(ranking[: tournament.advance])
+        for index, final in enumerate(finals):
+            row = totals[order[index]]
+            row[0] += 1
+            row[1] += index in advanced
+            row[2] += final < tournament.min_bet
+            row[3] += final
+            row[4] += final * final
+    return totals
+
+
+def _run_batch(task):
+    """
+    Play one batch of tournaments. Runs in a worker process.
+
+    Args:
+        task (tuple): (policies, tournament, count, seed).
+
+    Returns:
+        list: The batch totals from `play_tournaments`.
+    """
+    policies, tournament, count, seed = task
+    return play_tournaments(policies, tournament, count, seed)
+
+
+def run_tournaments(
+    policies, tournament=None, tournaments=1000, batches=8, workers=None, seed=0
+):
+    """
+    Estimate each policy's chance to advance on a process pool.
+
+    Args:
+        policies (list): A TournamentPolicy per seat.
+        tournament (TournamentFormat, optional): The format. Defaults to
+                                                 TournamentFormat() with one
+                                                 player per policy.
+        tournaments (int, optional): Tournaments to play. Defaults to 1000.
+        batches (int, optional): Batches to split them into. Defaults to 8.
+        workers (int, optional): Worker processes; 1 runs inline. Defaults to
+                                 the number of CPUs.
+        seed (int, optional): Base seed. Defaults to 0.
+
+    Returns:
+        list: One row per policy with the entries, the probability of
+              advancing and its standard error, the probability of busting
+              and the mean and standard deviation of the final chips.
+    """
+    if tournament is None:
+        tournament = TournamentFormat(players=len(policies))
+    tasks = [
+        (policies, tournament, count, f"{seed}:{batch}")
+        for batch, count in enumerate(split_evenly(tournaments, batches))
+    ]
+
+    totals = [[0, 0, 0, 0.0, 0.0] for _ in policies]
+    for batch in map_tasks(_run_batch, tasks, workers):
+        for row, values in zip(totals, batch):
+            for i, value in enumerate(values):
+                row[i] += value
+
+    rows = []
+    for policy, (entries, advanced, busted, chips, squared) in zip(policies, totals):
+        probability = advanced / entries
+        mean = chips / entries
+        rows.append(
+            {
+                "policy": policy.name,
+                "entries": entries,
+                "advance": probability,
+                "advance_se": math.sqrt(probability * (1 - probability) / entries),
+                "bust": busted / entries,
+                "mean_chips": mean,
+                "sd_chips": math.sqrt(max(squared / entries - mean * mean, 0.0)),
+            }
+        )
+    return rows
+
+
+def format_tournament_table(rows):
+    """
+    Format tournament results as a text table.
+
+    Args:
+        rows (list): Output of `run_tournaments`.
+
+    Returns:
+        str: The formatted table, one policy per line.
+    """
+    lines = [
+        f"{'Policy':<20} {'Entries':>8} {'Advance':>8} {'SE':>7} "
+        f"{'Bust':>7} {'Chips':>9} {'SD':>8}"
+    ]
+    for row in rows:
+        lines.append(
+            f"{row['policy']:<20} {row['entries']:>8} {row['advance']:>8.2%} "
+            f"{row['advance_se']:>7.2%} {row['bust']:>7.2%} "
+            f"{row['mean_chips']:>9.1f} {row['sd_chips']:>8.1f}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    field = [
+        TournamentPolicy(),
+        TournamentPolicy(name="Flat minimum 2"),
+        MaxBetPolicy(),
+        ProportionalPolicy(0.1),
+        ProportionalPolicy(0.25),
+        CatchUpPolicy(),
+    ]
+    print(format_tournament_table(run_tournaments(field, tournaments=2000)))
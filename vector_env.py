@@ -0,0 +1,561 @@
+import math
+import numpy as np
+from analysis.exact import ExactEngine
+from game.card import Card
+from game.rules import Rules
+from game.strategy import Strategy
+
+# Action codes, in action-mask order
+STAND, HIT, DOUBLE, SPLIT, SURRENDER = range(5)
+ACTIONS = [
+    Strategy.STAND,
+    Strategy.HIT,
+    Strategy.DOUBLE,
+    Strategy.SPLIT,
+    Strategy.SURRENDER,
+]
+
+# Cards are dealt as rank indices into Card.RANKS
+ACE = Card.RANKS.index("A")
+RANK_VALUES = np.array([Card(rank).value for rank in Card.RANKS])
+# Aces count 1 in a hand's hard total
+HARD_VALUES = np.where(RANK_VALUES == 11, 1, RANK_VALUES)
+
+
+def _totals(hard, has_ace):
+    """
+    Get the best total and softness of hands from their hard totals.
+
+    Args:
+        hard (numpy.ndarray): Totals counting every ace as 1.
+        has_ace (numpy.ndarray): Whether each hand holds an ace.
+
+    Returns:
+        tuple: (totals, soft flags).
+    """
+    soft = has_ace & (hard + 10 <= 21)
+    return hard + 10 * soft, soft
+
+
+class VectorBlackjackEnv:
+    """
+    Many blackjack tables played in lockstep on NumPy arrays.
+
+    Every environment plays one round per episode from an infinite deck
+    under the given rules. Observations describe each environment's current
+    hand, `step` applies one action per environment, and environments whose
+    round ends are dealt a new round straight away (the observation returned
+    for them is the new round's).
+
+    Splits follow Game: a pair moves into the next free hand (up to
+    max_split_hands), each split hand draws its second card when its turn
+    comes, and split aces take one card unless the rules allow hitting them.
+    A round decided on the deal (a natural) offers only STAND, which settles
+    it. Hands that reach 21 stand automatically.
+
+    Attributes:
+        rules (Rules): The table rules. Only an infinite deck is modelled.
+        rng (numpy.random.Generator): Random generator the cards come from.
+        n_envs (int): Number of environments.
+    """
+
+    def __init__(self, rules=None, seed=None):
+        """
+        Initialize the environment.
+
+        Args:
+            rules (Rules, optional): The table rules. Defaults to Rules().
+            seed (int, optional): Seed for a reproducible run. Defaults to None.
+        """
+        self.rules = rules if rules is not None else Rules()
+        self.rng = np.random.default_rng(seed)
+        self.n_envs = 0
+        totals = Rules.DOUBLE_OPTIONS[self.rules.double_on]
+        self._double_totals = None if totals is None else np.array(totals)
+
+    def reset(self, n_envs):
+        """
+        Deal a new round in every environment.
+
+        Args:
+            n_envs (int): Number of environments.
+
+        Returns:
+            dict: The observations (see `observe`).
+        """
+        n, h = n_envs, self.rules.max_split_hands
+        self.n_envs = n
+        self.hard = np.zeros((n, h), dtype=np.int16)
+        self.has_ace = np.zeros((n, h), dtype=bool)
+        self.cards = np.zeros((n, h), dtype=np.int8)
+        self.first = np.zeros((n, h), dtype=np.int8)
+        self.last = np.zeros((n, h), dtype=np.int8)
+        self.stake = np.zeros((n, h))
+        self.hands = np.zeros(n, dtype=np.intp)
+        self.current = np.zeros(n, dtype=np.intp)
+        self.upcard = np.zeros(n, dtype=np.int8)
+        self.hole = np.zeros(n, dtype=np.int8)
+        self.dealer_blackjack = np.zeros(n, dtype=bool)
+        self.decided = np.zeros(n, dtype=bool)
+        self.deal_reward = np.zeros(n)
+        self._deal(np.arange(n))
+        return self.observe()
+
+    def _draw(self, size):
+        """Draw card ranks from the infinite deck."""
+        return self.rng.integers(0, len(Card.RANKS), size)
+
+    def _deal(self, envs):
+        """
+        Start a new round in some environments.
+
+        Args:
+            envs (numpy.ndarray): Indices of the environments.
+        """
+        first, second, upcard, hole = self._draw((4, len(envs)))
+        self.hard[envs] = 0
+        self.has_ace[envs] = False
+        self.cards[envs] = 0
+        self.stake[envs] = 0.0
+        self.hands[envs] = 1
+        self.current[envs] = 0
+
+        self.first[envs, 0] = first
+        self.last[envs, 0] = second
+        self.cards[envs, 0] = 2
+        self.hard[envs, 0] = HARD_VALUES[first] + HARD_VALUES[second]
+        self.has_ace[envs, 0] = (first == ACE) | (second == ACE)
+        self.stake[envs, 0] = 1.0
+        self.upcard[envs] = upcard
+        self.hole[envs] = hole
+
+        natural = RANK_VALUES[first] + RANK_VALUES[second] == 21
+        dealer_natural = RANK_VALUES[upcard] + RANK_VALUES[hole] == 21
+        self.dealer_blackjack[envs] = dealer_natural
+        self.decided[envs] = natural | (dealer_natural & self.rules.dealer_peek)
+        self.deal_reward[envs] = np.where(
+            natural, np.where(dealer_natural, 0.0, self.rules.blackjack_payout), -1.0
+        )
+
+    def _hand_state(self, envs, hands):
+        """
+        Describe one hand in each of some environments.
+
+        Args:
+            envs (numpy.ndarray): Environment indices.
+            hands (numpy.ndarray): The hand in each environment.
+
+        Returns:
+            tuple: (totals, soft flags, whether each hand is a two-card pair,
+                    whether each hand is a split ace that may not draw,
+                    whether each hand may still split).
+        """
+        total, soft = _totals(self.hard[envs, hands], self.has_ace[envs, hands])
+        first = self.first[envs, hands]
+        split = self.hands[envs] > 1
+        pair = (self.cards[envs, hands] == 2) & (first == self.last[envs, hands])
+        locked = split & (first == ACE) & (not self.rules.hit_split_aces)
+        can_split = pair & (self.hands[envs] < self.rules.max_split_hands)
+        if not self.rules.resplit_aces:
+            can_split &= ~(split & (first == ACE))
+        return total, soft, pair, locked, can_split
+
+    def action_mask(self):
+        """
+        Get the legal actions of every environment's current hand.
+
+        Returns:
+            numpy.ndarray: Booleans of shape (n_envs, 5), in action-code order.
+        """
+        envs = np.arange(self.n_envs)
+        hands = np.minimum(self.current, self.rules.max_split_hands - 1)
+        total, soft, _, locked, can_split = self._hand_state(envs, hands)
+        two_cards = self.cards[envs, hands] == 2
+        split_hand = self.hands > 1
+        playing = ~self.decided
+
+        mask = np.zeros((self.n_envs, 5), dtype=bool)
+        mask[:, STAND] = True
+        mask[:, HIT] = playing & (total < 21) & ~locked
+        double = playing & two_cards & (total < 21) & ~locked
+        if not self.rules.double_after_split:
+            double &= ~split_hand
+        if self._double_totals is not None:
+            double &= ~soft & np.isin(total, self._double_totals)
+        mask[:, DOUBLE] = double
+        mask[:, SPLIT] = playing & can_split
+        if self.rules.late_surrender:
+            mask[:, SURRENDER] = playing & ~split_hand & two_cards
+        return mask
+
+    def observe(self):
+        """
+        Get every environment's observation.
+
+        Returns:
+            dict: Arrays of shape (n_envs,): "total" (the current hand's best
+                  total), "soft", "pair" (the paired card's value, or 0),
+                  "upcard" (the dealer's upcard value, ace = 11), plus
+                  "action_mask" of shape (n_envs, 5).
+        """
+        envs = np.arange(self.n_envs)
+        hands = np.minimum(self.current, self.rules.max_split_hands - 1)
+        total, soft, pair, _, _ = self._hand_state(envs, hands)
+        return {
+            "total": total.astype(np.int8),
+            "soft": soft,
+            "pair": np.where(pair, RANK_VALUES[self.first[envs, hands]], 0).astype(
+                np.int8
+            ),
+            "upcard": RANK_VALUES[self.upcard].astype(np.int8),
+            "action_mask": self.action_mask(),
+        }
+
+    def _add_card(self, envs, hands):
+        """Deal one card to a hand in each of some environments."""
+        ranks = self._draw(len(envs))
+        self.hard[envs, hands] += HARD_VALUES[ranks]
+        self.has_ace[envs, hands] |= ranks == ACE
+        self.last[envs, hands] = ranks
+        self.cards[envs, hands] += 1
+
+    def _needs_decision(self, envs):
+        """
+        Check whether each environment's current hand still has a choice.
+
+        Args:
+            envs (numpy.ndarray): Environment indices.
+
+        Returns:
+            numpy.ndarray: False where the hand must stand (21, or split aces
+                           that may neither draw nor resplit).
+        """
+        total, _, _, locked, can_split = self._hand_state(envs, self.current[envs])
+        return (total < 21) & (~locked | can_split)
+
+    def step(self, actions):
+        """
+        Apply one action in every environment.
+
+        Args:
+            actions (array-like): An action code per environment; each must
+                                  be legal under `action_mask`.
+
+        Returns:
+            tuple: (observations, rewards, dones, info). Rewards are the net
+                   result in units of the initial bet of rounds that ended
+                   this step (0 elsewhere); info["wagered"] holds the total
+                   staked on each of those rounds.
+        """
+        actions = np.asarray(actions, dtype=np.intp)
+        envs = np.arange(self.n_envs)
+        legal = self.action_mask()[envs, actions]
+        if not legal.all():
+            raise ValueError(
+                f"{int((~legal).sum())} illegal action(s); check action_mask."
+            )
+
+        rewards = np.zeros(self.n_envs)
+        dones = self.decided.copy()
+        rewards[dones] = self.deal_reward[dones]
+        wagered = np.where(dones, 1.0, 0.0)
+
+        surrender = ~self.decided & (actions == SURRENDER)
+        dones |= surrender
+        rewards[surrender] = np.where(self.dealer_blackjack[surrender], -1.0, -0.5)
+        wagered[surrender] = 1.0
+
+        playing = ~dones
+        advance = playing & ((actions == STAND) | (actions == DOUBLE))
+
+        double = np.flatnonzero(playing & (actions == DOUBLE))
+        self.stake[double, self.current[double]] *= 2.0
+        self._add_card(double, self.current[double])
+
+        hit = np.flatnonzero(playing & (actions == HIT))
+        self._add_card(hit, self.current[hit])
+
+        split = np.flatnonzero(playing & (actions == SPLIT))
+        if len(split):
+            hand = self.current[split]
+            new = self.hands[split]
+            rank = self.first[split, hand]
+            # The second card moves to the next free hand with its own stake
+            self.first[split, new] = rank
+            self.last[split, new] = rank
+            self.cards[split, new] = 1
+            self.hard[split, new] = HARD_VALUES[rank]
+            self.has_ace[split, new] = rank == ACE
+            self.stake[split, new] = self.stake[split, hand]
+            self.hands[split] += 1
+            self.last[split, hand] = rank
+            self.cards[split, hand] = 1
+            self.hard[split, hand] = HARD_VALUES[rank]
+            self._add_card(split, hand)
+
+        moved = np.flatnonzero(playing & ~advance)
+        advance[moved[~self._needs_decision(moved)]] = True
+
+        # Move on to the next hand until one needs a decision or all are played
+        finished = np.zeros(self.n_envs, dtype=bool)
+        pending = np.flatnonzero(advance)
+        while len(pending):
+            self.current[pending] += 1
+            over = self.current[pending] >= self.hands[pending]
+            finished[pending[over]] = True
+            pending = pending[~over]
+            hand = self.current[pending]
+            # A split hand draws its second card when its turn comes
+            single = self.cards[pending, hand] == 1
+            self._add_card(pending[single], hand[single])
+            pending = pending[~self._needs_decision(pending)]
+
+        settled = np.flatnonzero(finished)
+        if len(settled):
+            rewards[settled], wagered[settled] = self._settle(settled)
+            dones[settled] = True
+
+        info = {"wagered": wagered}
+        restart = np.flatnonzero(dones)
+        if len(restart):
+            self._deal(restart)
+        return self.observe(), rewards, dones, info
+
+    def _settle(self, envs):
+        """
+        Play the dealer's hand and settle every player hand.
+
+        Args:
+            envs (numpy.ndarray): Environments whose player hands are all played.
+
+        Returns:
+            tuple: (net result, total staked) per environment.
+        """
+        columns = np.arange(self.rules.max_split_hands)
+        in_play = columns[None, :] < self.hands[envs, None]
+        player, _ = _totals(self.hard[envs], self.has_ace[envs])
+        stake = self.stake[envs] * in_play
+
+        upcard, hole = self.upcard[envs], self.hole[envs]
+        dealer_hard = HARD_VALUES[upcard] + HARD_VALUES[hole]
+        dealer_ace = (upcard == ACE) | (hole == ACE)
+        # The dealer only draws when some player hand is still live
+        drawing = np.flatnonzero(((player <= 21) & in_play).any(axis=1))
+        while len(drawing):
+            total, soft = _totals(dealer_hard[drawing], dealer_ace[drawing])
+            hits = (total < 17) | ((total == 17) & soft & bool(self.rules.hit_soft_17))
+            drawing = drawing[hits]
+            ranks = self._draw(len(drawing))
+            dealer_hard[drawing] += HARD_VALUES[ranks]
+            dealer_ace[drawing] |= ranks == ACE
+        dealer, _ = _totals(dealer_hard, dealer_ace)
+        dealer = dealer[:, None]
+
+        outcome = np.where(
+            player > 21,
+            -1.0,
+            np.where(
+                self.dealer_blackjack[envs, None],
+                -1.0,
+                np.where(dealer > 21, 1.0, np.sign(player - dealer)),
+            ),
+        )
+        return (outcome * stake).sum(axis=1), stake.sum(axis=1)
+
+
+class BasicStrategyPolicy:
+    """
+    The Strategy tables as a vectorized policy for VectorBlackjackEnv.
+
+    Plays like Game: a pair that cannot be split is played by its total, a
+    double that is not allowed becomes a hit (a stand on soft 18 and above),
+    and late surrender follows the strategy's surrender table.
+
+    Attributes:
+        hard (numpy.ndarray): Action code by hard total and upcard value.
+        soft (numpy.ndarray): Action code by soft total and upcard value.
+        pairs (numpy.ndarray): Action code by paired value and upcard value.
+        surrender_hard (numpy.ndarray): Surrender flags by hard total and upcard.
+        surrender_pairs (numpy.ndarray): Surrender flags by paired value and upcard.
+    """
+
+    def __init__(self, strategy=None):
+        """
+        Build the lookup tables.
+
+        Args:
+            strategy (Strategy, optional): The strategy to play. Defaults to
+                                           basic strategy.
+        """
+        strategy = strategy if strategy is not None else Strategy()
+        codes = {action: code for code, action in enumerate(ACTIONS)}
+        self.hard = np.full((32, 12), HIT, dtype=np.intp)
+        self.soft = np.full((32, 12), HIT, dtype=np.intp)
+        self.pairs = np.full((12, 12), HIT, dtype=np.intp)
+        self.surrender_hard = np.zeros((32, 12), dtype=bool)
+        self.surrender_pairs = np.zeros((12, 12), dtype=bool)
+
+        for up in range(2, 12):
+            dealer = "A" if up == 11 else up
+            for total in range(4, 22):
+                self.hard[total, up] = codes[strategy.lookup(("hard", total), dealer)]
+                self.soft[total, up] = codes[strategy.lookup(("soft", total), dealer)]
+            for value in range(2, 12):
+                rank = "A" if value == 11 else str(value)
+                self.pairs[value, up] = codes[strategy.lookup(("pair", rank), dealer)]
+            for (hand_class, key), upcards in strategy.surrender_strategy.items():
+                if dealer not in upcards:
+                    continue
+                if hand_class == "pair":
+                    self.surrender_pairs[11 if key == "A" else int(key), up] = True
+                else:
+                    self.surrender_hard[key, up] = True
+
+    def __call__(self, observations):
+        """
+        Choose an action in every environment.
+
+        Args:
+            observations (dict): Observations from VectorBlackjackEnv.
+
+        Returns:
+            numpy.ndarray: An action code per environment.
+        """
+        total = observations["total"].astype(np.intp)
+        soft = observations["soft"]
+        pair = observations["pair"].astype(np.intp)
+        up = observations["upcard"].astype(np.intp)
+        mask = observations["action_mask"]
+
+        by_total = np.where(soft, self.soft[total, up], self.hard[total, up])
+        action = np.where(pair > 0, self.pairs[pair, up], by_total)
+        action = np.where((action == SPLIT) & ~mask[:, SPLIT], by_total, action)
+        action = np.where(
+            (action == DOUBLE) & ~mask[:, DOUBLE],
+            np.where(soft & (total >= 18), STAND, HIT),
+            action,
+        )
+        surrender = np.where(
+            pair > 0,
+            self.surrender_pairs[pair, up],
+            ~soft & self.surrender_hard[total, up],
+        )
+        action = np.where(surrender & mask[:, SURRENDER], SURRENDER, action)
+        # Anything else the hand cannot do (a natural, a locked split ace) stands
+        legal = mask[np.arange(len(action)), action]
+        return np.where(legal, action, STAND)
+
+
+def exact_basic_strategy_ev(rules=None):
+    """
+    Get the exact expectation of basic strategy from the exact engine.
+
+    The engine does not resplit, gives split aces one card and has no
+    surrender, so the reference matches the environment exactly under
+    Rules(max_split_hands=2, hit_split_aces=False) and approximately otherwise.
+
+    Args:
+        rules (Rules, optional): The table rules. Defaults to Rules().
+
+    Returns:
+        float: Expected result per round in units of the initial bet.
+    """
+    rules = rules if rules is not None else Rules()
+    engine = ExactEngine(
+        hit_soft_17=rules.hit_soft_17,
+        blackjack_payout=rules.blackjack_payout,
+        double_after_split=rules.double_after_split,
+        dealer_peek=rules.dealer_peek,
+        strategy=Strategy(),
+    )
+    return engine.round_ev()
+
+
+def play_rounds(env, policy, per_env, n_envs=4096):
+    """
+    Deal fresh rounds in every environment and play a fixed number in each.
+
+    Every environment counts the same number of rounds: stopping at a total
+    would drop the rounds still in play, which are the longer ones, and bias
+    the mean towards quick busts. Rounds still in play at the end are dropped
+    by the next `reset`.
+
+    Args:
+        env (VectorBlackjackEnv): The environment, which is reset.
+        policy (callable): Maps observations to an action code per environment.
+        per_env (int): Rounds to count in each environment.
+        n_envs (int, optional): Environments stepped together. Defaults to 4096.
+
+    Returns:
+        tuple: (rounds, sum of rewards, sum of squared rewards).
+    """
+    observations = env.reset(n_envs)
+    counted = np.zeros(n_envs, dtype=np.int64)
+    played, total, squared = 0, 0.0, 0.0
+    while played < per_env * n_envs:
+        observations, rewards, dones, _ = env.step(policy(observations))
+        keep = dones & (counted < per_env)
+        counted += keep
+        finished = rewards[keep]
+        played += len(finished)
+        total += finished.sum()
+        squared += (finished * finished).sum()
+    return played, total, squared
+
+
+def evaluate_policy(policy, rounds=1000000, n_envs=4096, rules=None, seed=0, z=1.96):
+    """
+    Score a policy against the exact basic-strategy expectation.
+
+    Args:
+        policy (callable): Maps observations to an action code per environment.
+        rounds (int, optional): Rounds to play. Defaults to 1,000,000.
+        n_envs (int, optional): Environments stepped together. Defaults to 4096.
+        rules (Rules, optional): The table rules. Defaults to the rules the
+                                 exact engine models exactly: no resplits and
+                                 one card to split aces.
+        seed (int, optional): Seed for a reproducible run. Defaults to 0.
+        z (float, optional): Normal quantile of the confidence interval.
+                             Defaults to 1.96 (95%).
+
+    Returns:
+        dict: Rounds played, the policy's EV per round with its standard error
+              and confidence interval, the exact basic-strategy EV, the
+              difference and its z-score (all EVs in units per round).
+    """
+    if rules is None:
+        rules = Rules(max_split_hands=2, hit_split_aces=False)
+    env = VectorBlackjackEnv(rules, seed)
+    played, total, squared = play_rounds(
+        env, policy, math.ceil(rounds / n_envs), n_envs
+    )
+
+    ev = total / played
+    se = math.sqrt(max(squared / played - ev * ev, 0.0) / played)
+    exact = exact_basic_strategy_ev(rules)
+    return {
+        "rounds": played,
+        "ev": ev,
+        "se": se,
+        "ci_low": ev - z * se,
+        "ci_high": ev + z * se,
+        "exact_basic_ev": exact,
+        "difference": ev - exact,
+        "z_score": (ev - exact) / se if se else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    result = evaluate_policy(BasicStrategyPolicy())
+    elapsed = time.perf_counter() - start
+    print(
+        f"Basic strategy: {result['ev']:+.4%} +/- {result['se']:.4%} per round "
+        f"over {result['rounds']} rounds ({result['rounds'] / elapsed:,.0f} rounds/s)"
+    )
+    print(
+        f"Exact basic-strategy EV: {result['exact_basic_ev']:+.4%} "
+        f"(z = {result['z_score']:+.2f})"
+    )
@@ -1,4 +1,14 @@
-from vision.camera import Camera
-from vision.gesture_detector import GestureDetector
-
 __all__ = ["Camera", "GestureDetector"]
+
+
+def __getattr__(name):
+    """Import OpenCV and MediaPipe only when a vision class is first used."""
+    if name == "Camera":
+        from vision.camera import Camera
+
+        return Camera
+    if name == "GestureDetector":
+        from vision.gesture_detector import GestureDetector
+
+        return GestureDetector
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")